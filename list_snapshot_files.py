@@ -25,8 +25,14 @@ def main(snapshot_id: str, output_format: str = "text", output_file: str = None,
         ctx.log(f"Listando arquivos do snapshot '{snapshot_id}'...")
         
         try:
-            # Criar cliente Restic com retry
-            client = ResticClient(max_attempts=3, credential_source=credential_source)
+            # Criar cliente Restic com retry usando o ambiente ja carregado
+            client = ResticClient(
+                max_attempts=3,
+                repository=ctx.repository,
+                env=ctx.env,
+                provider=ctx.provider,
+                credential_source=credential_source
+            )
             
             # Listar arquivos do snapshot
             files_output = client.list_snapshot_files(snapshot_id)
@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 import sys
-from datetime import datetime
 from services.script import ResticScript
 from services.restic_client import ResticClient, ResticError
+from services.restic_common import parse_snapshot_time
 from services.env import get_credential_source
 
 
@@ -29,20 +29,14 @@ def list_snapshots() -> None:
                 credential_source=credential_source
             )
             
-            # Obter lista de snapshots
-            snapshots = client.list_snapshots()
-            
-            if not snapshots:
-                ctx.log("Nenhum snapshot encontrado no repositorio.")
-                sys.exit(0)
-
-            print("{:<12} {:<20} {:<15} {}".format("ID", "Data", "Host", "Caminhos"))
-            print("-" * 80)
-
-            for snap in snapshots:
-                snapshot_time = datetime.fromisoformat(
-                    snap["time"].replace("Z", "+00:00")
-                )
+            # Ler snapshots incrementalmente, imprimindo cada um ao chegar
+            count = 0
+            for snap in client.iter_snapshots():
+                if count == 0:
+                    print("{:<12} {:<20} {:<15} {}".format("ID", "Data", "Host", "Caminhos"))
+                    print("-" * 80)
+                count += 1
+                snapshot_time = parse_snapshot_time(snap["time"])
                 formatted_time = snapshot_time.strftime("%Y-%m-%d %H:%M:%S")
                 paths = ", ".join(snap["paths"])
                 print(
@@ -54,6 +48,9 @@ def list_snapshots() -> None:
                     )
                 )
 
+            if count == 0:
+                ctx.log("Nenhum snapshot encontrado no repositorio.")
+
         except ResticError as exc:
             ctx.log(f"[ERRO] {exc}")
             sys.exit(1)
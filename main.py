@@ -10,13 +10,21 @@ import logging
 import os
 import sys
 from datetime import datetime
-from pathlib import Path
 from services.restic_client import ResticClient, ResticError
+from services.restic_common import parse_snapshot_time
 from services.env import get_credential_source
 
 
 def setup_logging():
-    """Configura o sistema de logging."""
+    """Configura o sistema de logging.
+    
+    Nao faz nada se o logger raiz ja possuir handlers, evitando criar
+    handlers (e arquivos de log) que o ``basicConfig`` descartaria.
+    """
+    if logging.getLogger().handlers:
+        return
+    
+    os.makedirs("logs", exist_ok=True)
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -88,9 +96,7 @@ def main():
         else:
             logger.info(f"Encontrados {len(snapshots)} snapshots:")
             for snapshot in snapshots:
-                snapshot_time = datetime.fromisoformat(
-                    snapshot["time"].replace("Z", "+00:00")
-                )
+                snapshot_time = parse_snapshot_time(snapshot["time"])
                 formatted_time = snapshot_time.strftime("%Y-%m-%d %H:%M:%S")
                 logger.info(f"ID: {snapshot['short_id']}, Data: {formatted_time}, Host: {snapshot['hostname']}")
         
@@ -98,7 +104,7 @@ def main():
         if snapshots:
             latest_snapshot = snapshots[-1]["short_id"]
             restore_target = os.getenv("RESTORE_TARGET_DIR", "restore")
-            Path(restore_target).mkdir(parents=True, exist_ok=True)
+            os.makedirs(restore_target, exist_ok=True)
             
             logger.info(f"Restaurando ultimo snapshot ({latest_snapshot}) para {restore_target}...")
             # Comentado para evitar restauracao acidental
@@ -6,6 +6,7 @@ from services.restic_client import (
     ResticError,
 )
 from services.env import get_credential_source
+from services.snapshot_cache import invalidate_snapshots
 
 
 def main() -> None:
@@ -45,7 +46,8 @@ def main() -> None:
                 keep_monthly=config.keep_monthly,
                 keep_yearly=config.keep_yearly,
             )
-            
+            invalidate_snapshots(ctx.repository)
+
             if success:
                 ctx.log("✅ Limpeza de snapshots concluida com sucesso.")
             else:
@@ -6,6 +6,7 @@ from services.restic_client import (
     ResticError,
 )
 from services.env import get_credential_source
+from services.snapshot_cache import invalidate_access, invalidate_snapshots
 
 
 def run_backup() -> None:
@@ -14,13 +15,14 @@ def run_backup() -> None:
 
     with ResticScript("backup", credential_source=credential_source) as ctx:
         config = ctx.config
-        if not config or not config.backup_source_dirs:
+        retention = ctx.retention
+        if not config or not retention or not ctx.backup_source_dirs:
             ctx.log("[FATAL] Configuracao de backup ausente ou incompleta")
             sys.exit(1)
 
-        source_dirs = config.backup_source_dirs
-        excludes = config.restic_excludes
-        tags = config.restic_tags
+        source_dirs = ctx.backup_source_dirs
+        excludes = ctx.excludes
+        tags = ctx.tags
 
         ctx.log("=== Iniciando backup com Restic ===")
 
@@ -34,33 +36,53 @@ def run_backup() -> None:
 
         try:
             ctx.log("🔍 Verificando acesso ao repositorio...")
-            if not client.check_repository_access():
+            if not client.check_repository_access_cached():
                 ctx.log("Nao foi possivel acessar o repositorio. Abortando.")
                 return
             ctx.log("✅ Repositorio acessivel.")
 
-            ctx.log(f"Executando backup de: {', '.join(source_dirs)}")
-            snapshot_id = client.backup(
-                paths=source_dirs,
-                excludes=excludes,
-                tags=tags,
-            )
-            ctx.log(f"Backup concluido com sucesso. ID do snapshot: {snapshot_id}")
-
-            if config.retention_enabled:
-                ctx.log("Aplicando politica de retencao...")
-                client.apply_retention_policy(
-                    keep_daily=config.keep_daily,
-                    keep_weekly=config.keep_weekly,
-                    keep_monthly=config.keep_monthly,
-                    keep_yearly=config.keep_yearly,
-                    prune=True,
-                )
+            workers = min(config.backup_workers, len(source_dirs))
+            try:
+                # backup e forget compartilham o cache persistente do Restic
+                with client.shared_cache():
+                    if workers > 1:
+                        ctx.log(
+                            f"Executando backup de: {', '.join(source_dirs)} "
+                            f"({workers} processos paralelos)"
+                        )
+                        snapshot_ids = client.backup_parallel(
+                            paths=source_dirs,
+                            excludes=excludes,
+                            tags=tags,
+                            max_workers=workers,
+                        )
+                        ctx.log(
+                            "Backup concluido com sucesso. "
+                            f"IDs dos snapshots: {', '.join(snapshot_ids)}"
+                        )
+                    else:
+                        ctx.log(f"Executando backup de: {', '.join(source_dirs)}")
+                        snapshot_id = client.backup(
+                            paths=source_dirs,
+                            excludes=excludes,
+                            tags=tags,
+                        )
+                        ctx.log(f"Backup concluido com sucesso. ID do snapshot: {snapshot_id}")
+
+                    if retention.enabled:
+                        ctx.log("Aplicando politica de retencao...")
+                        client.apply_retention_policy(**retention.as_kwargs(), prune=True)
+            finally:
+                # Backup e forget alteram a listagem, mesmo quando falham no meio
+                invalidate_snapshots(ctx.repository)
+
+            if retention.enabled:
                 ctx.log("Politica de retencao aplicada.")
             else:
                 ctx.log("Retencao desativada via configuracao.")
 
         except ResticError as exc:
+            invalidate_access(ctx.repository)
             ctx.log(f"[ERRO] {exc}")
             sys.exit(1)
         except Exception as exc:
@@ -1,4 +1,7 @@
 import argparse
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Union
 
 from services.script import ResticScript
 from services.restic_client import (
@@ -6,10 +9,15 @@ from services.restic_client import (
     ResticError,
 )
 from services.env import get_credential_source
+from services.restic import default_backend_connections
+from services.restore_args import add_restore_arguments
+from services.snapshot_cache import lookup_snapshot
 from services.restore_utils import (
     create_full_restore_structure,
     format_restore_info,
     get_snapshot_paths_from_data,
+    normalize_restore_path,
+    print_restore_progress,
 )
 
 
@@ -17,27 +25,53 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Restaura arquivo ou diretorio especifico de um snapshot",
     )
-    parser.add_argument("--id", default="latest", help="ID do snapshot (default: latest)")
+    add_restore_arguments(parser, default_connections=default_backend_connections())
     parser.add_argument(
         "--path",
         required=True,
-        help="Caminho do arquivo ou diretorio a restaurar",
+        action="append",
+        help="Caminho do arquivo ou diretorio a restaurar (pode ser repetido)",
     )
     return parser.parse_args()
 
 
-def run_restore_file(snapshot_id: str, include_path: str) -> None:
-    """Restaura arquivo ou diretorio especifico do snapshot.
+# Numero maximo de processos do Restic restaurando caminhos em paralelo
+MAX_PARALLEL_RESTORES = 8
+
+# Caminho absoluto (opcionalmente com letra de unidade) e sem bytes nulos
+_PATH_RE = re.compile(r"^([A-Za-z]:)?[\\/][^\0]*$")
+
+
+def run_restore_file(
+    snapshot_id: str,
+    include_paths: Union[str, Sequence[str]],
+    connections: Optional[int] = None,
+    nice: Optional[int] = None,
+    ionice_class: Optional[int] = None,
+) -> None:
+    """Restaura arquivos ou diretorios especificos do snapshot.
     
     Utiliza o ResticClient para executar a restauracao com retry automatico e tratamento de erros.
+    Com mais de um caminho, cada um e restaurado por um processo do Restic proprio,
+    em paralelo, ja que os destinos sao subarvores disjuntas.
     
     Parameters
     ----------
     snapshot_id : str
         ID do snapshot a ser restaurado ou "latest" para o mais recente
-    include_path : str
-        Caminho do arquivo ou diretorio a ser restaurado
+    include_paths : Union[str, Sequence[str]]
+        Caminho (ou caminhos) do arquivo ou diretorio a ser restaurado
+    connections : Optional[int]
+        Conexoes paralelas ao backend durante a restauracao, divididas entre
+        os processos quando houver mais de um caminho
+    nice : Optional[int]
+        Incremento de ``nice`` para os processos do Restic (apenas Linux)
+    ionice_class : Optional[int]
+        Classe de E/S do ``ionice`` para os processos do Restic (apenas Linux)
     """
+    if isinstance(include_paths, str):
+        include_paths = [include_paths]
+
     credential_source = get_credential_source()
     with ResticScript("restore_file", credential_source=credential_source) as ctx:
         base_restore_target = (
@@ -47,60 +81,103 @@ def run_restore_file(snapshot_id: str, include_path: str) -> None:
         )
         ctx.log("=== Iniciando restauracao de arquivo com Restic ===")
         
+        # Rejeitar caminhos invalidos antes de qualquer chamada ao Restic
+        invalid_paths = [path for path in include_paths if not _PATH_RE.match(path)]
+        if invalid_paths or not include_paths:
+            ctx.log(
+                "[ERRO] Caminho invalido (use um caminho absoluto): %s",
+                ", ".join(map(repr, invalid_paths)),
+                level="ERROR",
+            )
+            ctx.log("=== Fim do processo de restauracao ===")
+            return
+        
         try:
-            # Criar cliente Restic com retry
-            client = ResticClient(max_attempts=3, credential_source=credential_source)
-            
-            # Obter informacoes do snapshot
-            ctx.log(f"Buscando informacoes do snapshot '{snapshot_id}'...")
-            snapshot_data = client.get_snapshot_info(snapshot_id)
-            
-            # Criar estrutura completa de pastas baseada na data/hora do snapshot
-            # Formato: C:\Restore\2025-08-19-100320\C\Users\Administrator\Documents\Docker
-            restore_target = create_full_restore_structure(
-                base_restore_target,
-                snapshot_data,
-                include_path
+            # Criar cliente Restic com retry usando o ambiente ja carregado
+            client = ResticClient(
+                max_attempts=3,
+                repository=ctx.repository,
+                env=ctx.env,
+                provider=ctx.provider,
+                credential_source=credential_source
             )
             
-            # Formatar e exibir informacoes
-            info = format_restore_info(snapshot_data, restore_target, include_path)
-            
-            ctx.log(f"Snapshot ID: {info['snapshot_id']}")
-            ctx.log(f"Data do Snapshot: {info['snapshot_date']}")
-            ctx.log(f"Hostname: {info['hostname']}")
-            ctx.log(f"Arquivo/diretorio a restaurar: {include_path}")
-            ctx.log(f"Destino da restauracao: {restore_target}")
+            # Obter informacoes do snapshot
+            ctx.log("Buscando informacoes do snapshot '%s'...", snapshot_id)
+            snapshot_data = lookup_snapshot(client, snapshot_id)
+            # Reutilizar o ID completo nos comandos seguintes (evita resolver "latest" de novo)
+            snapshot_id = snapshot_data.get("id", snapshot_id)
             
-            # Mostrar exemplo da estrutura criada
-            timestamp_part = info['snapshot_date'].replace(' ', '-').replace(':', '')
-            normalized_path = include_path.replace(':', '')
-            if normalized_path.startswith(('\\', '/')):
-                normalized_path = normalized_path[1:]
-            example_structure = f"{base_restore_target}\\{timestamp_part}\\{normalized_path}"
-            ctx.log(f"Estrutura criada: {example_structure}")
+            workers = min(MAX_PARALLEL_RESTORES, len(include_paths))
+            if connections and workers > 1:
+                # Manter o total de conexoes ao backend dentro do limite pedido
+                connections = max(1, connections // workers)
+
+            # Linha de progresso unica, atualizada no lugar: so com um processo
+            progress = print_restore_progress if workers == 1 else None
+
+            def restore_path(include_path: str) -> bool:
+                # Criar estrutura completa de pastas baseada na data/hora do snapshot
+                # Formato: C:\Restore\2025-08-19-100320\C\Users\Administrator\Documents\Docker
+                restore_target = create_full_restore_structure(
+                    base_restore_target,
+                    snapshot_data,
+                    include_path
+                )
+                
+                # Formatar e exibir informacoes
+                info = format_restore_info(snapshot_data, restore_target, include_path)
+                
+                ctx.log("Snapshot ID: %s", info['snapshot_id'])
+                ctx.log("Data do Snapshot: %s", info['snapshot_date'])
+                ctx.log("Hostname: %s", info['hostname'])
+                ctx.log("Arquivo/diretorio a restaurar: %s", include_path)
+                ctx.log("Destino da restauracao: %s", restore_target)
+                
+                # Mostrar exemplo da estrutura criada
+                timestamp_part = info['snapshot_date'].replace(' ', '-').replace(':', '')
+                normalized_path = normalize_restore_path(include_path)
+                example_structure = f"{base_restore_target}\\{timestamp_part}\\{normalized_path}"
+                ctx.log("Estrutura criada: %s", example_structure)
+                
+                # Descarregar o buffer do log antes da saida direta do progresso
+                ctx.flush_log()
+
+                # Executar restauracao do arquivo especifico
+                return client.restore_snapshot(
+                    target_dir=restore_target,
+                    snapshot_id=snapshot_id,
+                    include_paths=[include_path],
+                    connections=connections,
+                    overwrite_mode="if-newer",
+                    sparse=True,
+                    nice=nice,
+                    ionice_class=ionice_class,
+                    progress=progress,
+                )
             
-            # Executar restauracao do arquivo especifico
-            success = client.restore_snapshot(
-                target_dir=restore_target,
-                snapshot_id=snapshot_id,
-                include_paths=[include_path]
-            )
+            if workers > 1:
+                ctx.log("Restaurando %d caminhos com %d processos em paralelo", len(include_paths), workers)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    success = all(list(executor.map(restore_path, include_paths)))
+            else:
+                success = restore_path(include_paths[0])
+                print()
             
             if success:
                 ctx.log("✅ Arquivo ou diretorio restaurado com sucesso.")
             else:
-                ctx.log("Erro durante a restauracao")
+                ctx.log("Erro durante a restauracao", level="ERROR")
                 
         except ResticError as exc:
-            ctx.log(f"[ERRO] {exc}")
+            ctx.log("[ERRO] %s", exc, level="ERROR")
         except Exception as exc:
-            ctx.log(f"[ERRO] Uma falha inesperada ocorreu: {exc}")
+            ctx.log("[ERRO] Uma falha inesperada ocorreu: %s", exc, level="ERROR")
         finally:
             ctx.log("=== Fim do processo de restauracao ===")
 
 
 if __name__ == "__main__":
     args = parse_args()
-    run_restore_file(args.id, args.path)
+    run_restore_file(args.id, args.path, args.connections, args.nice, args.ionice_class)
 
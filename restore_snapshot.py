@@ -1,4 +1,6 @@
 import argparse
+import threading
+from typing import Optional
 
 from services.script import ResticScript
 from services.restic_client import (
@@ -6,10 +8,15 @@ from services.restic_client import (
     ResticError,
 )
 from services.env import get_credential_source
+from services.restic import default_backend_connections
+from services.prestage import prestage_packs
+from services.restore_args import add_restore_arguments
+from services.snapshot_cache import lookup_snapshot
 from services.restore_utils import (
     create_timestamped_restore_path,
     format_restore_info,
     get_snapshot_paths_from_data,
+    print_restore_progress,
 )
 
 
@@ -17,11 +24,22 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Restaura um snapshot inteiro para o diretorio alvo",
     )
-    parser.add_argument("--id", default="latest", help="ID do snapshot a restaurar")
+    add_restore_arguments(parser, default_connections=default_backend_connections())
+    parser.add_argument(
+        "--prestage",
+        action="store_true",
+        help="Pre-aquece os packs do snapshot no S3 (HEAD com Range 0-0) durante a restauracao",
+    )
     return parser.parse_args()
 
 
-def run_restore_snapshot(snapshot_id: str) -> None:
+def run_restore_snapshot(
+    snapshot_id: str,
+    connections: Optional[int] = None,
+    prestage: bool = False,
+    nice: Optional[int] = None,
+    ionice_class: Optional[int] = None,
+) -> None:
     """Restaura um snapshot inteiro para o diretorio alvo.
     
     Utiliza o ResticClient para executar a restauracao com retry automatico e tratamento de erros.
@@ -30,6 +48,14 @@ def run_restore_snapshot(snapshot_id: str) -> None:
     ----------
     snapshot_id : str
         ID do snapshot a ser restaurado ou "latest" para o mais recente
+    connections : Optional[int]
+        Conexoes paralelas ao backend durante a restauracao
+    prestage : bool
+        Se True, pre-aquece os packs do snapshot no S3 em paralelo a restauracao
+    nice : Optional[int]
+        Incremento de ``nice`` para o processo do Restic (apenas Linux)
+    ionice_class : Optional[int]
+        Classe de E/S do ``ionice`` para o processo do Restic (apenas Linux)
     """
     credential_source = get_credential_source()
     
@@ -41,6 +67,7 @@ def run_restore_snapshot(snapshot_id: str) -> None:
         )
         ctx.log("=== Iniciando restauracao de snapshot com Restic ===")
 
+        prestage_stop = threading.Event()
         try:
             # Criar cliente Restic com retry usando o ambiente já carregado
             client = ResticClient(
@@ -52,8 +79,20 @@ def run_restore_snapshot(snapshot_id: str) -> None:
             )
             
             # Obter informacoes do snapshot
-            ctx.log(f"Buscando informacoes do snapshot '{snapshot_id}'...")
-            snapshot_data = client.get_snapshot_info(snapshot_id)
+            ctx.log("Buscando informacoes do snapshot '%s'...", snapshot_id)
+            snapshot_data = lookup_snapshot(client, snapshot_id)
+            # Reutilizar o ID completo nos comandos seguintes (evita resolver "latest" de novo)
+            snapshot_id = snapshot_data.get("id", snapshot_id)
+
+            if prestage and ctx.provider == "aws":
+                # Em segundo plano: os HEADs correm em paralelo ao restore
+                threading.Thread(
+                    target=prestage_packs,
+                    args=(client.repository, client.iter_snapshot_packs(snapshot_id), client.env),
+                    kwargs={"stop": prestage_stop},
+                    daemon=True,
+                ).start()
+                ctx.log("Pre-aquecimento dos packs do snapshot iniciado em segundo plano")
             
             # Criar estrutura de pastas baseada na data/hora do snapshot
             # Formato: C:\Restore\2025-08-19-100320
@@ -68,35 +107,45 @@ def run_restore_snapshot(snapshot_id: str) -> None:
             # Formatar e exibir informacoes
             info = format_restore_info(snapshot_data, restore_target)
             
-            ctx.log(f"Snapshot ID: {info['snapshot_id']}")
-            ctx.log(f"Data do Snapshot: {info['snapshot_date']}")
-            ctx.log(f"Hostname: {info['hostname']}")
+            ctx.log("Snapshot ID: %s", info['snapshot_id'])
+            ctx.log("Data do Snapshot: %s", info['snapshot_date'])
+            ctx.log("Hostname: %s", info['hostname'])
             if original_paths:
-                ctx.log(f"Caminhos originais: {', '.join(original_paths)}")
-            ctx.log(f"Destino da restauracao: {restore_target}")
-            ctx.log(f"Estrutura: {base_restore_target}\\{info['snapshot_date'].replace(' ', '-').replace(':', '')}\\<estrutura_original>")
+                ctx.log("Caminhos originais: %s", ', '.join(original_paths))
+            ctx.log("Destino da restauracao: %s", restore_target)
+            ctx.log("Estrutura: %s\\%s\\<estrutura_original>", base_restore_target, info['snapshot_date'].replace(' ', '-').replace(':', ''))
+            # Descarregar o buffer do log antes da saida direta do progresso
+            ctx.flush_log()
             print("\nIniciando processo de restauracao... O progresso sera exibido abaixo.")
 
             # Executar restauracao
             success = client.restore_snapshot(
                 target_dir=restore_target,
                 snapshot_id=snapshot_id,
+                connections=connections,
+                overwrite_mode="if-newer",
+                sparse=True,
+                nice=nice,
+                ionice_class=ionice_class,
+                progress=print_restore_progress,
             )
+            print()
             
             if success:
                 ctx.log("✅ Restauracao de snapshot concluida com sucesso.")
             else:
-                ctx.log("Erro durante a restauracao")
+                ctx.log("Erro durante a restauracao", level="ERROR")
 
         except ResticError as exc:
-            ctx.log(f"[ERRO] {exc}")
+            ctx.log("[ERRO] %s", exc, level="ERROR")
         except Exception as exc:
-            ctx.log(f"[ERRO] Uma falha inesperada ocorreu: {exc}")
+            ctx.log("[ERRO] Uma falha inesperada ocorreu: %s", exc, level="ERROR")
         finally:
+            prestage_stop.set()
             ctx.log("=== Fim do processo de restauracao ===")
 
 
 if __name__ == "__main__":
     args = parse_args()
-    run_restore_snapshot(args.id)
+    run_restore_snapshot(args.id, args.connections, args.prestage, args.nice, args.ionice_class)
 
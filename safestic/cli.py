@@ -4,13 +4,12 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from services.restic_client import (
-    ResticClient,
-    ResticError,
-)
-from services.env import get_credential_source
-from services.restic import load_restic_config
-from services.script import ResticScript
+# Only depends on argparse; shared with the standalone restore scripts.
+from services.restore_args import add_restore_arguments
+
+# Other ``services`` modules are imported inside each command so that building
+# the parser and dispatching does not pay for loading the Restic client,
+# dotenv and the cloud SDKs.
 
 
 def cmd_backup(args: argparse.Namespace) -> None:
@@ -27,8 +26,30 @@ def cmd_list(args: argparse.Namespace) -> None:
     list_snapshots()
 
 
+def cmd_restore_snapshot(args: argparse.Namespace) -> None:
+    """Restore a whole snapshot using existing helper script."""
+    from restore_snapshot import run_restore_snapshot
+    from services.restic import default_backend_connections
+
+    connections = args.connections or default_backend_connections()
+    run_restore_snapshot(args.id, connections, args.prestage, args.nice, args.ionice_class)
+
+
+def cmd_restore_file(args: argparse.Namespace) -> None:
+    """Restore specific files or directories using existing helper script."""
+    from restore_file import run_restore_file
+    from services.restic import default_backend_connections
+
+    connections = args.connections or default_backend_connections()
+    run_restore_file(args.id, args.path, connections, args.nice, args.ionice_class)
+
+
 def cmd_init(args: argparse.Namespace) -> None:
     """Initialize repository if needed."""
+    from services.env import get_credential_source
+    from services.restic_client import ResticClient, ResticError
+    from services.script import ResticScript
+
     credential_source = get_credential_source()
     with ResticScript("init", credential_source=credential_source) as ctx:
         client = ResticClient(
@@ -51,6 +72,9 @@ def cmd_init(args: argparse.Namespace) -> None:
 
 def cmd_dry_run(args: argparse.Namespace) -> None:
     """Display configured backup paths and check their existence."""
+    from services.env import get_credential_source
+    from services.restic import load_restic_config
+
     credential_source = get_credential_source()
     config = load_restic_config(credential_source)
     print("Configuracao de backup:")
@@ -72,6 +96,33 @@ def build_parser() -> argparse.ArgumentParser:
     list_p = sub.add_parser("list", help="Lista snapshots")
     list_p.set_defaults(func=cmd_list)
 
+    restore_p = sub.add_parser("restore", help="Restaura snapshot ou arquivos")
+    restore_sub = restore_p.add_subparsers(dest="restore_command", required=True)
+
+    restore_common = argparse.ArgumentParser(add_help=False)
+    add_restore_arguments(restore_common)
+
+    snapshot_p = restore_sub.add_parser(
+        "snapshot", parents=[restore_common], help="Restaura um snapshot inteiro"
+    )
+    snapshot_p.add_argument(
+        "--prestage",
+        action="store_true",
+        help="Pre-aquece os packs do snapshot no S3 durante a restauracao",
+    )
+    snapshot_p.set_defaults(func=cmd_restore_snapshot)
+
+    file_p = restore_sub.add_parser(
+        "file", parents=[restore_common], help="Restaura arquivos ou diretorios especificos"
+    )
+    file_p.add_argument(
+        "--path",
+        required=True,
+        action="append",
+        help="Caminho do arquivo ou diretorio a restaurar (pode ser repetido)",
+    )
+    file_p.set_defaults(func=cmd_restore_file)
+
     init_p = sub.add_parser("init", help="Inicializa repositorio")
     init_p.set_defaults(func=cmd_init)
 
@@ -9,7 +9,7 @@ estao configuradas antes de executar operacoes que requerem acesso ao repositori
 import os
 import sys
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 # Adiciona o diretorio raiz do projeto ao path
 project_root = Path(__file__).parent.parent
@@ -56,6 +56,36 @@ def check_restic_password() -> Tuple[bool, str]:
     return False, "RESTIC_PASSWORD nao configurado"
 
 
+# Credenciais de cada provedor e validacao extra opcional do valor
+PROVIDER_KEYS: Dict[str, List[Tuple[str, Optional[Callable[[str], bool]]]]] = {
+    'aws': [('AWS_ACCESS_KEY_ID', None), ('AWS_SECRET_ACCESS_KEY', None)],
+    'azure': [('AZURE_ACCOUNT_NAME', None), ('AZURE_ACCOUNT_KEY', None)],
+    'gcp': [
+        ('GOOGLE_PROJECT_ID', None),
+        ('GOOGLE_APPLICATION_CREDENTIALS', os.path.exists),
+    ],
+}
+
+
+def _lookup(keys: List[str]) -> Dict[str, Optional[str]]:
+    """Obtem as credenciais da fonte configurada, com fallback para o ambiente.
+    
+    Args:
+        keys: Nomes das credenciais
+        
+    Returns:
+        Dict[str, Optional[str]]: Valor de cada credencial (None se ausente)
+    """
+    values: Dict[str, Optional[str]] = {}
+    if manager:
+        try:
+            # Uma unica consulta a fonte para todas as credenciais
+            values = manager.get_credentials(keys)
+        except Exception:
+            pass
+    return {key: values.get(key) or os.getenv(key) for key in keys}
+
+
 def check_cloud_credentials() -> Tuple[bool, List[str]]:
     """Verifica credenciais especificas do provedor de nuvem.
     
@@ -63,110 +93,56 @@ def check_cloud_credentials() -> Tuple[bool, List[str]]:
         Tuple[bool, List[str]]: (todas_configuradas, lista_de_mensagens)
     """
     provider = os.getenv('STORAGE_PROVIDER', '').lower()
+    
+    if provider == 'local':
+        # Para provedor local, consideramos as credenciais como configuradas
+        # pois não precisamos de credenciais de nuvem
+        return True, ["Provedor local - credenciais de nuvem nao necessarias"]
+    if provider not in PROVIDER_KEYS:
+        return False, [f"Provedor desconhecido: {provider}"]
+    
     messages = []
     all_configured = True
+    location = " no keyring" if credential_source == 'keyring' else ""
+    values = _lookup([key for key, _ in PROVIDER_KEYS[provider]])
     
-    if provider == 'aws':
-        # Tentar obter da fonte configurada primeiro
-        aws_key = None
-        aws_secret = None
-
-        if manager:
-            try:
-                aws_key = manager.get_credential('AWS_ACCESS_KEY_ID')
-                aws_secret = manager.get_credential('AWS_SECRET_ACCESS_KEY')
-            except Exception:
-                pass
-
-        # Fallback para variáveis de ambiente
-        if not aws_key:
-            aws_key = os.getenv('AWS_ACCESS_KEY_ID')
-        if not aws_secret:
-            aws_secret = os.getenv('AWS_SECRET_ACCESS_KEY')
-        
-        if not aws_key:
-            messages.append("AWS_ACCESS_KEY_ID nao configurado")
-            all_configured = False
-        else:
-            if credential_source == 'keyring':
-                messages.append("AWS_ACCESS_KEY_ID configurado no keyring")
-            else:
-                messages.append("AWS_ACCESS_KEY_ID configurado")
-            
-        if not aws_secret:
-            messages.append("AWS_SECRET_ACCESS_KEY nao configurado")
-            all_configured = False
-        else:
-            if credential_source == 'keyring':
-                messages.append("AWS_SECRET_ACCESS_KEY configurado no keyring")
-            else:
-                messages.append("AWS_SECRET_ACCESS_KEY configurado")
-            
-    elif provider == 'azure':
-        azure_name = None
-        azure_key = None
-
-        if manager:
-            try:
-                azure_name = manager.get_credential('AZURE_ACCOUNT_NAME')
-                azure_key = manager.get_credential('AZURE_ACCOUNT_KEY')
-            except Exception:
-                pass
-
-        if not azure_name:
-            azure_name = os.getenv('AZURE_ACCOUNT_NAME')
-        if not azure_key:
-            azure_key = os.getenv('AZURE_ACCOUNT_KEY')
-
-        if not azure_name:
-            messages.append("AZURE_ACCOUNT_NAME nao configurado")
+    for key, validator in PROVIDER_KEYS[provider]:
+        value = values[key]
+        if not value:
+            # Valor vazio: nem chega a consultar o sistema de arquivos
+            messages.append(f"{key} nao configurado")
             all_configured = False
-        else:
-            messages.append("AZURE_ACCOUNT_NAME configurado")
-
-        if not azure_key:
-            messages.append("AZURE_ACCOUNT_KEY nao configurado")
+        elif validator is not None and not validator(value):
+            messages.append(f"{key}: arquivo nao encontrado ({value})")
             all_configured = False
         else:
-            messages.append("AZURE_ACCOUNT_KEY configurado")
-
-    elif provider == 'gcp':
-        gcp_project = None
-        gcp_creds = None
-
-        if manager:
-            try:
-                gcp_project = manager.get_credential('GOOGLE_PROJECT_ID')
-                gcp_creds = manager.get_credential('GOOGLE_APPLICATION_CREDENTIALS')
-            except Exception:
-                pass
-
-        if not gcp_project:
-            gcp_project = os.getenv('GOOGLE_PROJECT_ID')
-        if not gcp_creds:
-            gcp_creds = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+            messages.append(f"{key} configurado{location}")
+    
+    return all_configured, messages
 
-        if not gcp_project:
-            messages.append("GOOGLE_PROJECT_ID nao configurado")
-            all_configured = False
-        else:
-            messages.append("GOOGLE_PROJECT_ID configurado")
 
-        if not gcp_creds or not Path(gcp_creds).exists():
-            messages.append("GOOGLE_APPLICATION_CREDENTIALS nao configurado ou arquivo nao encontrado")
-            all_configured = False
-        else:
-            messages.append("GOOGLE_APPLICATION_CREDENTIALS configurado")
-            
-    elif provider == 'local':
-        messages.append("Provedor local - credenciais de nuvem nao necessarias")
-        # Para provedor local, consideramos as credenciais como configuradas
-        # pois não precisamos de credenciais de nuvem
-    else:
-        messages.append(f"Provedor desconhecido: {provider}")
-        all_configured = False
+def all_credentials_ok() -> bool:
+    """Verifica as credenciais sem montar mensagens, parando na primeira falha.
     
-    return all_configured, messages
+    Usada no modo ``--quiet``, em que apenas o codigo de saida importa.
+    
+    Returns:
+        bool: True se todas as credenciais estao configuradas
+    """
+    if not check_restic_password()[0]:
+        return False
+    
+    provider = os.getenv('STORAGE_PROVIDER', '').lower()
+    if provider == 'local':
+        return True
+    if provider not in PROVIDER_KEYS:
+        return False
+    
+    values = _lookup([key for key, _ in PROVIDER_KEYS[provider]])
+    return all(
+        values[key] and (validator is None or validator(values[key]))
+        for key, validator in PROVIDER_KEYS[provider]
+    )
 
 
 def check_all_credentials(verbose: bool = True) -> bool:
@@ -242,7 +218,7 @@ def main():
                 print("   DICA: Configure com: make setup-restic-password")
         sys.exit(0 if password_ok else 1)
     else:
-        all_ok = check_all_credentials(verbose=not args.quiet)
+        all_ok = all_credentials_ok() if args.quiet else check_all_credentials()
         if not args.quiet and not all_ok:
             print("\n[ERRO] Algumas credenciais nao estao configuradas.")
             print("   Execute uma das opcoes para configurar:")
@@ -5,7 +5,6 @@ from __future__ import annotations
 
 import os
 import sys
-from pathlib import Path
 
 from services.script import ResticScript
 from services.restic_client import (
@@ -17,12 +16,13 @@ from services.env import get_credential_source
 
 def check_winfsp() -> bool:
     """Verifica se WinFsp esta instalado (Windows)."""
-    winfsp_paths = [
-        r"C:\\Program Files\\WinFsp\\bin\\launchctl-x64.exe",
-        r"C:\\Program Files (x86)\\WinFsp\\bin\\launchctl-x64.exe",
-    ]
-    for path in winfsp_paths:
-        if Path(path).exists():
+    # ProgramFiles primeiro: no Windows 64 bits o caminho (x86) raramente existe
+    for variable, default in (
+        ("ProgramFiles", r"C:\Program Files"),
+        ("ProgramFiles(x86)", r"C:\Program Files (x86)"),
+    ):
+        path = os.path.join(os.environ.get(variable, default), "WinFsp", "bin", "launchctl-x64.exe")
+        if os.path.isfile(path):
             print(f"✅ WinFsp encontrado: {path}")
             return True
     print("❌ WinFsp nao encontrado")
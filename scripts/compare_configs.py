@@ -6,22 +6,42 @@ Este script ajuda a identificar diferenças de configuração que podem
 causar problemas ao migrar entre sistemas operacionais.
 """
 
+import importlib.metadata
+import importlib.util
 import os
 import sys
-import json
 import platform
+import re
+import stat
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
-from services.env import get_credential_source
+from services.env import ensure_env_loaded, get_credential_source
+from services.restic_common import dump_json, parse_json
+
+@lru_cache(maxsize=1)
+def _static_system_info():
+    """Dados do sistema que não mudam durante a execução, obtidos uma vez.
+    
+    A arquitetura vem do tamanho do ponteiro do interpretador: equivale a
+    ``platform.architecture()[0]``, que executa o comando ``file`` sobre o
+    ``sys.executable``.
+    """
+    uname = platform.uname()
+    return {
+        "os": uname.system,
+        "os_version": uname.version,
+        "architecture": f"{struct.calcsize('P') * 8}bit",
+        "python_version": sys.version,
+        "hostname": uname.node,
+    }
 
 def get_system_info():
     """Coleta informações do sistema."""
     return {
-        "os": platform.system(),
-        "os_version": platform.version(),
-        "architecture": platform.architecture()[0],
-        "python_version": sys.version,
-        "hostname": platform.node(),
+        **_static_system_info(),
         "user": os.getenv("USER") or os.getenv("USERNAME"),
         "home": str(Path.home()),
         "cwd": os.getcwd(),
@@ -29,33 +49,39 @@ def get_system_info():
         "env_path": os.getenv("PATH", "").split(os.pathsep)[:5]  # Primeiros 5 paths
     }
 
-def get_env_variables():
-    """Coleta variáveis de ambiente relevantes."""
-    load_dotenv()
-    
-    # Variáveis importantes para SafeStic
-    important_vars = [
-        "RESTIC_REPOSITORY",
-        "RESTIC_PASSWORD",
-        "STORAGE_PROVIDER",
-        "STORAGE_BUCKET",
-        "AZURE_ACCOUNT_NAME",
-        "AZURE_ACCOUNT_KEY",
-        "CREDENTIAL_SOURCE",
-        "BACKUP_SOURCE",
-        "RESTORE_TARGET",
-        "LANG",
-        "LC_ALL",
-        "PYTHONPATH",
-        "VIRTUAL_ENV"
-    ]
+# Variáveis importantes para SafeStic
+IMPORTANT_VARS = (
+    "RESTIC_REPOSITORY",
+    "RESTIC_PASSWORD",
+    "STORAGE_PROVIDER",
+    "STORAGE_BUCKET",
+    "AZURE_ACCOUNT_NAME",
+    "AZURE_ACCOUNT_KEY",
+    "CREDENTIAL_SOURCE",
+    "BACKUP_SOURCE",
+    "RESTORE_TARGET",
+    "LANG",
+    "LC_ALL",
+    "PYTHONPATH",
+    "VIRTUAL_ENV",
+)
+
+# Variáveis mascaradas no relatório, classificadas uma única vez
+SENSITIVE_VARS = frozenset(
+    var for var in IMPORTANT_VARS if re.search(r"PASSWORD|KEY|SECRET", var)
+)
+
+@lru_cache(maxsize=1)
+def _collect_env_variables():
+    """Lê as variáveis uma única vez por processo (o .env não muda entre relatórios)."""
+    ensure_env_loaded()
     
     env_vars = {}
-    for var in important_vars:
+    for var in IMPORTANT_VARS:
         value = get_credential_source() if var == "CREDENTIAL_SOURCE" else os.getenv(var)
         if value:
             # Mascarar credenciais sensíveis
-            if any(sensitive in var.upper() for sensitive in ["PASSWORD", "KEY", "SECRET"]):
+            if var in SENSITIVE_VARS:
                 env_vars[var] = f"***MASKED*** ({len(value)} chars)"
             else:
                 env_vars[var] = value
@@ -64,6 +90,10 @@ def get_env_variables():
     
     return env_vars
 
+def get_env_variables():
+    """Coleta variáveis de ambiente relevantes."""
+    return dict(_collect_env_variables())
+
 def get_file_info():
     """Coleta informações sobre arquivos importantes."""
     files_to_check = [
@@ -77,66 +107,90 @@ def get_file_info():
     
     file_info = {}
     for filename in files_to_check:
-        path = Path(filename)
-        if path.exists():
-            stat = path.stat()
-            file_info[filename] = {
-                "exists": True,
-                "size": stat.st_size,
-                "modified": stat.st_mtime,
-                "permissions": oct(stat.st_mode)[-3:],
-                "is_readable": os.access(path, os.R_OK),
-                "is_writable": os.access(path, os.W_OK)
-            }
-        else:
+        # Um unico stat por arquivo: existencia e permissoes saem do st_mode
+        try:
+            st = os.stat(filename)
+        except FileNotFoundError:
             file_info[filename] = {"exists": False}
+            continue
+        file_info[filename] = {
+            "exists": True,
+            "size": st.st_size,
+            "modified": st.st_mtime,
+            "permissions": oct(st.st_mode)[-3:],
+            "is_readable": _mode_allows(filename, st, os.R_OK),
+            "is_writable": _mode_allows(filename, st, os.W_OK)
+        }
     
     return file_info
 
+def _mode_allows(filename, st, mode):
+    """Verifica leitura/escrita pelos bits de st_mode, sem chamar access().
+    
+    Fora do POSIX (sem geteuid) recorre a os.access.
+    """
+    if not hasattr(os, "geteuid"):
+        return os.access(filename, mode)
+    euid = os.geteuid()
+    if euid == 0:
+        return True
+    if mode == os.R_OK:
+        bits = (stat.S_IRUSR, stat.S_IRGRP, stat.S_IROTH)
+    else:
+        bits = (stat.S_IWUSR, stat.S_IWGRP, stat.S_IWOTH)
+    if st.st_uid == euid:
+        return bool(st.st_mode & bits[0])
+    if st.st_gid == os.getegid() or st.st_gid in os.getgroups():
+        return bool(st.st_mode & bits[1])
+    return bool(st.st_mode & bits[2])
+
+
 def get_python_packages():
     """Lista pacotes Python instalados (principais)."""
-    important_packages = [
-        "python-dotenv",
-        "keyring",
-        "pythonjsonlogger",
-        "requests",
-        "cryptography"
-    ]
+    # Nome exibido -> (distribuicao no PyPI, modulo importavel)
+    important_packages = {
+        "python-dotenv": ("python-dotenv", "dotenv"),
+        "keyring": ("keyring", "keyring"),
+        "pythonjsonlogger": ("python-json-logger", "pythonjsonlogger"),
+        "requests": ("requests", "requests"),
+        "cryptography": ("cryptography", "cryptography"),
+    }
     
     packages = {}
-    for package in important_packages:
+    for package, (distribution, module_name) in important_packages.items():
+        # Versao lida dos metadados e modulo apenas localizado: nenhum
+        # __init__.py e executado
         try:
-            # Tentar importar o pacote
-            module_name = package.replace("-", "_")
-            module = __import__(module_name)
-            
-            # Tentar obter versão
+            version = importlib.metadata.version(distribution)
+        except importlib.metadata.PackageNotFoundError:
             version = "unknown"
-            if hasattr(module, "__version__"):
-                version = module.__version__
-            elif hasattr(module, "version"):
-                version = module.version
-            
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError) as e:
+            packages[package] = {"installed": True, "error": str(e)}
+            continue
+        
+        if spec is None:
+            packages[package] = {"installed": False}
+        else:
             packages[package] = {
                 "installed": True,
                 "version": version,
-                "location": getattr(module, "__file__", "unknown")
+                "location": spec.origin or "unknown"
             }
-        except ImportError:
-            packages[package] = {"installed": False}
-        except Exception as e:
-            packages[package] = {"installed": True, "error": str(e)}
     
     return packages
 
+# Tempo maximo (segundos) para resolver o IP local no relatorio
+LOCAL_IP_TIMEOUT = 1.0
+
 def get_network_info():
     """Coleta informações de rede básicas."""
     import socket
     
     try:
-        # Obter hostname e IP local
+        # Obter hostname; o IP local e resolvido em paralelo aos testes abaixo
         hostname = socket.gethostname()
-        local_ip = socket.gethostbyname(hostname)
         
         # Testar conectividade básica
         connectivity = {}
@@ -146,15 +200,34 @@ def get_network_info():
             ("login.microsoftonline.com", 443)
         ]
         
-        for host, port in test_hosts:
+        def probe(address):
+            try:
+                socket.create_connection(address, timeout=5).close()
+                return True
+            except OSError:
+                return False
+        
+        # IP local resolvido em thread daemon: um DNS travado nao segura a
+        # saida do interpretador, ao contrario das threads de um executor
+        resolved = {}
+        
+        def resolve():
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
-                result = sock.connect_ex((host, port))
-                sock.close()
-                connectivity[f"{host}:{port}"] = result == 0
-            except Exception:
-                connectivity[f"{host}:{port}"] = False
+                resolved["ip"] = socket.gethostbyname(hostname)
+            except OSError:
+                pass
+        
+        lookup = threading.Thread(target=resolve, daemon=True)
+        lookup.start()
+        
+        # Testes em paralelo: o tempo total e o do host mais lento, nao a soma
+        with ThreadPoolExecutor(max_workers=len(test_hosts)) as executor:
+            for (host, port), ok in zip(test_hosts, executor.map(probe, test_hosts)):
+                connectivity[f"{host}:{port}"] = ok
+        
+        # Informativo apenas: DNS lento ou /etc/hosts incorreto nao trava o relatorio
+        lookup.join(LOCAL_IP_TIMEOUT)
+        local_ip = resolved.get("ip", "unresolved")
         
         return {
             "hostname": hostname,
@@ -184,18 +257,22 @@ def save_report(report, filename=None):
         timestamp = report["timestamp"].replace(":", "-").split(".")[0]
         filename = f"config_report_{system}_{timestamp}.json"
     
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    Path(filename).write_bytes(dump_json(report, indent=True))
     
     return filename
 
+def _union_keys(section1, section2):
+    """Chaves presentes em qualquer uma das seções, em ordem alfabética.
+    
+    A união é feita direto nas views de chaves, sem copiar cada lado para um
+    ``set`` antes.
+    """
+    return sorted(section1.keys() | section2.keys())
+
 def compare_reports(report1_file, report2_file):
     """Compara dois relatórios de configuração."""
-    with open(report1_file, "r", encoding="utf-8") as f:
-        report1 = json.load(f)
-    
-    with open(report2_file, "r", encoding="utf-8") as f:
-        report2 = json.load(f)
+    report1 = parse_json(Path(report1_file).read_bytes())
+    report2 = parse_json(Path(report2_file).read_bytes())
     
     print(f"\n{'='*60}")
     print(" COMPARAÇÃO DE CONFIGURAÇÕES")
@@ -223,8 +300,7 @@ def compare_reports(report1_file, report2_file):
     print(" DIFERENÇAS DE AMBIENTE")
     print(f"{'='*40}")
     
-    all_env_keys = set(report1["environment"].keys()) | set(report2["environment"].keys())
-    for key in sorted(all_env_keys):
+    for key in _union_keys(report1["environment"], report2["environment"]):
         val1 = report1["environment"].get(key)
         val2 = report2["environment"].get(key)
         
@@ -238,8 +314,7 @@ def compare_reports(report1_file, report2_file):
     print(" DIFERENÇAS DE PACOTES")
     print(f"{'='*40}")
     
-    all_packages = set(report1["packages"].keys()) | set(report2["packages"].keys())
-    for package in sorted(all_packages):
+    for package in _union_keys(report1["packages"], report2["packages"]):
         pkg1 = report1["packages"].get(package, {})
         pkg2 = report2["packages"].get(package, {})
         
@@ -268,8 +343,7 @@ def compare_reports(report1_file, report2_file):
     conn1 = report1["network"].get("connectivity", {})
     conn2 = report2["network"].get("connectivity", {})
     
-    all_hosts = set(conn1.keys()) | set(conn2.keys())
-    for host in sorted(all_hosts):
+    for host in _union_keys(conn1, conn2):
         status1 = conn1.get(host, False)
         status2 = conn2.get(host, False)
         
@@ -6,21 +6,39 @@ Este script ajuda a identificar diferenças de configuração entre Windows e Li
 que podem causar falhas na inicialização do repositório Azure.
 """
 
+import io
 import os
+import re
+import shutil
+import socket
 import sys
 import subprocess
+import threading
+import time
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import IO, Callable, Mapping, Optional, TextIO, Tuple
 
 from services.env import get_credential_source
+from services.restic_base import build_restic_command
+from services.restic_caps import prefetch as prefetch_restic_caps, restic_output
 from services.restic_client import ResticClient
+from services.restic_common import SPAWN_CLOSE_FDS, iter_json_array
+from services.restic_env import build_restic_env
+# URL do repositorio e ambiente montados como no Windows (e no ResticClient)
+from services.restic import build_repository_url, load_restic_env
 
-# Importar load_restic_env para carregar configurações como no Windows
-try:
-    from services.restic import load_restic_env
-    HAS_RESTIC_SERVICE = True
-except ImportError:
-    HAS_RESTIC_SERVICE = False
+# Codigo de saida do Restic (0.17+) quando o repositorio nao existe, e as
+# mensagens equivalentes de versoes anteriores
+RESTIC_REPO_MISSING_EXIT = 10
+_REPO_MISSING_RE = re.compile(
+    r"Is there a repository at"
+    r"|does not exist"
+    r"|repository not found",
+    re.IGNORECASE,
+)
 
 def print_section(title: str):
     """Imprime uma seção com formatação."""
@@ -28,23 +46,104 @@ def print_section(title: str):
     print(f" {title}")
     print(f"{'='*60}")
 
-def run_command(cmd: str, capture_output: bool = True) -> tuple[int, str, str]:
-    """Executa um comando e retorna código de saída, stdout e stderr."""
+def run_command(cmd: list[str], capture_output: bool = True) -> tuple[int, str, str]:
+    """Executa um comando (sem shell) e retorna código de saída, stdout e stderr."""
     try:
         result = subprocess.run(
-            cmd, shell=True, capture_output=capture_output, text=True
+            cmd, capture_output=capture_output, text=True, close_fds=SPAWN_CLOSE_FDS
         )
         return result.returncode, result.stdout, result.stderr
     except Exception as e:
         return -1, "", str(e)
 
+# Bytes mantidos de cada saida do Restic no teste de conectividade; o
+# restante e lido e descartado (a listagem de um repositorio grande pode ser longa)
+OUTPUT_HEAD_LIMIT = 64 * 1024
+
+def read_head(stream: IO[bytes]) -> str:
+    """Lê o início de ``stream`` (até ``OUTPUT_HEAD_LIMIT``) e descarta o resto."""
+    head = stream.read(OUTPUT_HEAD_LIMIT)
+    while stream.read(OUTPUT_HEAD_LIMIT):
+        pass
+    return head.decode("utf-8", errors="replace")
+
+def summarize_snapshots(stream: IO[bytes]) -> str:
+    """Resume a saída de ``restic snapshots --json`` sem guardar a lista."""
+    count = 0
+    latest = None
+    try:
+        for snapshot in iter_json_array(stream):
+            count += 1
+            latest = snapshot.get("time", latest)
+    except ValueError:
+        # Saída que não é JSON (ex: erro do Restic): o código de saída decide
+        pass
+    read_head(stream)
+    return f"{count} snapshots" + (f", mais recente: {latest}" if latest else "")
+
+def run_bounded(
+    cmd: list[str],
+    env: Mapping[str, str],
+    timeout: float = 30,
+    read_stdout: Callable[[IO[bytes]], str] = read_head,
+) -> Tuple[int, str, str]:
+    """Executa ``cmd`` guardando apenas o início de stdout e stderr.
+    
+    Os pipes são drenados em threads, de forma que a memória usada não
+    depende do tamanho da saída; ``read_stdout`` permite consumir o stdout
+    de outra forma (ex: resumir um JSON). Ao fim de ``timeout`` segundos o
+    processo é encerrado e ``subprocess.TimeoutExpired`` é lançada, como no
+    ``subprocess.run``.
+    """
+    process = subprocess.Popen(
+        cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=SPAWN_CLOSE_FDS
+    )
+    heads: dict[str, str] = {}
+    
+    def drain(name: str, stream: IO[bytes], read: Callable[[IO[bytes]], str]) -> None:
+        heads[name] = read(stream)
+    
+    readers = [
+        threading.Thread(target=drain, args=(name, stream, read), daemon=True)
+        for name, stream, read in (
+            ("stdout", process.stdout, read_stdout),
+            ("stderr", process.stderr, read_head),
+        )
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+        process.stdout.close()
+        process.stderr.close()
+    return returncode, heads["stdout"], heads["stderr"]
+
+def tcp_probe(host: str, port: int = 443, timeout: float = 3) -> Tuple[bool, str]:
+    """Testa se ``host:port`` aceita conexoes TCP, sem depender do ``ping``.
+    
+    Retorna ``(True, latencia)`` em caso de sucesso ou ``(False, erro)``.
+    """
+    start = time.monotonic()
+    try:
+        socket.create_connection((host, port), timeout=timeout).close()
+    except OSError as err:
+        return False, str(err) or type(err).__name__
+    return True, f"{(time.monotonic() - start) * 1000:.0f} ms"
+
 def check_environment():
     """Verifica o ambiente Linux."""
     print_section("DIAGNÓSTICO DO AMBIENTE LINUX")
     
     # Informações do sistema
     print("Sistema Operacional:")
-    code, out, err = run_command("uname -a")
+    code, out, err = run_command(["uname", "-a"])
     print(f"  {out.strip()}")
     
     # Versão do Python
@@ -58,29 +157,35 @@ def check_environment():
     # Verificar conectividade de rede
     print("\nTestando conectividade de rede:")
     test_hosts = [
-        "8.8.8.8",  # Google DNS
-        "azure.microsoft.com",  # Azure
-        "login.microsoftonline.com"  # Azure Auth
+        ("8.8.8.8", 53),  # Google DNS
+        ("azure.microsoft.com", 443),  # Azure
+        ("login.microsoftonline.com", 443)  # Azure Auth
     ]
     
-    for host in test_hosts:
-        code, out, err = run_command(f"ping -c 1 -W 3 {host}")
-        status = "✅ OK" if code == 0 else "❌ FALHA"
-        print(f"  {host}: {status}")
+    # Testes em paralelo: o tempo total e o do host mais lento, nao a soma
+    with ThreadPoolExecutor(max_workers=len(test_hosts)) as executor:
+        hosts, ports = zip(*test_hosts)
+        results = list(executor.map(tcp_probe, hosts, ports))
+    
+    for (host, port), (ok, detail) in zip(test_hosts, results):
+        status = "✅ OK" if ok else "❌ FALHA"
+        print(f"  {host}:{port}: {status} ({detail})")
 
 def check_restic_installation():
     """Verifica a instalação do Restic."""
     print_section("VERIFICAÇÃO DO RESTIC")
     
     # Verificar se restic está no PATH
-    code, out, err = run_command("which restic")
-    if code == 0:
-        print(f"✅ Restic encontrado em: {out.strip()}")
+    restic_path = shutil.which("restic")
+    if restic_path:
+        print(f"✅ Restic encontrado em: {restic_path}")
     else:
         print("❌ Restic não encontrado no PATH")
         return
 
-    client = ResticClient(repository="dummy", env=dict(os.environ), provider="dummy")
+    # Versão e ajuda saem do cache; se ausentes, são obtidas em paralelo
+    prefetch_restic_caps("version", "help")
+    client = get_client()
 
     # Versão do Restic
     try:
@@ -90,6 +195,9 @@ def check_restic_installation():
         print(f"❌ Erro ao obter versão: {err}")
 
     # Testar comando básico
+    if restic_output("help") is not None:
+        print("✅ Comando restic funciona corretamente")
+        return
     success, result, _ = client.run_raw(["help"], check=False)
     if success:
         print("✅ Comando restic funciona corretamente")
@@ -97,45 +205,97 @@ def check_restic_installation():
         stderr = result.stderr if result else ""
         print(f"❌ Erro ao executar restic: {stderr}")
 
+# (repositorio, variaveis, provedor, erro) resolvidos uma unica vez por execucao
+_resolved: Optional[Tuple[Optional[str], Mapping[str, str], Optional[str], Optional[Exception]]] = None
+_resolved_lock = threading.Lock()
+
+def resolved_env() -> Tuple[Optional[str], Mapping[str, str], Optional[str], Optional[Exception]]:
+    """Carrega repositório, variáveis e provedor uma única vez por execução.
+    
+    Usa ``load_restic_env`` como no Windows; se ele não estiver disponível ou
+    falhar, recorre ao ``os.environ`` (com o ``.env`` carregado). O último item
+    é o erro que levou ao fallback, ou None quando ``load_restic_env`` foi usado.
+    As fases executadas em paralelo compartilham o mesmo resultado.
+    """
+    global _resolved
+    with _resolved_lock:
+        if _resolved is None:
+            _resolved = _load_env()
+        return _resolved
+
+def _load_env() -> Tuple[Optional[str], Mapping[str, str], Optional[str], Optional[Exception]]:
+    """Resolve o ambiente do Restic (ver :func:`resolved_env`)."""
+    credential_source = get_credential_source()
+    try:
+        repository, env_vars, provider = load_restic_env(credential_source)
+        if repository:
+            return repository, env_vars, provider, None
+        error: Exception = RuntimeError("repositorio vazio")
+    except Exception as e:
+        error = e
+    
+    # Fallback para carregamento manual: leitura direta, sem copiar o ambiente
+    return (
+        os.getenv("RESTIC_REPOSITORY"),
+        os.environ,
+        os.getenv("STORAGE_PROVIDER"),
+        error,
+    )
+
+@lru_cache(maxsize=1)
+def get_client() -> ResticClient:
+    """Cliente Restic compartilhado, criado a partir do ambiente já resolvido."""
+    repository, env_vars, provider, _ = resolved_env()
+    return ResticClient(
+        repository=repository or "dummy",
+        env=env_vars,
+        provider=provider or "dummy",
+    )
+
+# Variáveis exibidas na verificação de credenciais, na ordem do relatório
+AZURE_REQUIRED_VARS = (
+    "RESTIC_REPOSITORY", "RESTIC_PASSWORD", "AZURE_ACCOUNT_NAME", "AZURE_ACCOUNT_KEY",
+    "STORAGE_PROVIDER", "STORAGE_BUCKET", "CREDENTIAL_SOURCE",
+)
+
+def skip_non_azure() -> bool:
+    """Informa e retorna True se STORAGE_PROVIDER indicar outro provedor que não o Azure.
+    
+    Sem provedor configurado as verificações do Azure continuam, para que a
+    variável ausente apareça no relatório.
+    """
+    _, env_vars, provider, _ = resolved_env()
+    provider = (provider or env_vars.get("STORAGE_PROVIDER") or "").lower()
+    if provider in ("", "azure"):
+        return False
+    print(f"ℹ️  STORAGE_PROVIDER={provider}: verificações do Azure ignoradas")
+    return True
+
 def check_azure_credentials():
     """Verifica as credenciais Azure."""
     print_section("VERIFICAÇÃO DAS CREDENCIAIS AZURE")
     
-    # Tentar usar load_restic_env como no Windows, com fallback para load_dotenv
-    repository = None
-    env_vars = {}
-    provider = None
-    
-    if HAS_RESTIC_SERVICE:
-        try:
-            credential_source = get_credential_source()
-            
-            print(f"🔧 Usando load_restic_env com credential_source='{credential_source}' (como no Windows)")
-            repository, env_vars, provider = load_restic_env(credential_source)
-            print(f"✅ Configurações carregadas via load_restic_env: provider={provider}")
-        except Exception as e:
-            print(f"⚠️  Falha ao usar load_restic_env: {e}")
-            print("🔄 Fallback para carregamento manual...")
-            HAS_RESTIC_SERVICE = False
-    
-    if not HAS_RESTIC_SERVICE or not repository:
-        # Fallback para carregamento manual
-        get_credential_source()
-        env_vars = dict(os.environ)
-        repository = os.getenv("RESTIC_REPOSITORY")
-        provider = os.getenv("STORAGE_PROVIDER")
+    repository, env_vars, provider, error = resolved_env()
+    if error is None:
+        print(f"🔧 Usando load_restic_env com credential_source='{get_credential_source()}' (como no Windows)")
+        print(f"✅ Configurações carregadas via load_restic_env: provider={provider}")
+    else:
+        print(f"⚠️  Falha ao usar load_restic_env: {error}")
+        print("🔄 Fallback para carregamento manual...")
         print("🔧 Usando carregamento manual de .env (modo Linux antigo)")
     
-    # Verificar variáveis essenciais
-    required_vars = {
-        "RESTIC_REPOSITORY": repository or env_vars.get("RESTIC_REPOSITORY"),
-        "RESTIC_PASSWORD": env_vars.get("RESTIC_PASSWORD"),
-        "AZURE_ACCOUNT_NAME": env_vars.get("AZURE_ACCOUNT_NAME"),
-        "AZURE_ACCOUNT_KEY": env_vars.get("AZURE_ACCOUNT_KEY"),
-        "STORAGE_PROVIDER": provider or env_vars.get("STORAGE_PROVIDER"),
-        "STORAGE_BUCKET": env_vars.get("STORAGE_BUCKET"),
-        "CREDENTIAL_SOURCE": env_vars.get("CREDENTIAL_SOURCE", get_credential_source())
+    if skip_non_azure():
+        return
+    
+    # Verificar variáveis essenciais; os valores resolvidos por
+    # load_restic_env têm precedência sobre as variáveis lidas
+    resolved = {
+        "RESTIC_REPOSITORY": repository,
+        "STORAGE_PROVIDER": provider,
+        "STORAGE_BUCKET": os.getenv("STORAGE_BUCKET"),
     }
+    required_vars = {var: resolved.get(var) or env_vars.get(var) for var in AZURE_REQUIRED_VARS}
+    required_vars["CREDENTIAL_SOURCE"] = required_vars["CREDENTIAL_SOURCE"] or get_credential_source()
     
     print("Variáveis de ambiente:")
     for var, value in required_vars.items():
@@ -149,7 +309,7 @@ def check_azure_credentials():
     
     # Verificar se o repositório está sendo construído corretamente
     if required_vars["STORAGE_PROVIDER"] == "azure" and required_vars["STORAGE_BUCKET"]:
-        expected_repo = f"azure:{required_vars['STORAGE_BUCKET']}:restic"
+        expected_repo = build_repository_url("azure", required_vars["STORAGE_BUCKET"])
         actual_repo = required_vars["RESTIC_REPOSITORY"]
         
         print(f"\nRepositório esperado: {expected_repo}")
@@ -164,27 +324,15 @@ def test_azure_connectivity():
     """Testa conectividade específica com Azure."""
     print_section("TESTE DE CONECTIVIDADE AZURE")
     
-    # Usar a mesma lógica de carregamento da função anterior
-    repository = None
-    env_vars = {}
-    provider = None
+    if skip_non_azure():
+        return
     
-    if HAS_RESTIC_SERVICE:
-        try:
-            credential_source = get_credential_source()
-            repository, env_vars, provider = load_restic_env(credential_source)
-        except Exception:
-            get_credential_source()
-            env_vars = dict(os.environ)
-            repository = os.getenv("RESTIC_REPOSITORY")
-    else:
-        get_credential_source()
-        env_vars = dict(os.environ)
-        repository = os.getenv("RESTIC_REPOSITORY")
+    # Mesmo ambiente ja resolvido para a verificacao de credenciais
+    repository, env_vars, _, _ = resolved_env()
     
     account_name = env_vars.get("AZURE_ACCOUNT_NAME")
     account_key = env_vars.get("AZURE_ACCOUNT_KEY")
-    storage_bucket = env_vars.get("STORAGE_BUCKET")
+    storage_bucket = os.getenv("STORAGE_BUCKET")
     
     if not all([account_name, account_key, storage_bucket]):
         print("❌ Credenciais Azure incompletas")
@@ -193,14 +341,15 @@ def test_azure_connectivity():
     # Testar com restic diretamente
     print("Testando acesso direto com restic...")
     
-    # Configurar ambiente para o teste
-    env = os.environ.copy()
+    # Configurar ambiente para o teste: apenas o que o Restic usa, com o
+    # mesmo filtro aplicado pelo ResticClient
+    env = build_restic_env()
     env["AZURE_ACCOUNT_NAME"] = account_name
     env["AZURE_ACCOUNT_KEY"] = account_key
     env["RESTIC_PASSWORD"] = env_vars.get("RESTIC_PASSWORD", "test")
     
     # Usar o repositório construído pelo load_restic_env se disponível
-    repo = repository if repository else f"azure:{storage_bucket}:restic"
+    repo = repository if repository else build_repository_url("azure", storage_bucket)
     print(f"📍 Repositório a ser testado: {repo}")
     if repository:
         print("✅ Repositório construído via load_restic_env (como Windows)")
@@ -209,66 +358,79 @@ def test_azure_connectivity():
     
     # Teste 1: Listar snapshots (deve falhar se repo não existe)
     print(f"\nTeste 1: Tentando listar snapshots em {repo}")
-    cmd = f"restic -r {repo} snapshots"
+    cmd = build_restic_command("snapshots", "--json", repository=repo)
     
     try:
-        result = subprocess.run(
-            cmd, shell=True, env=env, capture_output=True, text=True, timeout=30
-        )
+        code, summary, err = run_bounded(cmd, env, timeout=30, read_stdout=summarize_snapshots)
         
-        if result.returncode == 0:
+        if code == 0:
             print("✅ Repositório existe e é acessível")
-            print(f"Snapshots encontrados:\n{result.stdout}")
+            print(f"Snapshots encontrados: {summary}")
         else:
-            print(f"❌ Erro ao acessar repositório: {result.stderr}")
+            print(f"❌ Erro ao acessar repositório: {err}")
+            
+            # Falhas de rede ou autenticação fariam o init falhar da mesma
+            # forma: analisar o erro sem iniciar outro processo do Restic
+            if code != RESTIC_REPO_MISSING_EXIT and not _REPO_MISSING_RE.search(err):
+                analyze_error(err)
+                return
             
             # Teste 2: Tentar inicializar
             print(f"\nTeste 2: Tentando inicializar repositório")
-            init_cmd = f"restic -r {repo} init"
+            init_cmd = build_restic_command("init", repository=repo)
             
-            init_result = subprocess.run(
-                init_cmd, shell=True, env=env, capture_output=True, text=True, timeout=30
-            )
+            init_code, _, init_err = run_bounded(init_cmd, env, timeout=30)
             
-            if init_result.returncode == 0:
+            if init_code == 0:
                 print("✅ Repositório inicializado com sucesso")
             else:
-                print(f"❌ Erro na inicialização: {init_result.stderr}")
+                print(f"❌ Erro na inicialização: {init_err}")
                 
                 # Análise detalhada do erro
-                analyze_error(init_result.stderr)
+                analyze_error(init_err)
                 
     except subprocess.TimeoutExpired:
         print("❌ Timeout na operação (>30s)")
     except Exception as e:
         print(f"❌ Erro inesperado: {e}")
 
+# Classes de erro em ordem de prioridade, com as sugestoes exibidas
+ERROR_SUGGESTIONS = {
+    "connection": ("Problema de conectividade de rede", "Verifique firewall e proxy"),
+    "auth": ("Problema de autenticação", "Verifique AZURE_ACCOUNT_NAME e AZURE_ACCOUNT_KEY"),
+    "not_found": ("Container não existe", "Verifique STORAGE_BUCKET no portal Azure"),
+    "timeout": ("Timeout de rede", "Problema de conectividade ou proxy"),
+    "permission": ("Problema de permissões", "Verifique se a chave tem acesso ao container"),
+}
+
+# Todas as classes em uma unica expressao, percorrida uma vez por erro
+_ERROR_CLASSIFIER = re.compile(
+    r"(?P<connection>connection refused)"
+    r"|(?P<auth>authentication|unauthorized)"
+    r"|(?P<not_found>not found|does not exist)"
+    r"|(?P<timeout>timeout)"
+    r"|(?P<permission>permission|forbidden)",
+    re.IGNORECASE,
+)
+
+_ERROR_PRIORITY = {name: index for index, name in enumerate(ERROR_SUGGESTIONS)}
+
 def analyze_error(error_output: str):
     """Analisa a saída de erro e sugere soluções."""
     print("\n🔍 ANÁLISE DO ERRO:")
     
-    error_lower = error_output.lower()
-    
-    if "connection refused" in error_lower:
-        print("  • Problema de conectividade de rede")
-        print("  • Verifique firewall e proxy")
-    
-    elif "authentication" in error_lower or "unauthorized" in error_lower:
-        print("  • Problema de autenticação")
-        print("  • Verifique AZURE_ACCOUNT_NAME e AZURE_ACCOUNT_KEY")
-    
-    elif "not found" in error_lower or "does not exist" in error_lower:
-        print("  • Container não existe")
-        print("  • Verifique STORAGE_BUCKET no portal Azure")
-    
-    elif "timeout" in error_lower:
-        print("  • Timeout de rede")
-        print("  • Problema de conectividade ou proxy")
-    
-    elif "permission" in error_lower or "forbidden" in error_lower:
-        print("  • Problema de permissões")
-        print("  • Verifique se a chave tem acesso ao container")
-    
+    # Entre as classes encontradas vale a de maior prioridade; a varredura
+    # para assim que a primeira classe da tabela aparece
+    best: Optional[str] = None
+    for match in _ERROR_CLASSIFIER.finditer(error_output):
+        if best is None or _ERROR_PRIORITY[match.lastgroup] < _ERROR_PRIORITY[best]:
+            best = match.lastgroup
+            if _ERROR_PRIORITY[best] == 0:
+                break
+    if best is not None:
+        problem, hint = ERROR_SUGGESTIONS[best]
+        print(f"  • {problem}")
+        print(f"  • {hint}")
     else:
         print("  • Erro não reconhecido")
         print(f"  • Erro completo: {error_output}")
@@ -277,36 +439,80 @@ def check_python_dependencies():
     """Verifica dependências Python."""
     print_section("VERIFICAÇÃO DAS DEPENDÊNCIAS PYTHON")
     
-    # Verificar python-dotenv
-    try:
-        from dotenv import load_dotenv
-        print("[OK] python-dotenv: OK")
-    except ImportError:
-        print("[X] python-dotenv: NÃO INSTALADO")
+    # Os metadados da distribuição instalada bastam: nenhum módulo é
+    # importado (o keyring, por exemplo, inicializa backends e pode acessar
+    # o D-Bus ao ser importado)
+    import importlib.metadata
     
-    # Verificar keyring
-    try:
-        import keyring
-        print("[OK] keyring: OK")
-    except ImportError:
-        print("[X] keyring: NÃO INSTALADO")
+    for name, dist in (
+        ("python-dotenv", "python-dotenv"),
+        ("keyring", "keyring"),
+        ("pythonjsonlogger", "python-json-logger"),
+    ):
+        try:
+            print(f"[OK] {name}: OK ({importlib.metadata.version(dist)})")
+        except importlib.metadata.PackageNotFoundError:
+            print(f"[X] {name}: NÃO INSTALADO")
+
+class _ThreadLocalStdout(io.TextIOBase):
+    """Stdout que grava no buffer da thread atual, se houver um."""
+    
+    def __init__(self, default: TextIO) -> None:
+        self.default = default
+        self.local = threading.local()
     
-    # Verificar pythonjsonlogger
+    def write(self, text: str) -> int:
+        return getattr(self.local, "buffer", self.default).write(text)
+    
+    def flush(self) -> None:
+        getattr(self.local, "buffer", self.default).flush()
+
+def run_concurrently(*phases: Callable[[], None]) -> None:
+    """Executa fases independentes em paralelo e imprime a saída na ordem dada.
+    
+    Cada fase escreve em um buffer próprio, de forma que as saídas não se
+    misturam. Se uma fase falhar, a saída das anteriores é impressa e a
+    exceção é relançada, como na execução sequencial.
+    """
+    original = sys.stdout
+    proxy = _ThreadLocalStdout(original)
+    
+    def run(phase: Callable[[], None]) -> Tuple[str, Optional[BaseException]]:
+        buffer = io.StringIO()
+        proxy.local.buffer = buffer
+        try:
+            phase()
+            return buffer.getvalue(), None
+        except Exception as exc:
+            return buffer.getvalue(), exc
+        finally:
+            del proxy.local.buffer
+    
+    sys.stdout = proxy
     try:
-        import pythonjsonlogger
-        print("[OK] pythonjsonlogger: OK")
-    except ImportError:
-        print("[X] pythonjsonlogger: NÃO INSTALADO")
+        with ThreadPoolExecutor(max_workers=len(phases)) as executor:
+            results = list(executor.map(run, phases))
+    finally:
+        sys.stdout = original
+    
+    for output, exc in results:
+        original.write(output)
+        if exc is not None:
+            raise exc
 
 def main():
     """Função principal."""
     print("🔍 DIAGNÓSTICO AZURE LINUX - SafeStic")
     print("Este script ajuda a identificar problemas específicos do Linux")
     
-    check_environment()
-    check_python_dependencies()
-    check_restic_installation()
-    check_azure_credentials()
+    # Fases independentes em paralelo (o ambiente resolvido é compartilhado);
+    # o teste de conectividade usa as credenciais e roda por último
+    run_concurrently(
+        check_environment,
+        check_python_dependencies,
+        check_restic_installation,
+        check_azure_credentials,
+    )
     test_azure_connectivity()
     
     print_section("RESUMO E PRÓXIMOS PASSOS")
@@ -3,7 +3,6 @@
 
 from __future__ import annotations
 
-import os
 import sys
 
 from services.script import ResticScript
@@ -12,6 +11,7 @@ from services.restic_client import (
     ResticError,
 )
 from services.env import get_credential_source
+from services.snapshot_cache import invalidate_snapshots
 
 
 def main() -> int:
@@ -26,31 +26,26 @@ def main() -> int:
                 credential_source=credential_source,
             )
 
-            if os.getenv("RETENTION_ENABLED", "true").lower() != "true":
+            if ctx.retention is None:
+                ctx.log("Configuracao de retencao indisponivel", level="ERROR")
+                return 1
+
+            if not ctx.retention.enabled:
                 ctx.log("Retencao desabilitada. Nenhum snapshot sera esquecido.")
                 return 0
 
-            keep_hourly = int(os.getenv("KEEP_HOURLY", "24"))
-            keep_daily = int(os.getenv("KEEP_DAILY", "7"))
-            keep_weekly = int(os.getenv("KEEP_WEEKLY", "4"))
-            keep_monthly = int(os.getenv("KEEP_MONTHLY", "12"))
-            tags = [t.strip() for t in os.getenv("RESTIC_TAGS", "").split(",") if t.strip()]
+            # Mesma politica do backup: lida uma unica vez por load_restic_config
+            policy = ctx.retention.as_kwargs()
 
             ctx.log(
-                "Aplicando politica de retencao: h=%s, d=%s, w=%s, m=%s", 
-                keep_hourly,
-                keep_daily,
-                keep_weekly,
-                keep_monthly,
+                "Aplicando politica de retencao: h=%s, d=%s, w=%s, m=%s, y=%s",
+                *policy.values(),
             )
 
-            if client.forget_snapshots(
-                keep_hourly=keep_hourly,
-                keep_daily=keep_daily,
-                keep_weekly=keep_weekly,
-                keep_monthly=keep_monthly,
-                tags=tags,
-            ):
+            forgotten = client.forget_snapshots(**policy, tags=ctx.tags)
+            invalidate_snapshots(ctx.repository)
+
+            if forgotten:
                 ctx.log("Snapshots esquecidos com sucesso.")
                 return 0
 
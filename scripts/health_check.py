@@ -4,10 +4,13 @@ Script de verificacao de saude completa do sistema SafeStic
 Verifica todas as dependencias, configuracoes e funcionalidades
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
@@ -17,10 +20,24 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from services.logger import setup_logger
 from services.restic import load_restic_config, load_restic_env
 from services.restic_client import ResticClient
+from services.restic_env import build_restic_env
 from services.env import get_credential_source
 
 logger = setup_logger(__name__)
 
+# Evita abrir uma janela de console por processo no Windows
+NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+@lru_cache(maxsize=512)
+def path_exists(path: str) -> bool:
+    """``os.path.exists`` memorizado durante uma verificacao de saude.
+    
+    Os mesmos caminhos aparecem em mais de uma verificacao (ex: diretorios de
+    backup, ja verificados ao validar a configuracao); o cache e limpo no
+    inicio de cada ``run_health_check``.
+    """
+    return os.path.exists(path)
+
 class HealthChecker:
     """Verificador de saude do sistema SafeStic"""
     
@@ -44,32 +61,48 @@ class HealthChecker:
         elif status == "ERROR":
             self.errors.append(f"{category} - {item}: {details}")
     
-    def check_command(self, command: str, name: str) -> bool:
-        """Verifica se um comando esta disponivel"""
+    def probe_command(self, command: str, name: str) -> Tuple[str, str, str, str]:
+        """Verifica se um comando esta disponivel, sem registrar o resultado.
+        
+        Retorna os argumentos de ``add_result``; pode ser chamado de outras
+        threads, pois nao altera o estado do verificador.
+        """
         try:
             # Restic usa método dedicado para obter versão
             if command == "restic":
-                client = ResticClient(repository="dummy", env=dict(os.environ), provider="dummy")
+                client = ResticClient(repository="dummy", env=build_restic_env(), provider="dummy")
                 version = client.get_version().split('\n')[0]
-                self.add_result("Dependencias", name, "OK", version)
-                return True
+                return "Dependencias", name, "OK", version
             result = subprocess.run([command, "--version"],
-                                    capture_output=True, text=True, timeout=10)
+                                    capture_output=True, text=True, timeout=10,
+                                    creationflags=NO_WINDOW)
             if result.returncode == 0:
                 version = result.stdout.strip().split('\n')[0]
-                self.add_result("Dependencias", name, "OK", version)
-                return True
-            self.add_result("Dependencias", name, "ERROR", "Comando falhou")
-            return False
+                return "Dependencias", name, "OK", version
+            return "Dependencias", name, "ERROR", "Comando falhou"
         except FileNotFoundError:
-            self.add_result("Dependencias", name, "ERROR", "Comando nao encontrado")
-            return False
+            return "Dependencias", name, "ERROR", "Comando nao encontrado"
         except subprocess.TimeoutExpired:
-            self.add_result("Dependencias", name, "ERROR", "Timeout na verificacao")
-            return False
+            return "Dependencias", name, "ERROR", "Timeout na verificacao"
         except Exception as e:
-            self.add_result("Dependencias", name, "ERROR", str(e))
-            return False
+            return "Dependencias", name, "ERROR", str(e)
+    
+    def check_command(self, command: str, name: str) -> bool:
+        """Verifica se um comando esta disponivel"""
+        result = self.probe_command(command, name)
+        self.add_result(*result)
+        return result[2] == "OK"
+    
+    def check_commands(self, commands: List[Tuple[str, str]]):
+        """Verifica varios comandos em paralelo.
+        
+        Cada verificacao e dominada pela espera do processo filho; os
+        resultados sao registrados na thread principal, na ordem dada.
+        """
+        with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+            results = list(executor.map(lambda item: self.probe_command(*item), commands))
+        for result in results:
+            self.add_result(*result)
     
     def check_python_packages(self):
         """Verifica pacotes Python necessarios"""
@@ -83,10 +116,10 @@ class HealthChecker:
         }
         
         for package_name, import_name in required_packages.items():
-            try:
-                __import__(import_name)
-                self.add_result("Python Packages", package_name, "OK", "Importado com sucesso")
-            except ImportError:
+            # find_spec localiza o pacote sem executar seu __init__
+            if importlib.util.find_spec(import_name) is not None:
+                self.add_result("Python Packages", package_name, "OK", "Pacote instalado")
+            else:
                 self.add_result("Python Packages", package_name, "ERROR", "Pacote nao encontrado")
     
     def check_files_and_directories(self):
@@ -102,7 +135,7 @@ class HealthChecker:
         ]
         
         for file_path in essential_files:
-            if Path(file_path).exists():
+            if path_exists(file_path):
                 self.add_result("Arquivos", file_path, "OK", "Arquivo existe")
             else:
                 self.add_result("Arquivos", file_path, "ERROR", "Arquivo nao encontrado")
@@ -110,7 +143,7 @@ class HealthChecker:
         # Verificar diretorios
         essential_dirs = ["services", "scripts", "logs"]
         for dir_path in essential_dirs:
-            if Path(dir_path).exists():
+            if path_exists(dir_path):
                 self.add_result("Diretorios", dir_path, "OK", "Diretorio existe")
             else:
                 if dir_path == "logs":
@@ -143,7 +176,7 @@ class HealthChecker:
                 
                 # Verificar se diretorios de backup existem
                 for dir_path in config.backup_source_dirs:
-                    if Path(dir_path).exists():
+                    if path_exists(dir_path):
                         self.add_result("Diretorios de Backup", dir_path, "OK", "Diretorio existe")
                     else:
                         self.add_result("Diretorios de Backup", dir_path, "WARNING", "Diretorio nao encontrado")
@@ -186,12 +219,16 @@ class HealthChecker:
     def check_winfsp(self):
         """Verifica se WinFsp esta instalado (Windows)"""
         if os.name == 'nt':  # Windows
-            winfsp_paths = [
-                Path("C:/Program Files (x86)/WinFsp/bin/launchctl-x64.exe"),
-                Path("C:/Program Files/WinFsp/bin/launchctl-x64.exe")
-            ]
-            
-            winfsp_found = any(path.exists() for path in winfsp_paths)
+            # ProgramFiles primeiro: no Windows 64 bits o caminho (x86) raramente existe
+            winfsp_found = any(
+                os.path.isfile(os.path.join(
+                    os.environ.get(variable, default), "WinFsp", "bin", "launchctl-x64.exe"
+                ))
+                for variable, default in (
+                    ("ProgramFiles", "C:/Program Files"),
+                    ("ProgramFiles(x86)", "C:/Program Files (x86)"),
+                )
+            )
             
             if winfsp_found:
                 self.add_result("Sistema", "WinFsp", "OK", "WinFsp instalado (mount disponivel)")
@@ -200,7 +237,7 @@ class HealthChecker:
                               "WinFsp nao encontrado (mount nao disponivel)")
         else:
             # Linux/macOS - verificar FUSE
-            if Path("/usr/bin/fusermount").exists() or Path("/bin/fusermount").exists():
+            if path_exists("/usr/bin/fusermount") or path_exists("/bin/fusermount"):
                 self.add_result("Sistema", "FUSE", "OK", "FUSE disponivel (mount disponivel)")
             else:
                 self.add_result("Sistema", "FUSE", "WARNING", 
@@ -227,13 +264,18 @@ class HealthChecker:
         print(" SafeStic - Verificacao de Saude do Sistema")
         print("=" * 50)
         
+        # Cada execucao parte do estado atual do disco
+        path_exists.cache_clear()
+        
         # Verificar dependencias do sistema
         print("\n Verificando dependencias do sistema...")
-        self.check_command("git", "Git")
-        self.check_command("make", "Make")
-        self.check_command("python", "Python")
-        self.check_command("pip", "pip")
-        self.check_command("restic", "Restic")
+        self.check_commands([
+            ("git", "Git"),
+            ("make", "Make"),
+            ("python", "Python"),
+            ("pip", "pip"),
+            ("restic", "Restic"),
+        ])
         
         # Verificar ambiente virtual
         print("\n Verificando ambiente Python...")
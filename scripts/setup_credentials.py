@@ -22,6 +22,7 @@ import sys
 import getpass
 import re
 import argparse
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 
@@ -42,6 +43,14 @@ except ImportError:
     load_dotenv = None
 
 
+@lru_cache(maxsize=1)
+def get_app_name() -> str:
+    """Obtém o APP_NAME do .env, lendo o arquivo uma única vez por execução."""
+    if load_dotenv:
+        load_dotenv(project_root / '.env')
+    return os.getenv('APP_NAME', 'safestic')
+
+
 def load_env_config() -> Dict[str, str]:
     """Carrega configurações do arquivo .env."""
     env_file = project_root / '.env'
@@ -146,10 +155,7 @@ def setup_restic_password(source: str, non_interactive: bool = False) -> bool:
     print("   - GUARDE esta senha em local seguro")
     print("   - SEM esta senha, você NÃO conseguirá restaurar seus backups")
     
-    # Obter APP_NAME do .env
-    if load_dotenv:
-        load_dotenv()
-    app_name = os.getenv('APP_NAME', 'safestic')
+    app_name = get_app_name()
     
     # Aviso sobre APP_NAME para keyring
     if source == 'keyring':
@@ -413,10 +419,7 @@ def save_credentials(credentials: Dict[str, str], source: str) -> bool:
     """Salva credenciais na fonte especificada."""
     try:
         if source == 'keyring' and keyring:
-            # Obter APP_NAME do .env
-            if load_dotenv:
-                load_dotenv()
-            app_name = os.getenv('APP_NAME', 'safestic')
+            app_name = get_app_name()
             
             for key, value in credentials.items():
                 keyring.set_password(app_name, key, value)
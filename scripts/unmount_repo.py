@@ -21,26 +21,20 @@ def load_config():
     return True
 
 def unmount_linux(mount_path):
-    """Desmonta no Linux usando fusermount"""
-    try:
-        cmd = ['fusermount', '-u', mount_path]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Erro ao desmontar (fusermount): {e.stderr}")
-        return False
-    except FileNotFoundError:
-        # Tentar com umount
+    """Desmonta no Linux usando fusermount (ou umount, se ele nao existir)"""
+    for tool in ('fusermount', 'umount'):
+        cmd = [tool, '-u', mount_path] if tool == 'fusermount' else [tool, mount_path]
         try:
-            cmd = ['umount', mount_path]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"Erro ao desmontar (umount): {e.stderr}")
-            return False
+            result = subprocess.run(cmd, capture_output=True, text=True)
         except FileNotFoundError:
-            print("Nem fusermount nem umount encontrados")
+            continue
+        if result.returncode != 0:
+            print(f"Erro ao desmontar ({tool}): {result.stderr}")
             return False
+        return True
+    
+    print("Nem fusermount nem umount encontrados")
+    return False
 
 def unmount_windows(mount_path):
     """Desmonta no Windows"""
@@ -54,6 +54,13 @@ def validate_required_vars():
     print("OK: Todas as variaveis obrigatorias estao configuradas")
     return True
 
+# Nome exibido e credenciais obrigatorias de cada provedor em nuvem
+CLOUD_PROVIDERS = {
+    'aws': ('AWS', ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY')),
+    'azure': ('Azure', ('AZURE_ACCOUNT_NAME', 'AZURE_ACCOUNT_KEY')),
+    'gcp': ('GCP', ('GOOGLE_PROJECT_ID', 'GOOGLE_APPLICATION_CREDENTIALS')),
+}
+
 def validate_storage_config():
     """Valida configuracao de armazenamento"""
     provider = os.getenv('STORAGE_PROVIDER', '').lower()
@@ -69,41 +76,25 @@ def validate_storage_config():
             print(f"❌ Erro ao criar diretorio de backup: {e}")
             return False
     
-    elif provider == 'aws':
-        aws_vars = ['AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY']
-        manager = get_manager(credential_source)
-        missing = [var for var in aws_vars if not manager.get_credential(var)]
-        if missing:
-            print(f"❌ Variaveis AWS faltando: {missing}")
-            return False
-        print("✅ Configuracao AWS valida")
-        return True
-
-    elif provider == 'azure':
-        azure_vars = ['AZURE_ACCOUNT_NAME', 'AZURE_ACCOUNT_KEY']
-        manager = get_manager(credential_source)
-        missing = [var for var in azure_vars if not manager.get_credential(var)]
-        if missing:
-            print(f"❌ Variaveis Azure faltando: {missing}")
-            return False
-        print("✅ Configuracao Azure valida")
-        return True
-
-    elif provider == 'gcp':
-        manager = get_manager(credential_source)
-        gcp_project = manager.get_credential('GOOGLE_PROJECT_ID')
-        gcp_creds = manager.get_credential('GOOGLE_APPLICATION_CREDENTIALS')
-        if not gcp_project or not gcp_creds or not Path(gcp_creds).exists():
-            print("❌ Credenciais GCP nao encontradas")
-            return False
-        print("✅ Configuracao GCP valida")
-        return True
-    
-    else:
+    cloud = CLOUD_PROVIDERS.get(provider)
+    if cloud is None:
         print(f"❌ Provedor de armazenamento invalido: {provider}")
         print("💡 Valores validos: local, aws, azure, gcp")
         return False
 
+    label, keys = cloud
+    values = get_manager(credential_source).get_credentials(keys)
+    missing = [var for var in keys if not values.get(var)]
+    if missing:
+        print(f"❌ Variaveis {label} faltando: {missing}")
+        return False
+    gcp_creds = values.get('GOOGLE_APPLICATION_CREDENTIALS')
+    if gcp_creds and not os.path.exists(gcp_creds):
+        print(f"❌ Arquivo de credenciais GCP nao encontrado: {gcp_creds}")
+        return False
+    print(f"✅ Configuracao {label} valida")
+    return True
+
 def validate_backup_dirs():
     """Valida diretorios de backup"""
     dirs_str = os.getenv('BACKUP_SOURCE_DIRS', '')
@@ -4,6 +4,7 @@ Script de validacao completa do setup SafeStic
 Valida se o sistema esta corretamente configurado e pronto para uso
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
@@ -84,10 +85,10 @@ class SetupValidator:
         }
         
         for package_name, (import_name, description) in critical_packages.items():
-            try:
-                __import__(import_name)
+            # find_spec localiza o pacote sem executar seu __init__
+            if importlib.util.find_spec(import_name) is not None:
                 self.add_result("Pacotes Python", package_name, "OK", description)
-            except ImportError:
+            else:
                 self.add_result("Pacotes Python", package_name, "ERROR", 
                               f"{description} - Pacote nao encontrado", critical=True)
     
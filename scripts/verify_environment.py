@@ -1,15 +1,16 @@
 #!/usr/bin/env python3
 """Script para verificar e corrigir o ambiente antes de executar make check."""
 
+import importlib.util
 import sys
 import os
 import subprocess
 from pathlib import Path
 
 def run_command(cmd, capture_output=True):
-    """Executa um comando e retorna o resultado."""
+    """Executa um comando (lista de argumentos, sem shell) e retorna o resultado."""
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=capture_output, text=True)
+        result = subprocess.run(cmd, capture_output=capture_output, text=True)
         return result.returncode == 0, result.stdout, result.stderr
     except Exception as e:
         return False, "", str(e)
@@ -38,10 +39,10 @@ def check_dependencies():
     
     missing = []
     for dep in critical_deps:
-        try:
-            __import__(dep)
+        # find_spec localiza o pacote sem executar seu __init__
+        if importlib.util.find_spec(dep) is not None:
             print(f"✅ {dep}: OK")
-        except ImportError:
+        else:
             print(f"❌ {dep}: FALTANDO")
             missing.append(dep)
     
@@ -72,7 +73,7 @@ def reinstall_dependencies():
     print("\n🔧 Reinstalando dependências...")
     
     # Tentar instalar via pyproject.toml
-    success, stdout, stderr = run_command(f"{sys.executable} -m pip install -e .")
+    success, stdout, stderr = run_command([sys.executable, "-m", "pip", "install", "-e", "."])
     if success:
         print("✅ Dependências principais instaladas via pyproject.toml")
     else:
@@ -81,7 +82,7 @@ def reinstall_dependencies():
         # Fallback para requirements.txt
         if Path('requirements.txt').exists():
             print("Tentando instalar via requirements.txt...")
-            success, stdout, stderr = run_command(f"{sys.executable} -m pip install -r requirements.txt")
+            success, stdout, stderr = run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
             if success:
                 print("✅ Dependências instaladas via requirements.txt")
             else:
@@ -15,11 +15,13 @@ import os
 import json
 import logging
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional, Any, Union, cast
+from typing import Dict, List, Optional, Any, Sequence, Union, cast
 
-from dotenv import load_dotenv
+from .env import ensure_env_loaded
+from .restic_common import SPAWN_CLOSE_FDS
 
 # Importacao condicional do keyring
 try:
@@ -32,6 +34,9 @@ except ImportError:
 # Configuracao de logging
 logger = logging.getLogger(__name__)
 
+# Limite de segredos por chamada do BatchGetSecretValue da AWS
+AWS_BATCH_SIZE = 20
+
 
 class CredentialSource(str, Enum):
     """Fontes possiveis para obtencao de credenciais."""
@@ -92,7 +97,7 @@ class CredentialManager:
     def _ensure_env_loaded(self) -> None:
         """Garante que as variaveis de ambiente foram carregadas."""
         if not self._loaded_env:
-            load_dotenv()
+            ensure_env_loaded()
             self._loaded_env = True
 
     def get_credential(self, key: str) -> Optional[str]:
@@ -112,22 +117,68 @@ class CredentialManager:
         
         # Tentar obter da fonte primaria
         try:
-            if self.credential_source == CredentialSource.KEYRING:
-                value = self._get_from_keyring(key)
-            elif self.credential_source == CredentialSource.AWS_SECRETS:
-                value = self._get_from_aws_secrets(key)
-            elif self.credential_source == CredentialSource.AZURE_KEYVAULT:
-                value = self._get_from_azure_keyvault(key)
-            elif self.credential_source == CredentialSource.GCP_SECRETS:
-                value = self._get_from_gcp_secrets(key)
-            elif self.credential_source == CredentialSource.SOPS:
-                value = self._get_from_sops(key)
-            else:  # CredentialSource.ENV
-                value = os.getenv(key)
+            value = self._get_from_source(key)
         except Exception as e:
             logger.error(f"Erro ao obter credencial {key}: {str(e)}")
             
-        # Fallback para variaveis de ambiente se necessario
+        return self._with_env_fallback(key, value)
+
+    def get_credentials(self, keys: Sequence[str]) -> Dict[str, Optional[str]]:
+        """Obtem varias credenciais com o minimo de acessos a fonte.
+        
+        O arquivo SOPS e descriptografado uma unica vez, o AWS Secrets Manager
+        e consultado com ``BatchGetSecretValue`` e os cofres do Azure e do GCP
+        sao consultados em paralelo. Demais fontes consultam chave a chave.
+        
+        Parameters
+        ----------
+        keys : Sequence[str]
+            Nomes das credenciais a serem obtidas
+            
+        Returns
+        -------
+        Dict[str, Optional[str]]
+            Valor de cada credencial, ou None se nao encontrada
+        """
+        keys = list(dict.fromkeys(keys))
+        values: Dict[str, Optional[str]] = {}
+        
+        try:
+            if self.credential_source == CredentialSource.SOPS:
+                decrypted = self._decrypt_sops()
+                values = {key: decrypted.get(key) for key in keys}
+            elif self.credential_source == CredentialSource.AWS_SECRETS:
+                values = self._get_many_from_aws_secrets(keys)
+            elif self.credential_source in (
+                CredentialSource.AZURE_KEYVAULT,
+                CredentialSource.GCP_SECRETS,
+            ):
+                with ThreadPoolExecutor(max_workers=max(1, len(keys))) as executor:
+                    values = dict(zip(keys, executor.map(self._get_from_source, keys)))
+            else:
+                values = {key: self._get_from_source(key) for key in keys}
+        except Exception as e:
+            logger.error(f"Erro ao obter credenciais {', '.join(keys)}: {str(e)}")
+        
+        return {key: self._with_env_fallback(key, values.get(key)) for key in keys}
+
+    def _get_from_source(self, key: str) -> Optional[str]:
+        """Obtem uma credencial apenas da fonte primaria, sem fallback."""
+        if self.credential_source == CredentialSource.KEYRING:
+            return self._get_from_keyring(key)
+        elif self.credential_source == CredentialSource.AWS_SECRETS:
+            return self._get_from_aws_secrets(key)
+        elif self.credential_source == CredentialSource.AZURE_KEYVAULT:
+            return self._get_from_azure_keyvault(key)
+        elif self.credential_source == CredentialSource.GCP_SECRETS:
+            return self._get_from_gcp_secrets(key)
+        elif self.credential_source == CredentialSource.SOPS:
+            return self._get_from_sops(key)
+        else:  # CredentialSource.ENV
+            return os.getenv(key)
+
+    def _with_env_fallback(self, key: str, value: Optional[str]) -> Optional[str]:
+        """Aplica o fallback para variaveis de ambiente se necessario."""
         if value is None and self.fallback_to_env and self.credential_source != CredentialSource.ENV:
             self._ensure_env_loaded()
             value = os.getenv(key)
@@ -164,13 +215,7 @@ class CredentialManager:
             
             # O segredo pode estar em SecretString ou SecretBinary
             if 'SecretString' in response:
-                secret = response['SecretString']
-                # O segredo pode ser um JSON ou uma string simples
-                try:
-                    secret_dict = json.loads(secret)
-                    return secret_dict.get(key)
-                except json.JSONDecodeError:
-                    return secret
+                return self._parse_aws_secret(key, response['SecretString'])
             
             return None
         except ImportError:
@@ -180,6 +225,49 @@ class CredentialManager:
             logger.error(f"Erro ao acessar AWS Secrets Manager: {str(e)}")
             return None
 
+    def _get_many_from_aws_secrets(self, keys: List[str]) -> Dict[str, Optional[str]]:
+        """Obtem varias credenciais do AWS Secrets Manager em lotes."""
+        try:
+            import boto3
+        except ImportError:
+            logger.error("Modulo boto3 nao instalado. Instale com 'pip install boto3'")
+            return {}
+        
+        client = boto3.client('secretsmanager')
+        if not hasattr(client, "batch_get_secret_value"):  # boto3 < 1.34
+            return {key: self._get_from_aws_secrets(key) for key in keys}
+        
+        names = {f"{self.app_name}/{key}": key for key in keys}
+        values: Dict[str, Optional[str]] = {}
+        secret_names = list(names)
+        try:
+            for start in range(0, len(secret_names), AWS_BATCH_SIZE):
+                response = client.batch_get_secret_value(
+                    SecretIdList=secret_names[start:start + AWS_BATCH_SIZE]
+                )
+                for secret in response.get("SecretValues", []):
+                    key = names.get(secret.get("Name", ""))
+                    if key and "SecretString" in secret:
+                        values[key] = self._parse_aws_secret(key, secret["SecretString"])
+                for error in response.get("Errors", []):
+                    logger.debug(
+                        "Segredo %s indisponivel: %s",
+                        error.get("SecretId"),
+                        error.get("ErrorCode"),
+                    )
+        except Exception as e:
+            logger.error(f"Erro ao acessar AWS Secrets Manager: {str(e)}")
+        return values
+
+    @staticmethod
+    def _parse_aws_secret(key: str, secret: str) -> Optional[str]:
+        """Extrai ``key`` de um segredo JSON ou retorna a string simples."""
+        try:
+            secret_dict = json.loads(secret)
+            return secret_dict.get(key)
+        except json.JSONDecodeError:
+            return secret
+
     def _get_from_azure_keyvault(self, key: str) -> Optional[str]:
         """Obtem credencial do Azure Key Vault."""
         try:
@@ -235,13 +323,17 @@ class CredentialManager:
 
     def _get_from_sops(self, key: str) -> Optional[str]:
         """Obtem credencial de arquivo .env criptografado com SOPS."""
+        return self._decrypt_sops().get(key)
+
+    def _decrypt_sops(self) -> Dict[str, str]:
+        """Descriptografa o arquivo SOPS e retorna seus pares chave/valor."""
         if not self.sops_file:
             logger.error("Arquivo SOPS nao configurado")
-            return None
+            return {}
             
         if not Path(self.sops_file).exists():
             logger.error(f"Arquivo SOPS nao encontrado: {self.sops_file}")
-            return None
+            return {}
             
         try:
             # Executar SOPS para descriptografar o arquivo
@@ -250,22 +342,23 @@ class CredentialManager:
                 capture_output=True,
                 text=True,
                 check=True,
+                close_fds=SPAWN_CLOSE_FDS,
             )
             
-            # Processar saida como .env
+            # Processar saida como .env (a primeira ocorrencia de cada chave vale)
+            values: Dict[str, str] = {}
             for line in result.stdout.splitlines():
                 if "=" in line and not line.strip().startswith("#"):
                     k, v = line.split("=", 1)
-                    if k.strip() == key:
-                        return v.strip()
+                    values.setdefault(k.strip(), v.strip())
             
-            return None
+            return values
         except subprocess.CalledProcessError as e:
             logger.error(f"Erro ao executar SOPS: {e.stderr}")
-            return None
+            return {}
         except Exception as e:
             logger.error(f"Erro ao processar arquivo SOPS: {str(e)}")
-            return None
+            return {}
 
     def set_credential(self, key: str, value: str) -> bool:
         """Define uma credencial na fonte configurada.
@@ -324,7 +417,7 @@ def get_manager(credential_source: str = "env") -> CredentialManager:
 
     if _manager is None or _manager.credential_source.value != source:
         # Carregar .env para obter APP_NAME se disponível
-        load_dotenv()
+        ensure_env_loaded()
         app_name = os.getenv("APP_NAME", "safestic")
 
         _manager = CredentialManager(
@@ -361,19 +454,13 @@ def load_credentials(credential_source: str = "env") -> Dict[str, str]:
     ]
     
     # Carregar .env para obter APP_NAME se disponivel
-    load_dotenv()
+    ensure_env_loaded()
 
     # Inicializar gerenciador de credenciais
     manager = get_manager(credential_source)
     
-    # Carregar credenciais
-    credentials = {}
-    for key in required_keys:
-        value = manager.get_credential(key)
-        if value:
-            credentials[key] = value
-    
-    return credentials
+    # Carregar credenciais com o minimo de acessos a fonte
+    return {key: value for key, value in manager.get_credentials(required_keys).items() if value}
 
 
 def get_credential(key: str, credential_source: str = "env") -> Optional[str]:
@@ -3,17 +3,66 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
+from typing import List, Optional
+
 from dotenv import load_dotenv
 
 
+@lru_cache(maxsize=None)
+def ensure_env_loaded(path: Optional[str] = None) -> bool:
+    """Load ``.env`` into ``os.environ`` once per process.
+
+    Subsequent calls with the same ``path`` are no-ops, so the file is not
+    re-opened and re-parsed by every function that needs the configuration.
+    Like ``load_dotenv``, variables already set in the environment win.
+
+    Parameters
+    ----------
+    path : Optional[str]
+        Explicit ``.env`` path. ``None`` uses ``load_dotenv``'s lookup.
+
+    Returns
+    -------
+    bool
+        Always ``True``; the value only exists to be cached.
+    """
+    load_dotenv(path)
+    return True
+
+
+@lru_cache(maxsize=1)
 def get_credential_source() -> str:
     """Load ``.env`` and return configured ``CREDENTIAL_SOURCE``.
 
+    The value is resolved once per process: CLI handlers, scripts and
+    ``ResticScript`` all share it. Call ``get_credential_source.cache_clear()``
+    after changing ``CREDENTIAL_SOURCE`` at runtime.
+
     Returns
     -------
     str
         Value of ``CREDENTIAL_SOURCE`` from environment (default ``"env"``).
     """
-    load_dotenv()
+    ensure_env_loaded()
     return os.getenv("CREDENTIAL_SOURCE", "env")
 
+
+def parse_env_list(name: str) -> List[str]:
+    """Return the items of a comma separated environment variable.
+
+    Both ``,`` and ``;`` are accepted as separators; surrounding whitespace
+    and empty items are discarded in a single pass.
+
+    Parameters
+    ----------
+    name : str
+        Name of the environment variable.
+
+    Returns
+    -------
+    List[str]
+        Parsed items (empty when the variable is unset).
+    """
+    raw = os.environ.get(name, "")
+    return [item for part in raw.replace(";", ",").split(",") if (item := part.strip())]
@@ -7,21 +7,27 @@ Tambem inclui funcoes para execucao de comandos com logging detalhado.
 
 from __future__ import annotations
 
+import atexit
+import copy
 import datetime
 import json
 import logging
+import logging.handlers
 import os
 import platform
+import queue
 import re
 import socket
 import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, TextIO, Union, cast
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple, Union, cast
 
 from pythonjsonlogger import jsonlogger
 
+from .restic_common import SPAWN_CLOSE_FDS
+
 # Padroes para redacao de segredos
 SECRET_PATTERNS = [
     # Senhas
@@ -41,6 +47,38 @@ SECRET_PATTERNS = [
     r'(api_key=)[^\s]+',
 ]
 
+# Padroes compilados uma unica vez, ja que a redacao roda em toda entrada de log
+_SECRET_REGEXES = [re.compile(pattern) for pattern in SECRET_PATTERNS]
+
+# Registros pendentes na fila de logging antes de bloquear o produtor
+LOG_QUEUE_SIZE = 10_000
+
+# Nome da maquina, incluido em todas as entradas de log
+HOSTNAME = socket.gethostname()
+
+# Sistema operacional, incluido nas entradas do formatador JSON
+PLATFORM = platform.system()
+
+# Ultimo segundo formatado e seu prefixo ISO 8601 (atualizados juntos)
+_timestamp_cache: Tuple[int, str] = (-1, "")
+
+
+def _format_timestamp(now: Optional[float] = None) -> str:
+    """Formata ``now`` (padrao: agora) em ISO 8601 local com microssegundos.
+    
+    O prefixo ate os segundos so e recalculado quando o segundo muda, ja que
+    varias linhas de log costumam ser escritas dentro do mesmo segundo.
+    """
+    global _timestamp_cache
+    if now is None:
+        now = time.time()
+    second = int(now)
+    cached_second, prefix = _timestamp_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
 
 def redact_secrets(text: str) -> str:
     """Redige segredos em texto.
@@ -55,8 +93,8 @@ def redact_secrets(text: str) -> str:
     str
         Texto com segredos redigidos
     """
-    for pattern in SECRET_PATTERNS:
-        text = re.sub(pattern, r'\1REDACTED', text)
+    for regex in _SECRET_REGEXES:
+        text = regex.sub(r'\1REDACTED', text)
     return text
 
 
@@ -65,15 +103,15 @@ class SafesticJsonFormatter(jsonlogger.JsonFormatter):
     
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.hostname = socket.gethostname()
-        self.platform = platform.system()
+        self.hostname = HOSTNAME
+        self.platform = PLATFORM
     
     def add_fields(self, log_record: Dict[str, Any], record: logging.LogRecord, message_dict: Dict[str, Any]) -> None:
         """Adiciona campos padrao e redige segredos."""
         super().add_fields(log_record, record, message_dict)
         
         # Adicionar campos padrao
-        log_record["timestamp"] = datetime.datetime.now().isoformat()
+        log_record["timestamp"] = _format_timestamp()
         log_record["hostname"] = self.hostname
         log_record["platform"] = self.platform
         
@@ -83,9 +121,57 @@ class SafesticJsonFormatter(jsonlogger.JsonFormatter):
                 log_record[key] = redact_secrets(value)
 
 
+class _BlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que bloqueia quando a fila esta cheia em vez de descartar.
+    
+    Tambem e dono do :class:`logging.handlers.QueueListener`: ``start`` o
+    inicia e registra o encerramento no ``atexit``; ``close`` o encerra uma
+    unica vez, fecha os handlers de destino (liberando o arquivo de log) e
+    remove esse registro.
+    """
+    
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]", listener: logging.handlers.QueueListener) -> None:
+        super().__init__(log_queue)
+        self.listener = listener
+        self._listening = False
+    
+    def start(self) -> None:
+        """Inicia o listener e agenda seu encerramento na saida do processo."""
+        self.listener.start()
+        self._listening = True
+        atexit.register(self.close)
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A fila e local ao processo: basta interpolar a mensagem. O
+        # ``QueueHandler.prepare`` padrao (Python < 3.12) formata o registro e
+        # descarta ``exc_info``, e o campo ``exc_info`` sumiria do JSON
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put(record)
+    
+    def close(self) -> None:
+        # Esvazia a fila, encerra a thread do listener e fecha os destinos
+        if self._listening:
+            self._listening = False
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            atexit.unregister(self.close)
+        super().close()
+
+
 def setup_logger(name: str, log_level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
     """Configura um logger estruturado.
     
+    A formatacao JSON e a escrita no console/arquivo sao feitas por um
+    :class:`logging.handlers.QueueListener` em segundo plano; a thread que
+    registra a mensagem apenas a coloca em uma fila limitada.
+    
     Parameters
     ----------
     name : str
@@ -109,6 +195,7 @@ def setup_logger(name: str, log_level: str = "INFO", log_file: Optional[str] = N
     # Remover handlers existentes
     for handler in logger.handlers[:]:  
         logger.removeHandler(handler)
+        handler.close()
     
     # Criar formatador JSON
     formatter = SafesticJsonFormatter(
@@ -116,19 +203,26 @@ def setup_logger(name: str, log_level: str = "INFO", log_file: Optional[str] = N
         rename_fields={'levelname': 'level', 'module': 'source'}
     )
     
-    # Adicionar handler para console
+    # Handler para console
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
     
-    # Adicionar handler para arquivo se especificado
+    # Handler para arquivo se especificado
     if log_file:
         # Garantir que o diretorio exista
         Path(log_file).parent.mkdir(parents=True, exist_ok=True)
         
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Escrita em segundo plano: o logger so enfileira os registros
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_handler = _BlockingQueueHandler(log_queue, listener)
+    logger.addHandler(queue_handler)
+    queue_handler.start()
     
     return logger
 
@@ -149,26 +243,31 @@ def create_log_file(prefix: str, log_dir: str) -> str:
         Caminho completo para o arquivo de log. O diretorio e criado
         automaticamente se nao existir.
     """
-    Path(log_dir).mkdir(parents=True, exist_ok=True)
+    # Um stat basta no caso comum em que o diretorio ja existe
+    if not os.path.isdir(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
     now = datetime.datetime.now()
     return now.strftime(f"{log_dir}/{prefix}_%Y%m%d_%H%M%S.log")
 
 
-def log(msg: str, log_file: TextIO, level: str = "INFO", extra: Optional[Dict[str, Any]] = None) -> None:
-    """Registra uma mensagem no console e no arquivo de log com timestamp.
+def format_log_entry(msg: str, level: str = "INFO", extra: Optional[Dict[str, Any]] = None) -> str:
+    """Monta a linha JSON de uma entrada de log, com segredos redigidos.
     
     Parameters
     ----------
     msg : str
         Mensagem a ser registrada
-    log_file : TextIO
-        Arquivo de log aberto para escrita
     level : str
         Nivel de log (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     extra : Optional[Dict[str, Any]]
         Informacoes adicionais para incluir no log
+        
+    Returns
+    -------
+    str
+        Entrada de log serializada em JSON, sem quebra de linha
     """
-    timestamp = datetime.datetime.now().isoformat()
+    timestamp = _format_timestamp()
     
     # Redigir segredos na mensagem
     msg = redact_secrets(msg)
@@ -178,7 +277,7 @@ def log(msg: str, log_file: TextIO, level: str = "INFO", extra: Optional[Dict[st
         "timestamp": timestamp,
         "level": level,
         "message": msg,
-        "hostname": socket.gethostname(),
+        "hostname": HOSTNAME,
     }
     
     # Adicionar informacoes extras se fornecidas
@@ -190,7 +289,24 @@ def log(msg: str, log_file: TextIO, level: str = "INFO", extra: Optional[Dict[st
                 log_entry[key] = value
     
     # Converter para JSON
-    log_json = json.dumps(log_entry)
+    return json.dumps(log_entry)
+
+
+def log(msg: str, log_file: TextIO, level: str = "INFO", extra: Optional[Dict[str, Any]] = None) -> None:
+    """Registra uma mensagem no console e no arquivo de log com timestamp.
+    
+    Parameters
+    ----------
+    msg : str
+        Mensagem a ser registrada
+    log_file : TextIO
+        Arquivo de log aberto para escrita
+    level : str
+        Nivel de log (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    extra : Optional[Dict[str, Any]]
+        Informacoes adicionais para incluir no log
+    """
+    log_json = format_log_entry(msg, level=level, extra=extra)
     
     # Imprimir no console
     print(log_json)
@@ -255,6 +371,7 @@ def run_cmd(
             text=True,
             timeout=timeout,
             check=check,
+            close_fds=SPAWN_CLOSE_FDS,
         )
         
         # Calcular tempo de execucao
@@ -0,0 +1,152 @@
+"""Pre-aquecimento dos packs de um snapshot S3 durante uma restauracao.
+
+Em object storages S3 com camada de cache (ex: gateways compativeis com S3
+que promovem objetos frios sob demanda), um ``HEAD`` com ``Range: bytes=0-0``
+dispara a promocao do objeto sem transferir dados. Disparando essas
+requisicoes em paralelo ao ``restic restore``, apenas para os packs usados
+pelo snapshot, a promocao acontece enquanto o Restic ainda esta inicializando.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Mapping, Optional, Tuple
+
+# Configuracao de logging
+logger = logging.getLogger(__name__)
+
+# Numero maximo de requisicoes HEAD simultaneas
+PRESTAGE_WORKERS = 64
+
+
+def parse_s3_repository(repository: str) -> Optional[Tuple[Optional[str], str, str]]:
+    """Extrai endpoint, bucket e prefixo de uma URL de repositorio ``s3:``.
+
+    Parameters
+    ----------
+    repository : str
+        URL do repositorio, ex: ``s3:s3.amazonaws.com/bucket/prefixo`` ou
+        ``s3:https://minio.local:9000/bucket``
+
+    Returns
+    -------
+    Optional[Tuple[Optional[str], str, str]]
+        ``(endpoint, bucket, prefixo)``; ``endpoint`` e None para a AWS.
+        Retorna None se o repositorio nao for S3.
+    """
+    if not repository.startswith("s3:"):
+        return None
+
+    location = repository[3:]
+    scheme, sep, rest = location.partition("://")
+    if not sep:
+        scheme, rest = "https", location
+
+    host, _, path = rest.partition("/")
+    bucket, _, prefix = path.partition("/")
+    if not bucket:
+        return None
+
+    endpoint = None if host == "s3.amazonaws.com" else f"{scheme}://{host}"
+    return endpoint, bucket, prefix.strip("/")
+
+
+def pack_key(prefix: str, pack_id: str) -> str:
+    """Retorna a chave do objeto de um pack no layout padrao do Restic."""
+    key = f"data/{pack_id[:2]}/{pack_id}"
+    return f"{prefix}/{key}" if prefix else key
+
+
+def prestage_packs(
+    repository: str,
+    pack_ids: Iterable[str],
+    env: Mapping[str, str],
+    max_workers: int = PRESTAGE_WORKERS,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """Dispara ``HEAD`` (``Range: bytes=0-0``) em paralelo para cada pack.
+
+    Os IDs sao consumidos a medida que chegam e no maximo ``2 * max_workers``
+    requisicoes ficam pendentes. Falhas sao apenas registradas: o
+    pre-aquecimento e uma otimizacao e nunca deve impedir a restauracao.
+
+    Parameters
+    ----------
+    repository : str
+        URL do repositorio Restic
+    pack_ids : Iterable[str]
+        IDs dos packs a pre-aquecer
+    env : Mapping[str, str]
+        Ambiente do Restic, de onde sao lidas as credenciais AWS
+    max_workers : int, optional
+        Numero maximo de requisicoes simultaneas, por padrao 64
+    stop : Optional[threading.Event], optional
+        Evento que interrompe o envio de novas requisicoes (ex: restauracao
+        concluida), por padrao None
+
+    Returns
+    -------
+    int
+        Quantidade de packs pre-aquecidos com sucesso (0 se o repositorio
+        nao for S3 ou se o boto3 nao estiver instalado)
+    """
+    location = parse_s3_repository(repository)
+    if location is None:
+        return 0
+
+    try:
+        import boto3
+    except ImportError:
+        logger.warning("Modulo boto3 nao instalado; pre-aquecimento ignorado")
+        return 0
+
+    endpoint, bucket, prefix = location
+    s3 = boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        aws_access_key_id=env.get("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=env.get("AWS_SECRET_ACCESS_KEY"),
+        aws_session_token=env.get("AWS_SESSION_TOKEN"),
+        region_name=env.get("AWS_DEFAULT_REGION"),
+    )
+
+    lock = threading.Lock()
+    slots = threading.Semaphore(2 * max_workers)
+    warmed = 0
+    failed = 0
+    last_error: Optional[Exception] = None
+
+    def head(pack_id: str) -> None:
+        nonlocal warmed, failed, last_error
+        try:
+            if stop is not None and stop.is_set():
+                return
+            s3.head_object(Bucket=bucket, Key=pack_key(prefix, pack_id), Range="bytes=0-0")
+            with lock:
+                warmed += 1
+        except Exception as exc:
+            logger.debug("Falha ao pre-aquecer pack %s: %s", pack_id, exc)
+            with lock:
+                failed += 1
+                last_error = exc
+        finally:
+            slots.release()
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for pack_id in pack_ids:
+                if stop is not None and stop.is_set():
+                    break
+                slots.acquire()
+                executor.submit(head, pack_id)
+                total += 1
+        except Exception as exc:
+            logger.warning("Listagem dos packs interrompida: %s", exc)
+
+    if failed:
+        logger.warning("Falha ao pre-aquecer %d packs: %s", failed, last_error)
+    logger.info("Packs pre-aquecidos: %d de %d", warmed, total)
+    return warmed
@@ -9,14 +9,17 @@ from __future__ import annotations
 import logging
 import os
 import re
+from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union, cast
 
 from pydantic import BaseModel, Field, ValidationError, validator
-from dotenv import load_dotenv
 
 from .credentials import get_manager
+from .env import ensure_env_loaded, parse_env_list
+from .restic_env import build_restic_env
 
 # Configuracao de logger
 logger = logging.getLogger(__name__)
@@ -30,17 +33,125 @@ class StorageProvider(str, Enum):
     LOCAL = "local"
 
 
+# Formato da URL do repositorio para cada provedor em nuvem
+REPOSITORY_URL_FORMATS: Dict[StorageProvider, str] = {
+    StorageProvider.AWS: "s3:s3.amazonaws.com/{bucket}",
+    StorageProvider.AZURE: "azure:{bucket}:restic",
+    StorageProvider.GCP: "gs:{bucket}",
+}
+
+
+# Opcao do Restic (-o) que define o numero de conexoes paralelas de cada backend
+BACKEND_CONNECTIONS_OPTIONS: Dict[StorageProvider, str] = {
+    StorageProvider.AWS: "s3.connections",
+    StorageProvider.AZURE: "azure.connections",
+    StorageProvider.GCP: "gs.connections",
+}
+
+
+# Credenciais repassadas ao Restic para cada provedor de armazenamento
+PROVIDER_CREDENTIAL_KEYS: Dict[StorageProvider, Tuple[str, ...]] = {
+    StorageProvider.AWS: ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"),
+    StorageProvider.AZURE: ("AZURE_ACCOUNT_NAME", "AZURE_ACCOUNT_KEY"),
+    StorageProvider.GCP: ("GOOGLE_PROJECT_ID", "GOOGLE_APPLICATION_CREDENTIALS"),
+}
+
+
+def default_backend_connections() -> int:
+    """Numero padrao de conexoes paralelas ao backend (4 por CPU, maximo 64)."""
+    return min(64, (os.cpu_count() or 1) * 4)
+
+
+def build_connections_option(provider: Union[str, StorageProvider], connections: int) -> List[str]:
+    """Retorna a opcao ``-o <backend>.connections=N`` para o provedor.
+
+    Parameters
+    ----------
+    provider : Union[str, StorageProvider]
+        Provedor de armazenamento
+    connections : int
+        Numero de conexoes paralelas ao backend
+
+    Returns
+    -------
+    List[str]
+        Argumentos a acrescentar ao comando, ou lista vazia para provedores
+        sem essa opcao (ex: repositorio local)
+    """
+    try:
+        option = BACKEND_CONNECTIONS_OPTIONS.get(StorageProvider(provider))
+    except ValueError:
+        option = None
+    if not option or connections < 1:
+        return []
+    return ["-o", f"{option}={connections}"]
+
+
+def build_repository_url(provider: Union[str, StorageProvider], bucket: str) -> str:
+    """Constroi a URL do repositorio Restic para o provedor informado.
+
+    Parameters
+    ----------
+    provider : Union[str, StorageProvider]
+        Provedor de armazenamento (aws, azure, gcp ou local)
+    bucket : str
+        Nome do bucket/container ou caminho do diretorio local
+
+    Returns
+    -------
+    str
+        URL do repositorio no formato esperado pelo Restic
+
+    Raises
+    ------
+    ValueError
+        Se o provedor for invalido
+    """
+    try:
+        provider_enum = StorageProvider(provider)
+    except ValueError:
+        raise ValueError(f"Provedor de armazenamento invalido: {provider}")
+
+    if provider_enum == StorageProvider.LOCAL:
+        return str(Path(bucket).absolute())
+    return REPOSITORY_URL_FORMATS[provider_enum].format(bucket=bucket)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Politica de retencao derivada da configuracao."""
+
+    enabled: bool
+    keep_hourly: int
+    keep_daily: int
+    keep_weekly: int
+    keep_monthly: int
+    keep_yearly: int
+
+    def as_kwargs(self) -> Dict[str, int]:
+        """Retorna os parametros ``keep_*`` para ``apply_retention_policy``."""
+        return {
+            "keep_hourly": self.keep_hourly,
+            "keep_daily": self.keep_daily,
+            "keep_weekly": self.keep_weekly,
+            "keep_monthly": self.keep_monthly,
+            "keep_yearly": self.keep_yearly,
+        }
+
+
 class ResticConfig(BaseModel):
     """Modelo para validacao da configuracao do Restic."""
     storage_provider: StorageProvider
     storage_bucket: str = Field(..., min_length=1)
     restic_password: str = Field(..., min_length=1)
     backup_source_dirs: List[str] = Field(default_factory=list)
+    backup_workers: int = Field(default=1, ge=1)
     restic_excludes: List[str] = Field(default_factory=list)
     restore_target_dir: Optional[str] = None
     log_dir: str = Field(default="logs")
     restic_tags: List[str] = Field(default_factory=list)
     retention_enabled: bool = Field(default=False)
+    keep_hourly: int = Field(default=24, ge=0)
     keep_daily: int = Field(default=7, ge=1)
     keep_weekly: int = Field(default=4, ge=1)
     keep_monthly: int = Field(default=6, ge=1)
@@ -64,18 +175,20 @@ class ResticConfig(BaseModel):
     
     def get_repository_url(self) -> str:
         """Constroi a URL do repositorio Restic."""
-        if self.storage_provider == StorageProvider.AWS:
-            return f"s3:s3.amazonaws.com/{self.storage_bucket}"
-        elif self.storage_provider == StorageProvider.AZURE:
-            return f"azure:{self.storage_bucket}:restic"
-        elif self.storage_provider == StorageProvider.GCP:
-            return f"gs:{self.storage_bucket}"
-        elif self.storage_provider == StorageProvider.LOCAL:
-            return str(Path(self.storage_bucket).absolute())
-        else:
-            # Nunca deve chegar aqui devido a validacao do Pydantic
-            raise ValueError(f"Provedor de armazenamento invalido: {self.storage_provider}")
+        return build_repository_url(self.storage_provider, self.storage_bucket)
     
+    @property
+    def retention(self) -> RetentionPolicy:
+        """Politica de retencao configurada."""
+        return RetentionPolicy(
+            enabled=self.retention_enabled,
+            keep_hourly=self.keep_hourly,
+            keep_daily=self.keep_daily,
+            keep_weekly=self.keep_weekly,
+            keep_monthly=self.keep_monthly,
+            keep_yearly=self.keep_yearly,
+        )
+
     @property
     def repository_url(self) -> str:
         """Propriedade para compatibilidade - retorna a URL do repositorio."""
@@ -99,8 +212,8 @@ def load_restic_env(credential_source: str = "env") -> tuple[str, dict[str, str]
     Returns
     -------
     tuple[str, dict[str, str], str]
-        Uma tupla contendo a URL do repositorio, uma copia das variaveis
-        de ambiente e o nome do provedor.
+        Uma tupla contendo a URL do repositorio, as variaveis de ambiente
+        relevantes para o Restic e o nome do provedor.
 
     Raises
     ------
@@ -108,16 +221,31 @@ def load_restic_env(credential_source: str = "env") -> tuple[str, dict[str, str]
         Se variaveis obrigatorias estiverem ausentes ou o provedor for invalido.
     """
     # Carregar variaveis de ambiente
-    load_dotenv()
+    ensure_env_loaded()
 
-    # Obter variaveis basicas
-    provider = os.getenv("STORAGE_PROVIDER", "").lower()
-    bucket = os.getenv("STORAGE_BUCKET", "")
-    
-    # Obter senha de forma segura
-    manager = get_manager(credential_source)
-    password = manager.get_credential("RESTIC_PASSWORD")
+    # Credenciais sao consultadas uma vez por combinacao de fonte e ambiente;
+    # cada chamador recebe sua propria copia do dicionario
+    repository, env, provider = _resolve_restic_env(
+        credential_source,
+        os.getenv("STORAGE_PROVIDER", "").lower(),
+        os.getenv("STORAGE_BUCKET", ""),
+        tuple(sorted(build_restic_env().items())),
+    )
+    return repository, dict(env), provider
 
+
+@lru_cache(maxsize=8)
+def _resolve_restic_env(
+    credential_source: str,
+    provider: str,
+    bucket: str,
+    base_env: Tuple[Tuple[str, str], ...],
+) -> tuple[str, dict[str, str], str]:
+    """Monta repositorio e ambiente do Restic (memorizado por :func:`load_restic_env`).
+
+    ``base_env`` e o subconjunto de variaveis do Restic no momento da chamada;
+    faz parte da chave para que mudancas no ambiente invalidem o resultado.
+    """
     # Validar provedor
     try:
         provider_enum = StorageProvider(provider)
@@ -128,6 +256,12 @@ def load_restic_env(credential_source: str = "env") -> tuple[str, dict[str, str]
     if not bucket:
         raise ValueError("STORAGE_BUCKET nao definido")
 
+    # Obter senha e credenciais do provedor de forma segura, em uma so consulta
+    manager = get_manager(credential_source)
+    provider_keys = PROVIDER_CREDENTIAL_KEYS.get(provider_enum, ())
+    credentials = manager.get_credentials(("RESTIC_PASSWORD", *provider_keys))
+    password = credentials["RESTIC_PASSWORD"]
+
     # A senha pode estar ausente em alguns fluxos (ex: apenas listagem)
     # Nesses casos, o Restic solicitara a senha interativamente se necessario.
     if not password:
@@ -136,45 +270,17 @@ def load_restic_env(credential_source: str = "env") -> tuple[str, dict[str, str]
         )
 
     # Construir URL do repositorio
-    if provider_enum == StorageProvider.AWS:
-        repository = f"s3:s3.amazonaws.com/{bucket}"
-    elif provider_enum == StorageProvider.AZURE:
-        repository = f"azure:{bucket}:restic"
-    elif provider_enum == StorageProvider.GCP:
-        repository = f"gs:{bucket}"
-    elif provider_enum == StorageProvider.LOCAL:
-        repository = str(Path(bucket).absolute())
-    else:
-        # Nunca deve chegar aqui devido a validacao anterior
-        raise ValueError(f"Provedor de armazenamento invalido: {provider}")
+    repository = build_repository_url(provider_enum, bucket)
 
-    # Preparar variaveis de ambiente
-    env = os.environ.copy()
+    # Preparar variaveis de ambiente (apenas as relevantes para o Restic)
+    env = dict(base_env)
     if password:
         env["RESTIC_PASSWORD"] = password
     
-    # Carregar credenciais especificas do provedor
-    if provider_enum == StorageProvider.AWS:
-        aws_access_key = manager.get_credential("AWS_ACCESS_KEY_ID")
-        aws_secret_key = manager.get_credential("AWS_SECRET_ACCESS_KEY")
-        if aws_access_key:
-            env["AWS_ACCESS_KEY_ID"] = aws_access_key
-        if aws_secret_key:
-            env["AWS_SECRET_ACCESS_KEY"] = aws_secret_key
-    elif provider_enum == StorageProvider.AZURE:
-        azure_account_name = manager.get_credential("AZURE_ACCOUNT_NAME")
-        azure_account_key = manager.get_credential("AZURE_ACCOUNT_KEY")
-        if azure_account_name:
-            env["AZURE_ACCOUNT_NAME"] = azure_account_name
-        if azure_account_key:
-            env["AZURE_ACCOUNT_KEY"] = azure_account_key
-    elif provider_enum == StorageProvider.GCP:
-        google_project_id = manager.get_credential("GOOGLE_PROJECT_ID")
-        google_app_credentials = manager.get_credential("GOOGLE_APPLICATION_CREDENTIALS")
-        if google_project_id:
-            env["GOOGLE_PROJECT_ID"] = google_project_id
-        if google_app_credentials:
-            env["GOOGLE_APPLICATION_CREDENTIALS"] = google_app_credentials
+    # Credenciais especificas do provedor
+    for key in provider_keys:
+        if credentials[key]:
+            env[key] = credentials[key]
     
     return repository, env, provider
 
@@ -198,7 +304,7 @@ def load_restic_config(credential_source: str = "env") -> ResticConfig:
         Se a configuracao for invalida
     """
     # Carregar variaveis de ambiente
-    load_dotenv()
+    ensure_env_loaded()
     
     # Obter senha de forma segura
     manager = get_manager(credential_source)
@@ -209,12 +315,14 @@ def load_restic_config(credential_source: str = "env") -> ResticConfig:
         "storage_provider": os.getenv("STORAGE_PROVIDER", "").lower(),
         "storage_bucket": os.getenv("STORAGE_BUCKET", ""),
         "restic_password": password,
-        "backup_source_dirs": os.getenv("BACKUP_SOURCE_DIRS", "").split(";") if os.getenv("BACKUP_SOURCE_DIRS") else [],
-        "restic_excludes": os.getenv("RESTIC_EXCLUDES", "").split(";") if os.getenv("RESTIC_EXCLUDES") else [],
+        "backup_source_dirs": parse_env_list("BACKUP_SOURCE_DIRS"),
+        "backup_workers": int(os.getenv("BACKUP_WORKERS", "1")),
+        "restic_excludes": parse_env_list("RESTIC_EXCLUDES"),
         "restore_target_dir": os.getenv("RESTORE_TARGET_DIR", "") or None,
         "log_dir": os.getenv("LOG_DIR", "logs"),
-        "restic_tags": os.getenv("RESTIC_TAGS", "").split(";") if os.getenv("RESTIC_TAGS") else [],
+        "restic_tags": parse_env_list("RESTIC_TAGS"),
         "retention_enabled": os.getenv("RETENTION_ENABLED", "false").lower() in ("true", "1", "yes"),
+        "keep_hourly": int(os.getenv("KEEP_HOURLY", "24")),
         "keep_daily": int(os.getenv("KEEP_DAILY", "7")),
         "keep_weekly": int(os.getenv("KEEP_WEEKLY", "4")),
         "keep_monthly": int(os.getenv("KEEP_MONTHLY", "6")),
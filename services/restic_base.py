@@ -2,7 +2,6 @@ from __future__ import annotations
 
 """Utilidades compartilhadas para clientes Restic."""
 
-import asyncio
 import logging
 import random
 import shutil
@@ -14,7 +13,10 @@ from .restic_common import (
     ResticError,
     ResticNetworkError,
     ResticRepositoryError,
+    build_option_args,
+    build_priority_prefix,
     build_restic_command,
+    build_retention_args,
     redact_secrets,
 )
 
@@ -23,7 +25,10 @@ AsyncCallable = Callable[..., Any]
 
 
 __all__ = [
+    "build_option_args",
+    "build_priority_prefix",
     "build_restic_command",
+    "build_retention_args",
     "redact_secrets",
     "check_restic_installed",
     "ensure_restic_installed",
@@ -128,6 +133,9 @@ def with_async_retry(
                         exc,
                         current_delay,
                     )
+                    # Importado aqui: os clientes sincronos nao pagam o custo do asyncio
+                    import asyncio
+
                     await asyncio.sleep(current_delay)
                     current_delay *= backoff_factor
                 except Exception:
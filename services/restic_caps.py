@@ -0,0 +1,164 @@
+"""Cache da saida de comandos informativos do executavel do Restic.
+
+``restic version`` e ``restic help`` so mudam quando o executavel muda, mas
+cada chamada paga o custo de iniciar um processo Go. Este modulo guarda a
+saida desses comandos em ``~/.cache/safestic/restic_caps.json``, associada ao
+caminho, ``mtime`` e tamanho do executavel: enquanto o binario for o mesmo,
+scripts de diagnostico e clientes reutilizam a saida sem executar o Restic.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .restic_common import SPAWN_CLOSE_FDS, dump_json, parse_json, resolve_restic_binary
+from .snapshot_cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+CAPS_CACHE_PATH = CACHE_DIR / "restic_caps.json"
+
+# Comandos cuja saida depende apenas do executavel
+CACHEABLE_COMMANDS = ("version", "help")
+
+# Saidas conhecidas neste processo, ja validadas contra o executavel atual
+_memo: Dict[str, str] = {}
+_memo_lock = threading.Lock()
+
+
+def _binary_key(binary: str) -> Optional[List[Any]]:
+    """Identifica o executavel por caminho, ``mtime`` e tamanho."""
+    try:
+        st = os.stat(binary)
+    except OSError:
+        return None
+    return [binary, st.st_mtime_ns, st.st_size]
+
+
+def _read_outputs(key: List[Any]) -> Dict[str, str]:
+    """Le as saidas gravadas em disco se pertencerem ao executavel ``key``."""
+    try:
+        with open(CAPS_CACHE_PATH, "rb") as fh:
+            data = parse_json(fh.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("key") != key:
+        return {}
+    outputs = data.get("outputs")
+    return outputs if isinstance(outputs, dict) else {}
+
+
+def _write_outputs(key: List[Any], outputs: Dict[str, str]) -> None:
+    """Grava ``outputs`` em disco de forma atomica."""
+    try:
+        CAPS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CAPS_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as fh:
+            fh.write(dump_json({"key": key, "outputs": outputs}))
+        os.replace(tmp_path, CAPS_CACHE_PATH)
+    except OSError as exc:
+        logger.warning("Falha ao gravar cache de capacidades do Restic: %s", exc)
+
+
+def _run(binary: str, command: str) -> Optional[str]:
+    """Executa ``restic <command>`` e retorna a saida, ou None em caso de falha."""
+    try:
+        result = subprocess.run(
+            [binary, command],
+            capture_output=True,
+            text=True,
+            close_fds=SPAWN_CLOSE_FDS,
+        )
+    except OSError as exc:
+        logger.debug("Falha ao executar restic %s: %s", command, exc)
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def restic_output(command: str) -> Optional[str]:
+    """Retorna a saida de ``restic <command>``, executando-o no maximo uma vez.
+
+    Parameters
+    ----------
+    command : str
+        Um dos :data:`CACHEABLE_COMMANDS` (``"version"`` ou ``"help"``)
+
+    Returns
+    -------
+    Optional[str]
+        Saida padrao do comando, ou None se o executavel nao foi encontrado
+        ou o comando falhou (falhas nao sao memorizadas)
+    """
+    if command not in CACHEABLE_COMMANDS:
+        raise ValueError(f"Comando nao memorizavel: {command}")
+
+    with _memo_lock:
+        if command in _memo:
+            return _memo[command]
+
+        binary = resolve_restic_binary()
+        key = _binary_key(binary)
+        if key is None:
+            return None
+
+        outputs = _read_outputs(key)
+        if command not in outputs:
+            output = _run(binary, command)
+            if output is None:
+                return None
+            outputs[command] = output
+            _write_outputs(key, outputs)
+
+        _memo.update(outputs)
+        return outputs[command]
+
+
+def prefetch(*commands: str) -> None:
+    """Preenche o cache com varios comandos de uma vez.
+
+    Os comandos ausentes sao executados em paralelo e o cache em disco e
+    gravado uma unica vez, em vez de um processo e uma gravacao por chamada
+    a :func:`restic_output`. Falhas sao ignoradas aqui e reaparecem na
+    chamada seguinte a :func:`restic_output`.
+
+    Parameters
+    ----------
+    *commands : str
+        Comandos de :data:`CACHEABLE_COMMANDS`; por padrao, todos
+    """
+    commands = commands or CACHEABLE_COMMANDS
+    for command in commands:
+        if command not in CACHEABLE_COMMANDS:
+            raise ValueError(f"Comando nao memorizavel: {command}")
+
+    with _memo_lock:
+        if all(command in _memo for command in commands):
+            return
+
+        binary = resolve_restic_binary()
+        key = _binary_key(binary)
+        if key is None:
+            return
+
+        outputs = _read_outputs(key)
+        missing = [command for command in commands if command not in outputs]
+        if missing:
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                results = executor.map(lambda command: _run(binary, command), missing)
+                fetched = {command: output for command, output in zip(missing, results) if output is not None}
+            if fetched:
+                outputs.update(fetched)
+                _write_outputs(key, outputs)
+
+        _memo.update(outputs)
+
+
+def clear_memo() -> None:
+    """Descarta as saidas memorizadas neste processo (o cache em disco e mantido)."""
+    with _memo_lock:
+        _memo.clear()
@@ -7,16 +7,20 @@ backoff exponencial e tratamento estruturado de erros.
 
 from __future__ import annotations
 
+import dataclasses
 import json
 import logging
+import os
 import re
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union, cast
 
-from .restic import load_restic_env
+from .restic import build_connections_option, load_restic_env
 from .restic_common import (
     ResticAuthenticationError,
     ResticCommandError,
@@ -24,15 +28,30 @@ from .restic_common import (
     ResticNetworkError,
     ResticPermissionError,
     ResticRepositoryError,
+    SPAWN_CLOSE_FDS,
+    SNAPSHOT_SAVED_RE,
     analyze_command_error,
+    iter_json_array,
+    parse_json,
 )
 from .restic_base import (
+    build_option_args,
+    build_priority_prefix,
     build_restic_command,
+    build_retention_args,
     redact_secrets,
     with_retry,
     check_restic_installed as base_check_restic_installed,
 )
 from .env import get_credential_source
+from .restic_caps import restic_output
+from .restic_env import default_cache_dir
+from .snapshot_cache import (
+    DEFAULT_ACCESS_TTL,
+    invalidate_access,
+    is_access_recent,
+    mark_access_ok,
+)
 
 
 
@@ -97,6 +116,12 @@ class ResticClient:
         self.initial_backoff = initial_backoff
         self.max_backoff = max_backoff
 
+        # ID completo do snapshot "latest", resolvido uma unica vez por cliente
+        self._resolved_latest: Optional[str] = None
+
+        # Versao do Restic, consultada uma unica vez por cliente
+        self._version_info: Optional[Tuple[int, ...]] = None
+
     def _run_command(
         self,
         cmd: Sequence[str],
@@ -144,6 +169,7 @@ class ResticClient:
                 env=self.env,
                 text=True,
                 capture_output=True,
+                close_fds=SPAWN_CLOSE_FDS,
             )
 
             elapsed = time.time() - start_time
@@ -170,7 +196,7 @@ class ResticClient:
             json_data = None
             if capture_json and result.stdout:
                 try:
-                    json_data = json.loads(result.stdout)
+                    json_data = parse_json(result.stdout)
                 except json.JSONDecodeError as exc:
                     self.logger.error("Erro ao decodificar JSON: %s", exc)
                     return False, result, None
@@ -211,14 +237,142 @@ class ResticClient:
         cmd = build_restic_command(*args)
         return self._run_command(cmd, capture_json=capture_json, check=check)
 
+    def _stream_command(self, cmd: Sequence[str], on_line: Callable[[bytes], None]) -> None:
+        """Executa um comando entregando cada linha do stdout assim que chega.
+
+        Diferente de :meth:`_run_command`, a saida nao e acumulada em memoria.
+        O stderr e drenado em uma thread separada para que o processo nunca
+        bloqueie com o pipe cheio; se ``on_line`` levantar excecao, o processo
+        e encerrado.
+
+        Parameters
+        ----------
+        cmd : Sequence[str]
+            Comando a ser executado
+        on_line : Callable[[bytes], None]
+            Funcao chamada para cada linha nao vazia do stdout
+
+        Raises
+        ------
+        ResticError
+            Se o comando terminar com erro
+        """
+        self.logger.info("Executando comando: %s", " ".join(redact_secrets(arg) for arg in cmd))
+
+        process = subprocess.Popen(
+            cmd,
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=SPAWN_CLOSE_FDS,
+        )
+        stderr_chunks: List[bytes] = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.extend(process.stderr), daemon=True
+        )
+        stderr_reader.start()
+
+        completed = False
+        try:
+            for line in process.stdout:
+                if line.strip():
+                    on_line(line)
+            completed = True
+        finally:
+            if not completed and process.poll() is None:
+                process.terminate()
+            returncode = process.wait()
+            stderr_reader.join()
+            process.stdout.close()
+            process.stderr.close()
+
+        stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+        if stderr:
+            self.logger.debug("Erro: %s", redact_secrets(stderr))
+        if returncode != 0:
+            analyze_command_error(cmd, returncode, "", stderr)
+
+    def _log_output_line(self, line: bytes) -> None:
+        """Registra uma linha de saida do Restic em nivel DEBUG."""
+        # Evita decodificar e redigir cada linha quando DEBUG esta desativado
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self.logger.debug("Saida: %s", redact_secrets(line.decode("utf-8", "replace").rstrip()))
+
+    def _run_json_messages(
+        self,
+        cmd: Sequence[str],
+        on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Executa um comando com ``--json`` lendo as mensagens linha a linha.
+
+        Cada linha da saida e uma mensagem JSON independente do Restic
+        (``status``, ``summary``, ``error``...), entregue a ``on_message``
+        assim que chega.
+
+        Parameters
+        ----------
+        cmd : Sequence[str]
+            Comando a ser executado
+        on_message : Optional[Callable[[Dict[str, Any]], None]], optional
+            Funcao chamada para cada mensagem decodificada, por padrao None
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            Mensagem ``summary`` final, se o Restic a emitiu
+
+        Raises
+        ------
+        ResticError
+            Se o comando terminar com erro
+        """
+        summary: Optional[Dict[str, Any]] = None
+
+        def handle_line(line: bytes) -> None:
+            nonlocal summary
+            if not line.startswith(b"{"):
+                # Linhas fora do formato JSON (avisos antigos) vao para o debug
+                # sem passar pelo decodificador
+                self._log_output_line(line)
+                return
+            try:
+                message = parse_json(line)
+            except json.JSONDecodeError:
+                self._log_output_line(line)
+                return
+            if message.get("message_type") == "summary":
+                summary = message
+            if on_message is not None:
+                on_message(message)
+
+        self._stream_command(cmd, handle_line)
+        return summary
+
     def get_version(self) -> str:
         """Obtém a versão instalada do Restic."""
 
+        cached = restic_output("version")
+        if cached is not None:
+            return cached.strip()
         success, result, _ = self.run_raw(["version"])
         if result is None:
             return ""
         return result.stdout.strip()
 
+    def get_version_info(self) -> Tuple[int, ...]:
+        """Retorna a versao do Restic como tupla, ex: ``(0, 17, 3)``.
+
+        O resultado e guardado no cliente; uma tupla vazia indica que a versao
+        nao pode ser determinada.
+        """
+        if self._version_info is None:
+            match = re.search(r"restic (\d+)\.(\d+)(?:\.(\d+))?", self.get_version())
+            self._version_info = (
+                tuple(int(part) for part in match.groups(default="0")) if match else ()
+            )
+        return self._version_info
+
     @with_retry()
     def check_repository_access(self) -> bool:
         """Verifica se o repositorio Restic esta acessivel.
@@ -240,6 +394,46 @@ class ResticClient:
         )
         return success
 
+    def check_repository_access_cached(self, ttl: Optional[int] = None) -> bool:
+        """Verifica o acesso ao repositorio reutilizando uma verificacao recente.
+
+        Se o acesso foi confirmado ha menos de ``ttl`` segundos (marcador em
+        ``~/.cache/safestic``), nenhum processo do Restic e iniciado. Caso
+        contrario executa :meth:`check_repository_access` e renova o marcador.
+
+        Parameters
+        ----------
+        ttl : Optional[int], optional
+            Validade da verificacao em segundos; por padrao usa a variavel de
+            ambiente ``ACCESS_CHECK_TTL`` (3600)
+
+        Returns
+        -------
+        bool
+            True se o repositorio esta acessivel
+
+        Raises
+        ------
+        ResticError
+            Se ocorrer um erro ao acessar o repositorio (o marcador e removido)
+        """
+        if ttl is None:
+            ttl = int(os.getenv("ACCESS_CHECK_TTL", str(DEFAULT_ACCESS_TTL)))
+
+        if is_access_recent(self.repository, ttl):
+            self.logger.info("Acesso ao repositorio verificado recentemente, pulando verificacao")
+            return True
+
+        try:
+            success = self.check_repository_access()
+        except ResticError:
+            invalidate_access(self.repository)
+            raise
+
+        if success:
+            mark_access_ok(self.repository)
+        return success
+
     def init_repository(self) -> bool:
         """Inicializa um novo repositorio Restic se nao existir.
 
@@ -273,6 +467,9 @@ class ResticClient:
     def supports_mount(self) -> bool:
         """Verifica se o comando ``mount`` esta disponivel no Restic."""
         self.logger.info("Verificando suporte ao comando mount")
+        cached = restic_output("help")
+        if cached is not None:
+            return "mount" in cached
         success, result, _ = self._run_command(
             build_restic_command("help"), check=False
         )
@@ -344,17 +541,8 @@ class ResticClient:
         cmd = build_restic_command("backup", repository=self.repository)
         cmd.extend(paths)
 
-        # Adicionar exclusoes
-        if excludes:
-            for exclude in excludes:
-                if exclude.strip():
-                    cmd.extend(["--exclude", exclude.strip()])
-
-        # Adicionar tags
-        if tags:
-            for tag in tags:
-                if tag.strip():
-                    cmd.extend(["--tag", tag.strip()])
+        cmd.extend(build_option_args("--exclude", excludes))
+        cmd.extend(build_option_args("--tag", tags))
 
         self.logger.info(
             "Iniciando backup de %d caminhos com %d exclusoes e %d tags",
@@ -364,15 +552,16 @@ class ResticClient:
         )
 
         success, result, _ = self._run_command(cmd)
+        self._resolved_latest = None
 
         if success and result and result.stdout:
             snapshot_id = None
-            match = re.search(r"snapshot ([a-f0-9]+) saved", result.stdout)
+            match = SNAPSHOT_SAVED_RE.search(result.stdout)
             if match:
                 snapshot_id = match.group(1)
             else:
                 try:
-                    data = json.loads(result.stdout)
+                    data = parse_json(result.stdout)
                     snapshot_id = data.get("snapshot", {}).get("id")
                 except json.JSONDecodeError:
                     pass
@@ -389,6 +578,182 @@ class ResticClient:
             stderr=result.stderr if result else None,
         )
 
+    def backup_parallel(
+        self,
+        paths: List[str],
+        excludes: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[str]:
+        """Executa um backup por diretorio em processos Restic paralelos.
+
+        O Restic permite backups concorrentes no mesmo repositorio, entao cada
+        caminho gera seu proprio snapshot em um processo separado. O numero de
+        processos e limitado por ``min(max_workers, len(paths), os.cpu_count())``.
+
+        Parameters
+        ----------
+        paths : List[str]
+            Lista de caminhos; cada um gera um snapshot independente
+        excludes : Optional[List[str]], optional
+            Lista de padroes a serem excluidos, por padrao None
+        tags : Optional[List[str]], optional
+            Lista de tags a serem aplicadas aos snapshots, por padrao None
+        max_workers : Optional[int], optional
+            Numero maximo de processos simultaneos, por padrao ``os.cpu_count()``
+
+        Returns
+        -------
+        List[str]
+            IDs dos snapshots criados, na mesma ordem de ``paths``
+
+        Raises
+        ------
+        ResticError
+            Se o backup de algum dos caminhos falhar; a mensagem lista os
+            caminhos com falha e os snapshots criados pelos demais
+        """
+        if not paths:
+            raise ValueError("Pelo menos um caminho deve ser especificado para backup")
+
+        workers = min(max_workers or os.cpu_count() or 1, len(paths), os.cpu_count() or 1)
+        if workers <= 1:
+            return [self.backup(paths=paths, excludes=excludes, tags=tags)]
+
+        self.logger.info(
+            "Iniciando backup paralelo de %d caminhos com %d processos", len(paths), workers
+        )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.backup, paths=[path], excludes=excludes, tags=tags)
+                for path in paths
+            ]
+
+        # Cada resultado e coletado separadamente: uma falha nao esconde os
+        # snapshots ja criados pelos demais caminhos
+        snapshot_ids: List[str] = []
+        failures: List[Tuple[str, Exception]] = []
+        for path, future in zip(paths, futures):
+            try:
+                snapshot_ids.append(future.result())
+            except Exception as exc:
+                self.logger.error("Falha no backup de %s: %s", path, exc)
+                failures.append((path, exc))
+
+        if not failures:
+            return snapshot_ids
+
+        if snapshot_ids:
+            self.logger.warning(
+                "Snapshots criados pelos demais caminhos: %s", ", ".join(snapshot_ids)
+            )
+        first_error = failures[0][1]
+        if not isinstance(first_error, ResticError):
+            raise first_error
+        failed_paths = ", ".join(path for path, _ in failures)
+        created = ", ".join(snapshot_ids) or "nenhum"
+        raise dataclasses.replace(
+            first_error,
+            message=(
+                f"{first_error.message} (falha em: {failed_paths}; "
+                f"snapshots criados: {created})"
+            ),
+        ) from first_error
+
+    @contextmanager
+    def shared_cache(self) -> Iterator[None]:
+        """Fixa um ``RESTIC_CACHE_DIR`` persistente para os comandos do bloco.
+
+        Usado quando varios comandos seguidos (ex: ``backup`` e ``forget``)
+        devem ler o mesmo indice local em vez de baixa-lo novamente do
+        repositorio remoto, mesmo que o ambiente do Restic nao permita
+        descobrir o diretorio de cache padrao. Um ``RESTIC_CACHE_DIR`` ja
+        configurado e mantido; ao sair do bloco o ambiente original do
+        cliente e restaurado.
+        """
+        if self.env.get("RESTIC_CACHE_DIR"):
+            yield
+            return
+
+        original_env = self.env
+        self.env = {**original_env, "RESTIC_CACHE_DIR": default_cache_dir()}
+        try:
+            yield
+        finally:
+            self.env = original_env
+
+    def backup_with_retention(
+        self,
+        paths: List[str],
+        excludes: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        keep_last: Optional[int] = None,
+        keep_hourly: Optional[int] = None,
+        keep_daily: Optional[int] = None,
+        keep_weekly: Optional[int] = None,
+        keep_monthly: Optional[int] = None,
+        keep_yearly: Optional[int] = None,
+        prune: bool = True,
+    ) -> str:
+        """Executa um backup seguido da politica de retencao.
+
+        O Restic nao possui um comando unico para backup e ``forget``; os dois
+        processos sao executados em sequencia dentro de :meth:`shared_cache`.
+        O ID do snapshot e registrado antes da retencao, para que uma falha
+        no ``forget`` nao esconda um backup concluido.
+
+        Parameters
+        ----------
+        paths : List[str]
+            Lista de caminhos a serem incluidos no backup
+        excludes : Optional[List[str]], optional
+            Lista de padroes a serem excluidos, por padrao None
+        tags : Optional[List[str]], optional
+            Lista de tags a serem aplicadas ao snapshot, por padrao None
+        keep_last, keep_hourly, keep_daily, keep_weekly, keep_monthly, keep_yearly : Optional[int]
+            Parametros da politica de retencao repassados ao ``forget``
+        prune : bool, optional
+            Se True, executa prune apos forget, por padrao True
+
+        Returns
+        -------
+        str
+            ID do snapshot criado
+
+        Raises
+        ------
+        ResticError
+            Se ocorrer um erro no backup ou na aplicacao da retencao
+        """
+        with self.shared_cache():
+            snapshot_id = self.backup(paths=paths, excludes=excludes, tags=tags)
+            self.logger.info("Backup concluido. ID do snapshot: %s", snapshot_id)
+            self.apply_retention_policy(
+                keep_last=keep_last,
+                keep_hourly=keep_hourly,
+                keep_daily=keep_daily,
+                keep_weekly=keep_weekly,
+                keep_monthly=keep_monthly,
+                keep_yearly=keep_yearly,
+                prune=prune,
+            )
+        return snapshot_id
+
+    def _forget_command(
+        self, tags: Optional[List[str]] = None, prune: bool = True, **keep: Optional[int]
+    ) -> List[str]:
+        """Monta ``restic forget`` com as regras ``keep_*``, tags e ``--prune``.
+
+        Compartilhado por :meth:`apply_retention_policy` e
+        :meth:`forget_snapshots`, que diferem apenas na forma de execucao.
+        """
+        cmd = build_restic_command("forget", repository=self.repository)
+        cmd.extend(build_retention_args(**keep))
+        cmd.extend(build_option_args("--tag", tags))
+        if prune:
+            cmd.append("--prune")
+        return cmd
+
     @with_retry()
     def apply_retention_policy(
         self,
@@ -415,22 +780,15 @@ class ResticClient:
         keep_monthly = keep_monthly if keep_monthly is not None else monthly
         keep_yearly = keep_yearly if keep_yearly is not None else yearly
 
-        cmd = build_restic_command("forget", repository=self.repository)
-        if keep_last is not None:
-            cmd.extend(["--keep-last", str(keep_last)])
-        if keep_hourly is not None:
-            cmd.extend(["--keep-hourly", str(keep_hourly)])
-        if keep_daily is not None:
-            cmd.extend(["--keep-daily", str(keep_daily)])
-        if keep_weekly is not None:
-            cmd.extend(["--keep-weekly", str(keep_weekly)])
-        if keep_monthly is not None:
-            cmd.extend(["--keep-monthly", str(keep_monthly)])
-        if keep_yearly is not None:
-            cmd.extend(["--keep-yearly", str(keep_yearly)])
-
-        if prune:
-            cmd.append("--prune")
+        cmd = self._forget_command(
+            prune=prune,
+            keep_last=keep_last,
+            keep_hourly=keep_hourly,
+            keep_daily=keep_daily,
+            keep_weekly=keep_weekly,
+            keep_monthly=keep_monthly,
+            keep_yearly=keep_yearly,
+        )
 
         self.logger.info(
             "Aplicando politica de retencao (l:%s, h:%s, d:%s, w:%s, m:%s, y:%s, prune:%s)",
@@ -453,6 +811,7 @@ class ResticClient:
         keep_daily: int = 7,
         keep_weekly: int = 4,
         keep_monthly: int = 6,
+        keep_yearly: Optional[int] = None,
         tags: Optional[List[str]] = None,
         prune: bool = True,
     ) -> bool:
@@ -468,6 +827,8 @@ class ResticClient:
             Numero de snapshots semanais a manter, por padrao 4
         keep_monthly : int, optional
             Numero de snapshots mensais a manter, por padrao 6
+        keep_yearly : Optional[int], optional
+            Numero de snapshots anuais a manter, por padrao None
         tags : Optional[List[str]], optional
             Lista de tags usadas para filtrar snapshots, por padrao None
         prune : bool, optional
@@ -483,43 +844,33 @@ class ResticClient:
         ResticError
             Se ocorrer um erro ao aplicar a politica
         """
-        cmd = [
-            "restic",
-            "-r",
-            self.repository,
-            "forget",
-            "--keep-hourly",
-            str(keep_hourly),
-            "--keep-daily",
-            str(keep_daily),
-            "--keep-weekly",
-            str(keep_weekly),
-            "--keep-monthly",
-            str(keep_monthly),
-        ]
-
-        if tags:
-            for tag in tags:
-                if tag.strip():
-                    cmd.extend(["--tag", tag.strip()])
-
-        if prune:
-            cmd.append("--prune")
-
+        cmd = self._forget_command(
+            tags=tags,
+            prune=prune,
+            keep_hourly=keep_hourly,
+            keep_daily=keep_daily,
+            keep_weekly=keep_weekly,
+            keep_monthly=keep_monthly,
+            keep_yearly=keep_yearly,
+        )
         cmd.append("--verbose")
 
         self.logger.info(
-            "Esquecendo snapshots com politica de retencao (h:%d, d:%d, w:%d, m:%d, tags:%s, prune:%s)",
+            "Esquecendo snapshots com politica de retencao "
+            "(h:%d, d:%d, w:%d, m:%d, y:%s, tags:%s, prune:%s)",
             keep_hourly,
             keep_daily,
             keep_weekly,
             keep_monthly,
+            keep_yearly,
             tags,
             prune,
         )
 
-        success, _, _ = self._run_command(cmd)
-        return success
+        # Com --prune --verbose a saida pode ser longa e o comando levar horas:
+        # cada linha e registrada ao chegar, sem acumular a saida em memoria
+        self._stream_command(cmd, self._log_output_line)
+        return True
 
     @with_retry()
     def list_snapshots(self) -> List[Dict[str, Any]]:
@@ -536,15 +887,78 @@ class ResticClient:
             Se ocorrer um erro ao listar os snapshots
         """
         self.logger.info("Listando snapshots do repositorio")
-        _, _, json_data = self._run_command(
-            build_restic_command("snapshots", "--json", repository=self.repository),
-            capture_json=True,
+        # Lido do pipe: o JSON nao e mantido inteiro em memoria como texto
+        return list(self.iter_snapshots())
+
+    def iter_snapshots(self, *snapshot_ids: str) -> Iterator[Dict[str, Any]]:
+        """Itera sobre os snapshots lendo a saida do Restic incrementalmente.
+
+        A saida do Restic nao e mantida inteira em memoria: cada snapshot e
+        entregue assim que decodificado. Se o consumidor parar a iteracao
+        antes do fim, o processo do Restic e encerrado.
+
+        Parameters
+        ----------
+        *snapshot_ids : str
+            IDs (ou "latest") para filtrar no proprio Restic; sem IDs, lista todos
+
+        Yields
+        ------
+        Dict[str, Any]
+            Informacoes de cada snapshot, na ordem retornada pelo Restic
+
+        Raises
+        ------
+        ResticError
+            Se o comando terminar com erro
+        """
+        cmd = build_restic_command(
+            "snapshots", *snapshot_ids, "--json", repository=self.repository
         )
+        self.logger.info("Executando comando: %s", " ".join(redact_secrets(arg) for arg in cmd))
 
-        if json_data is None:
-            return []
+        process = subprocess.Popen(
+            cmd,
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=SPAWN_CLOSE_FDS,
+        )
+        # stderr drenado em paralelo: um stderr cheio travaria o Restic antes
+        # do fim do stdout
+        stderr_chunks: List[bytes] = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.extend(process.stderr), daemon=True
+        )
+        stderr_reader.start()
 
-        return cast(List[Dict[str, Any]], json_data)
+        completed = False
+        parse_error: Optional[json.JSONDecodeError] = None
+        try:
+            try:
+                for snapshot in iter_json_array(process.stdout):
+                    yield snapshot
+            except json.JSONDecodeError as exc:
+                parse_error = exc
+            completed = True
+        finally:
+            if not completed and process.poll() is None:
+                process.terminate()
+            returncode = process.wait()
+            stderr_reader.join()
+            process.stdout.close()
+            process.stderr.close()
+
+        stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+        if returncode != 0:
+            analyze_command_error(cmd, returncode, "", stderr)
+        if parse_error is not None:
+            self.logger.error("Erro ao decodificar JSON: %s", parse_error)
+            raise ResticCommandError(
+                message=f"Erro ao decodificar JSON: {parse_error}",
+                command=cmd,
+                returncode=returncode,
+            )
 
     @with_retry()
     def get_snapshot_info(self, snapshot_id: str = "latest") -> Dict[str, Any]:
@@ -566,14 +980,15 @@ class ResticClient:
             Se ocorrer um erro ao obter as informacoes
         """
         self.logger.info("Obtendo informacoes do snapshot: %s", snapshot_id)
-        _, _, json_data = self._run_command(
-            build_restic_command(
-                "snapshots", snapshot_id, "--json", repository=self.repository
-            ),
-            capture_json=True,
-        )
 
-        if not json_data or not isinstance(json_data, list) or not json_data:
+        # Filtrado no Restic e lido do pipe: para no primeiro snapshot
+        snapshots = self.iter_snapshots(snapshot_id)
+        try:
+            snapshot = next(snapshots, None)
+        finally:
+            snapshots.close()
+
+        if not snapshot:
             raise ResticCommandError(
                 message=f"Nao foi possivel obter informacoes do snapshot {snapshot_id}",
                 command=build_restic_command(
@@ -581,7 +996,32 @@ class ResticClient:
                 ),
             )
 
-        return cast(Dict[str, Any], json_data[0])
+        if snapshot_id == "latest" and snapshot.get("id"):
+            self._resolved_latest = snapshot["id"]
+        return snapshot
+
+    def resolve_snapshot_id(self, snapshot_id: str) -> str:
+        """Converte ``latest`` no ID completo do snapshot mais recente.
+
+        A resolucao e feita uma unica vez e reutilizada nas chamadas seguintes,
+        evitando que cada comando do Restic precise localizar o snapshot mais
+        recente novamente. Outros IDs sao retornados sem alteracao.
+
+        Parameters
+        ----------
+        snapshot_id : str
+            ID do snapshot ou "latest"
+
+        Returns
+        -------
+        str
+            ID completo do snapshot
+        """
+        if snapshot_id != "latest":
+            return snapshot_id
+        if self._resolved_latest is None:
+            self.get_snapshot_info("latest")
+        return self._resolved_latest or snapshot_id
 
     @with_retry()
     def list_files(self, snapshot_id: str = "latest") -> List[Dict[str, Any]]:
@@ -617,6 +1057,81 @@ class ResticClient:
     def list_snapshot_files(self, snapshot_id: str = "latest") -> List[str]:
         return [f.get("path", "") for f in self.list_files(snapshot_id)]
 
+    def iter_snapshot_packs(self, snapshot_id: str, max_workers: int = 8) -> Iterator[str]:
+        """Itera os IDs dos packs que contem os blobs de um snapshot.
+
+        As arvores do snapshot sao percorridas nivel a nivel
+        (``restic cat snapshot`` e ``restic cat blob``, em paralelo) para
+        reunir os blobs usados; em seguida os arquivos de indice sao lidos
+        um a um (``restic cat index``) e cada pack com algum desses blobs e
+        entregue assim que encontrado, sem listar o repositorio inteiro.
+
+        Parameters
+        ----------
+        snapshot_id : str
+            ID completo do snapshot
+        max_workers : int, optional
+            Numero maximo de arvores lidas simultaneamente, por padrao 8
+
+        Yields
+        ------
+        str
+            IDs dos packs, sem repeticao
+
+        Raises
+        ------
+        ResticError
+            Se ocorrer um erro ao ler o snapshot, as arvores ou o indice
+        """
+        self.logger.info("Listando packs do snapshot %s", snapshot_id)
+        _, _, snapshot = self._run_command(
+            build_restic_command("cat", "snapshot", snapshot_id, repository=self.repository),
+            capture_json=True,
+        )
+        if not snapshot or not snapshot.get("tree"):
+            return
+
+        def read_tree(tree_id: str) -> Dict[str, Any]:
+            _, _, tree = self._run_command(
+                build_restic_command("cat", "blob", tree_id, repository=self.repository),
+                capture_json=True,
+            )
+            return tree or {}
+
+        blobs: Set[str] = set()
+        level = [snapshot["tree"]]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while level:
+                blobs.update(level)
+                subtrees: Dict[str, None] = {}
+                for tree in executor.map(read_tree, level):
+                    for node in tree.get("nodes") or ():
+                        blobs.update(node.get("content") or ())
+                        subtree = node.get("subtree")
+                        if subtree and subtree not in blobs:
+                            subtrees[subtree] = None
+                level = list(subtrees)
+
+        index_ids: List[str] = []
+        self._stream_command(
+            build_restic_command("list", "index", repository=self.repository),
+            lambda line: index_ids.append(line.decode("utf-8", "replace").strip()),
+        )
+
+        seen: Set[str] = set()
+        for index_id in index_ids:
+            _, _, index = self._run_command(
+                build_restic_command("cat", "index", index_id, repository=self.repository),
+                capture_json=True,
+            )
+            for pack in (index or {}).get("packs") or ():
+                pack_id = pack.get("id")
+                if not pack_id or pack_id in seen:
+                    continue
+                if any(blob.get("id") in blobs for blob in pack.get("blobs") or ()):
+                    seen.add(pack_id)
+                    yield pack_id
+
     @with_retry()
     def rebuild_index(self, read_all_packs: bool = False) -> bool:
         """Reconstrói o indice do repositorio.
@@ -701,12 +1216,22 @@ class ResticClient:
             stderr=subprocess.STDOUT,
             text=True,
             bufsize=1,
+            close_fds=SPAWN_CLOSE_FDS,
         )
         return process
 
     @with_retry()
     def restore_snapshot(
-        self, target_dir: str, snapshot_id: str = "latest", include_paths: Optional[List[str]] = None
+        self,
+        target_dir: str,
+        snapshot_id: str = "latest",
+        include_paths: Optional[List[str]] = None,
+        connections: Optional[int] = None,
+        overwrite_mode: Optional[str] = None,
+        sparse: bool = False,
+        nice: Optional[int] = None,
+        ionice_class: Optional[int] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> bool:
         """Restaura um snapshot completo ou arquivos especificos.
 
@@ -718,6 +1243,24 @@ class ResticClient:
             ID do snapshot ou "latest", por padrao "latest"
         include_paths : Optional[List[str]], optional
             Lista de caminhos especificos a restaurar, por padrao None (restaura tudo)
+        connections : Optional[int], optional
+            Numero de conexoes paralelas ao backend (``-o <backend>.connections``),
+            por padrao None (usa o padrao do Restic)
+        overwrite_mode : Optional[str], optional
+            Valor de ``--overwrite`` (ex: "if-newer" para pular arquivos ja
+            presentes e atualizados), por padrao None. Requer Restic 0.17+
+        sparse : bool, optional
+            Se True, restaura arquivos esparsos com ``--sparse``, por padrao
+            False. Requer Restic 0.15+
+        nice : Optional[int], optional
+            Incremento de ``nice`` para o processo do Restic, por padrao None.
+            Apenas no Linux
+        ionice_class : Optional[int], optional
+            Classe de E/S do ``ionice`` (3 = ociosa), por padrao None. Apenas
+            no Linux
+        progress : Optional[Callable[[Dict[str, Any]], None]], optional
+            Funcao chamada com cada mensagem ``status`` do Restic (``--json``),
+            por padrao None. Requer Restic 0.17+
 
         Returns
         -------
@@ -729,10 +1272,13 @@ class ResticClient:
         ResticError
             Se ocorrer um erro durante a restauracao
         """
-        # Garantir que o diretorio de destino existe
-        Path(target_dir).mkdir(parents=True, exist_ok=True)
+        # Garantir que o diretorio de destino existe (em geral ja criado pelo
+        # chamador; um stat evita o mkdir que falharia com EEXIST)
+        if not os.path.isdir(target_dir):
+            os.makedirs(target_dir, exist_ok=True)
 
-        cmd = build_restic_command(
+        snapshot_id = self.resolve_snapshot_id(snapshot_id)
+        cmd = build_priority_prefix(nice, ionice_class) + build_restic_command(
             "restore", snapshot_id, "--target", target_dir, repository=self.repository
         )
 
@@ -741,12 +1287,46 @@ class ResticClient:
             for path in include_paths:
                 cmd.extend(["--include", path])
 
+        if connections:
+            cmd.extend(build_connections_option(self.provider, connections))
+
+        # Flags dependentes de versao sao ignoradas em versoes antigas do Restic
+        if overwrite_mode:
+            if self.get_version_info() >= (0, 17):
+                cmd.extend(["--overwrite", overwrite_mode])
+            else:
+                self.logger.warning("--overwrite requer Restic 0.17+; opcao ignorada")
+        if sparse:
+            if self.get_version_info() >= (0, 15):
+                cmd.append("--sparse")
+            else:
+                self.logger.warning("--sparse requer Restic 0.15+; opcao ignorada")
+
         self.logger.info(
             "Restaurando snapshot %s para %s", snapshot_id, target_dir
         )
 
-        success, _, _ = self._run_command(cmd)
-        return success
+        # A saida e lida do pipe conforme chega, sem acumular em memoria
+        if progress is not None and self.get_version_info() < (0, 17):
+            self.logger.warning("Progresso em JSON requer Restic 0.17+; opcao ignorada")
+            progress = None
+        if progress is None:
+            self._stream_command(cmd, self._log_output_line)
+            return True
+
+        def on_message(message: Dict[str, Any]) -> None:
+            if message.get("message_type") == "status":
+                progress(message)
+
+        cmd.append("--json")
+        summary = self._run_json_messages(cmd, on_message)
+        if summary:
+            self.logger.info(
+                "Restauracao concluida: %s arquivos, %s bytes restaurados",
+                summary.get("files_restored", 0),
+                summary.get("bytes_restored", 0),
+            )
+        return True
 
     @with_retry()
     def get_repository_stats(self, mode: str = "raw-data") -> Dict[str, Any]:
@@ -770,15 +1350,13 @@ class ResticClient:
         """
         self.logger.info("Obtendo estatisticas do repositorio (modo: %s)", mode)
         _, _, json_data = self._run_command(
-            [
-                "restic",
-                "-r",
-                self.repository,
+            build_restic_command(
                 "stats",
                 "--mode",
                 mode,
                 "--json",
-            ],
+                repository=self.repository,
+            ),
             capture_json=True,
         )
 
@@ -801,9 +1379,9 @@ class ResticClient:
             Caminho completo do diretorio criado
         """
         timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        restore_dir = Path(base_dir) / timestamp
-        restore_dir.mkdir(parents=True, exist_ok=True)
-        return str(restore_dir)
+        restore_dir = os.path.join(base_dir, timestamp)
+        os.makedirs(restore_dir, exist_ok=True)
+        return restore_dir
 
 
 def load_env_and_get_credential_source() -> str:
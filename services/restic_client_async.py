@@ -9,7 +9,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-import re
+import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
 
@@ -20,10 +20,15 @@ from .restic_common import (
     ResticNetworkError,
     ResticPermissionError,
     ResticRepositoryError,
+    SPAWN_CLOSE_FDS,
+    SNAPSHOT_SAVED_RE,
     analyze_command_error,
+    parse_json,
 )
 from .restic_base import (
+    build_option_args,
     build_restic_command,
+    build_retention_args,
     redact_secrets,
     with_async_retry,
 )
@@ -31,6 +36,9 @@ from .restic_base import (
 # Configuracao de logger
 logger = logging.getLogger(__name__)
 
+# Tamanho dos blocos lidos dos pipes do processo
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class ResticClientAsync:
     """Cliente assincrono para operacoes do Restic.
@@ -86,7 +94,8 @@ class ResticClientAsync:
         timeout : Optional[int]
             Tempo limite em segundos
         capture_json : bool
-            Se deve capturar e analisar a saida como JSON
+            Indica que a saida e JSON; a decodificacao fica a cargo do
+            chamador, para que o conteudo nao seja decodificado duas vezes
             
         Returns
         -------
@@ -107,33 +116,35 @@ class ResticClientAsync:
         logger.debug(f"Executando: {' '.join(safe_cmd)}")
         
         try:
-            # Criar processo
+            # Criar processo (os pipes do asyncio trabalham apenas com bytes)
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 env=self.env,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                text=True,
+                close_fds=SPAWN_CLOSE_FDS,
             )
             
-            # Aguardar conclusao com timeout
+            # Drenar stdout e stderr em paralelo enquanto o processo executa
             try:
-                if timeout:
-                    stdout, stderr = await asyncio.wait_for(
-                        process.communicate(), timeout=timeout
-                    )
-                else:
-                    stdout, stderr = await process.communicate()
+                stdout, stderr, returncode = await asyncio.wait_for(
+                    asyncio.gather(
+                        self._read_stream(process.stdout),
+                        self._read_stream(process.stderr, log_lines=True),
+                        process.wait(),
+                    ),
+                    timeout=timeout or None,
+                )
             except asyncio.TimeoutError:
                 # Matar processo em caso de timeout
                 try:
                     process.kill()
                 except Exception:
                     pass
-                raise ResticError(f"Comando excedeu o timeout de {timeout}s")
-            
-            # Obter codigo de retorno
-            returncode = process.returncode
+                raise ResticError(
+                    message=f"Comando excedeu o timeout de {timeout}s",
+                    command=safe_cmd,
+                )
             
             # Redigir segredos na saida
             safe_stdout = redact_secrets(stdout)
@@ -143,13 +154,6 @@ class ResticClientAsync:
             if returncode != 0:
                 analyze_command_error(cmd, returncode, safe_stdout, safe_stderr)
             
-            # Capturar JSON se solicitado
-            if capture_json and safe_stdout:
-                try:
-                    json.loads(safe_stdout)
-                except json.JSONDecodeError:
-                    logger.warning("Falha ao analisar saida como JSON")
-            
             return returncode, safe_stdout, safe_stderr
             
         except ResticError:
@@ -157,7 +161,44 @@ class ResticClientAsync:
             raise
         except Exception as e:
             # Converter outras excecoes
-            raise ResticError(f"Erro ao executar comando: {str(e)}")
+            raise ResticError(
+                message=f"Erro ao executar comando: {str(e)}",
+                command=safe_cmd,
+            )
+    
+    @staticmethod
+    async def _read_stream(
+        stream: Optional[asyncio.StreamReader],
+        log_lines: bool = False,
+    ) -> str:
+        """Le um pipe do processo ate o fim sem bloquear o loop de eventos.
+        
+        Parameters
+        ----------
+        stream : Optional[asyncio.StreamReader]
+            Pipe de saida do processo
+        log_lines : bool
+            Se True, registra cada linha em nivel DEBUG conforme ela chega
+            
+        Returns
+        -------
+        str
+            Conteudo completo do pipe decodificado como UTF-8
+        """
+        if stream is None:
+            return ""
+        
+        chunks: List[bytes] = []
+        if log_lines:
+            # Saida de progresso/erro do Restic: linhas curtas, registradas ao vivo
+            async for line in stream:
+                chunks.append(line)
+                logger.debug(redact_secrets(line.decode("utf-8", errors="replace").rstrip()))
+        else:
+            # Saida JSON pode vir em uma unica linha longa; ler em blocos
+            while chunk := await stream.read(STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+        return b"".join(chunks).decode("utf-8", errors="replace")
     
     @with_async_retry()
     async def check_repository_access(self) -> bool:
@@ -216,15 +257,9 @@ class ResticClientAsync:
         # Construir comando
         cmd = ["backup"]
         
-        # Adicionar tags
-        if tags:
-            for tag in tags:
-                cmd.extend(["--tag", tag])
-        
-        # Adicionar exclusoes
-        if excludes:
-            for pattern in excludes:
-                cmd.extend(["--exclude", pattern])
+        # Adicionar tags e exclusoes
+        cmd.extend(build_option_args("--tag", tags))
+        cmd.extend(build_option_args("--exclude", excludes))
         
         # Adicionar caminhos
         cmd.extend(paths)
@@ -234,7 +269,7 @@ class ResticClientAsync:
             _, stdout, _ = await self._run_command(cmd)
             
             # Extrair ID do snapshot
-            match = re.search(r"snapshot ([a-f0-9]+) saved", stdout)
+            match = SNAPSHOT_SAVED_RE.search(stdout)
             if match:
                 return match.group(1)
             else:
@@ -274,7 +309,7 @@ class ResticClientAsync:
             _, stdout, _ = await self._run_command(cmd, capture_json=True)
             
             # Analisar saida JSON
-            snapshots = json.loads(stdout)
+            snapshots = parse_json(stdout)
             return snapshots
         except ResticError as e:
             logger.error(f"Erro ao listar snapshots: {str(e)}")
@@ -309,7 +344,7 @@ class ResticClientAsync:
             )
             
             # Analisar saida JSON
-            files = json.loads(stdout)
+            files = parse_json(stdout)
             return files
         except ResticError as e:
             logger.error(f"Erro ao listar arquivos: {str(e)}")
@@ -349,7 +384,7 @@ class ResticClientAsync:
         cmd = ["restore", snapshot_id, "--target", target_dir]
 
         # Garantir que o diretorio de destino existe
-        Path(target_dir).mkdir(parents=True, exist_ok=True)
+        os.makedirs(target_dir, exist_ok=True)
 
         # Adicionar caminhos de inclusao
         if include_paths:
@@ -438,17 +473,16 @@ class ResticClientAsync:
         # Construir comando
         cmd = ["forget", "--prune"]
         
-        # Adicionar politicas de retencao
-        if keep_last is not None:
-            cmd.extend(["--keep-last", str(keep_last)])
-        if keep_daily is not None:
-            cmd.extend(["--keep-daily", str(keep_daily)])
-        if keep_weekly is not None:
-            cmd.extend(["--keep-weekly", str(keep_weekly)])
-        if keep_monthly is not None:
-            cmd.extend(["--keep-monthly", str(keep_monthly)])
-        if keep_yearly is not None:
-            cmd.extend(["--keep-yearly", str(keep_yearly)])
+        # Adicionar politicas de retencao (limites zerados sao omitidos)
+        cmd.extend(
+            build_retention_args(
+                keep_last=keep_last,
+                keep_daily=keep_daily,
+                keep_weekly=keep_weekly,
+                keep_monthly=keep_monthly,
+                keep_yearly=keep_yearly,
+            )
+        )
         
         # Adicionar tags a manter
         if keep_tags:
@@ -485,7 +519,7 @@ class ResticClientAsync:
             )
             
             # Analisar saida JSON
-            stats = json.loads(stdout)
+            stats = parse_json(stdout)
             return stats
         except ResticError as e:
             logger.error(f"Erro ao obter estatisticas: {str(e)}")
@@ -2,9 +2,53 @@ from __future__ import annotations
 
 """Funcoes e classes utilitarias compartilhadas entre clientes Restic."""
 
+import json
 import re
+import shutil
+import sys
 from dataclasses import dataclass
-from typing import List, Optional, Sequence
+from datetime import datetime
+from functools import lru_cache
+from typing import IO, Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Importacao condicional do orjson (parse de JSON mais rapido)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Importacao condicional do ciso8601 (parse de timestamps mais rapido)
+try:
+    import ciso8601
+    CISO8601_AVAILABLE = True
+except ImportError:
+    ciso8601 = None
+    CISO8601_AVAILABLE = False
+
+# Importacao condicional do ijson (parse incremental de arrays JSON)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    ijson = None
+    IJSON_AVAILABLE = False
+
+# A partir do Python 3.11, ``datetime.fromisoformat`` aceita o sufixo ``Z`` e
+# fracoes de segundo com mais de 6 digitos (o Restic usa nanossegundos)
+NATIVE_FROMISOFORMAT = sys.version_info >= (3, 11)
+
+# Em POSIX os descritores abertos pelo Python ja nao sao herdaveis (PEP 446);
+# sem ``close_fds`` o ``subprocess`` pode usar ``posix_spawn``/``vfork`` em vez
+# de varrer ``/proc/self/fd`` fechando descritores antes do ``exec``
+SPAWN_CLOSE_FDS = sys.platform == "win32"
+
+# Linha do ``restic backup`` (saida texto) com o ID do snapshot criado
+SNAPSHOT_SAVED_RE = re.compile(r"snapshot ([a-f0-9]+) saved")
+
+# Digitos de fracao alem dos microssegundos, descartados no Python 3.10
+_EXTRA_FRACTION_RE = re.compile(r"(\.\d{6})\d+")
 
 
 @dataclass
@@ -51,32 +95,187 @@ class ResticCommandError(ResticError):
     pass
 
 
+# Padroes de redacao compilados uma unica vez (aplicados a cada linha de log)
+_REDACT_PATTERNS = [
+    (re.compile(r"(RESTIC_PASSWORD=)[^\s,]+"), r"\1REDACTED"),
+    (re.compile(r"(AWS_[^=]+=)[^\s,]+"), r"\1REDACTED"),
+    (re.compile(r"(AZURE_[^=]+=)[^\s,]+"), r"\1REDACTED"),
+    (re.compile(r"(GOOGLE_[^=]+=)[^\s,]+"), r"\1REDACTED"),
+    (re.compile(r"(-p|--password) [^\s]+"), r"\1 REDACTED"),
+    (re.compile(r"(-p|--password-file) [^\s]+"), r"\1 REDACTED"),
+]
+
+
 def redact_secrets(text: str) -> str:
     """Redaciona senhas e chaves de acesso em strings de texto."""
 
-    patterns = [
-        (r"(RESTIC_PASSWORD=)[^\s,]+", r"\1REDACTED"),
-        (r"(AWS_[^=]+=)[^\s,]+", r"\1REDACTED"),
-        (r"(AZURE_[^=]+=)[^\s,]+", r"\1REDACTED"),
-        (r"(GOOGLE_[^=]+=)[^\s,]+", r"\1REDACTED"),
-        (r"(-p|--password) [^\s]+", r"\1 REDACTED"),
-        (r"(-p|--password-file) [^\s]+", r"\1 REDACTED"),
-    ]
-
     result = text
-    for pattern, replacement in patterns:
-        result = re.sub(pattern, replacement, result)
+    for pattern, replacement in _REDACT_PATTERNS:
+        result = pattern.sub(replacement, result)
     return result
 
 
+def parse_json(data: Union[str, bytes]) -> Any:
+    """Decodifica a saida JSON do Restic usando ``orjson`` quando disponivel.
+
+    ``orjson.JSONDecodeError`` herda de ``json.JSONDecodeError``, portanto os
+    chamadores podem continuar tratando apenas a excecao da biblioteca padrao.
+    """
+
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json(data: Any, indent: bool = False) -> bytes:
+    """Serializa ``data`` em JSON (UTF-8) usando ``orjson`` quando disponivel.
+
+    Com ``indent`` a saida e indentada com 2 espacos, para arquivos lidos por
+    pessoas.
+    """
+
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def iter_json_array(stream: IO[bytes]) -> Iterator[Any]:
+    """Itera sobre os elementos de um array JSON lido de ``stream``.
+
+    Com ``ijson`` cada elemento e decodificado assim que chega, sem manter a
+    saida completa em memoria; sem ele, o conteudo e lido e decodificado de
+    uma vez com :func:`parse_json`. Em ambos os casos, JSON invalido gera
+    ``json.JSONDecodeError``.
+    """
+
+    if IJSON_AVAILABLE:
+        try:
+            yield from ijson.items(stream, "item", use_float=True)
+        except ijson.JSONError as exc:
+            raise json.JSONDecodeError(str(exc), "", 0) from exc
+        return
+    data = stream.read()
+    if data:
+        yield from parse_json(data)
+
+
+@lru_cache(maxsize=256)
+def parse_snapshot_time(value: str) -> datetime:
+    """Converte o campo ``time`` de um snapshot em ``datetime``.
+
+    Usa ``ciso8601`` quando disponivel; caso contrario recorre a
+    ``datetime.fromisoformat``, que no Python 3.11+ aceita o formato do Restic
+    sem ajustes. No Python 3.10 o sufixo ``Z`` e os nanossegundos sao
+    convertidos antes. O resultado e memorizado: a restauracao consulta o
+    mesmo horario para o diretorio de destino e para o resumo exibido.
+    """
+
+    if CISO8601_AVAILABLE:
+        return ciso8601.parse_datetime(value)
+    if NATIVE_FROMISOFORMAT:
+        return datetime.fromisoformat(value)
+    return datetime.fromisoformat(
+        _EXTRA_FRACTION_RE.sub(r"\1", value.replace("Z", "+00:00"), count=1)
+    )
+
+
+@lru_cache(maxsize=1)
+def resolve_restic_binary() -> str:
+    """Resolve o caminho absoluto do executavel do Restic uma unica vez.
+
+    Com o caminho absoluto em ``argv[0]`` o processo filho e executado
+    diretamente, sem percorrer o ``PATH`` a cada chamada. Se o executavel
+    nao for encontrado, retorna ``"restic"`` e deixa o erro para a execucao.
+    """
+
+    return shutil.which("restic") or "restic"
+
+
+@lru_cache(maxsize=8)
+def _base_command(binary: str, repository: Optional[str]) -> Tuple[str, ...]:
+    """Prefixo ``(restic, -r, repositorio)``, montado uma vez por repositorio."""
+
+    if repository:
+        return (binary, "-r", repository)
+    return (binary,)
+
+
 def build_restic_command(*args: str, repository: Optional[str] = None) -> List[str]:
     """Constroi a lista de comando base do Restic."""
 
-    cmd: List[str] = ["restic"]
-    if repository:
-        cmd.extend(["-r", repository])
-    cmd.extend(list(args))
-    return cmd
+    return [*_base_command(resolve_restic_binary(), repository), *args]
+
+
+def build_priority_prefix(
+    nice: Optional[int] = None, ionice_class: Optional[int] = None
+) -> List[str]:
+    """Monta o prefixo ``nice``/``ionice`` para reduzir a prioridade do Restic.
+
+    Usa os utilitarios do sistema em vez de ``preexec_fn``, que nao e seguro
+    quando o processo pai tem threads (ex: restauracoes em paralelo). Fora do
+    Linux, ou se o utilitario nao estiver instalado, a opcao e ignorada.
+
+    Parameters
+    ----------
+    nice : Optional[int], optional
+        Incremento de ``nice`` (ex: 10), por padrao None
+    ionice_class : Optional[int], optional
+        Classe de E/S do ``ionice`` (1 tempo real, 2 best-effort, 3 ociosa),
+        por padrao None
+
+    Returns
+    -------
+    List[str]
+        Argumentos a inserir antes do executavel do Restic
+    """
+
+    prefix: List[str] = []
+    if not sys.platform.startswith("linux"):
+        return prefix
+    if ionice_class is not None:
+        ionice = shutil.which("ionice")
+        if ionice:
+            prefix.extend([ionice, "-c", str(ionice_class)])
+    if nice is not None:
+        nice_bin = shutil.which("nice")
+        if nice_bin:
+            prefix.extend([nice_bin, "-n", str(nice)])
+    return prefix
+
+
+def build_option_args(flag: str, items: Optional[Iterable[str]]) -> List[str]:
+    """Converte ``items`` em pares ``flag valor`` ignorando entradas vazias.
+
+    Cada item e normalizado com ``strip`` uma unica vez, em uma so passada.
+    """
+
+    args: List[str] = []
+    if not items:
+        return args
+    append = args.append
+    for item in items:
+        value = item.strip()
+        if value:
+            append(flag)
+            append(value)
+    return args
+
+
+def build_retention_args(**keep: Optional[int]) -> List[str]:
+    """Converte limites ``keep_*`` nas flags ``--keep-*`` do ``restic forget``.
+
+    Valores ``None`` ou ``0`` sao omitidos: para o Restic eles equivalem a nao
+    informar a regra, e omiti-los mantem a linha de comando curta.
+
+    Exemplo: ``build_retention_args(keep_daily=7, keep_hourly=0)`` retorna
+    ``["--keep-daily", "7"]``.
+    """
+
+    args: List[str] = []
+    for name, value in keep.items():
+        if value:
+            args.extend(("--" + name.replace("_", "-"), str(value)))
+    return args
 
 
 def analyze_command_error(
@@ -0,0 +1,105 @@
+"""Montagem do ambiente repassado aos processos do Restic.
+
+Em vez de copiar todo o ``os.environ`` para cada processo filho, apenas as
+variaveis que o Restic (e o runtime Go dele) realmente consultam sao
+repassadas: credenciais dos backends, configuracao de proxy/TLS, cache e as
+variaveis basicas de sistema de cada plataforma.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Dict, Mapping, Optional
+
+# Prefixos de variaveis lidas pelo Restic e pelos backends suportados
+RESTIC_ENV_PREFIXES = (
+    "RESTIC_",
+    "AWS_",
+    "AZURE_",
+    "GOOGLE_",
+    "B2_",
+    "OS_",
+    "ST_",
+    "RCLONE_",
+)
+
+# Variaveis de sistema necessarias para o processo filho (Linux, macOS e Windows)
+RESTIC_ENV_KEYS = frozenset(
+    {
+        "PATH",
+        "HOME",
+        "USER",
+        "USERNAME",
+        "LANG",
+        "LC_ALL",
+        "TZ",
+        "TMPDIR",
+        "TMP",
+        "TEMP",
+        "XDG_CACHE_HOME",
+        "HTTP_PROXY",
+        "HTTPS_PROXY",
+        "NO_PROXY",
+        "SSL_CERT_FILE",
+        "SSL_CERT_DIR",
+        "GOMAXPROCS",
+        "GOGC",
+        "GODEBUG",
+        "SYSTEMROOT",
+        "SYSTEMDRIVE",
+        "WINDIR",
+        "COMSPEC",
+        "PATHEXT",
+        "APPDATA",
+        "LOCALAPPDATA",
+        "USERPROFILE",
+    }
+)
+
+
+def is_restic_env_key(key: str) -> bool:
+    """Indica se ``key`` deve ser repassada ao processo do Restic."""
+    upper = key.upper()
+    return upper in RESTIC_ENV_KEYS or upper.startswith(RESTIC_ENV_PREFIXES)
+
+
+def build_restic_env(source: Optional[Mapping[str, str]] = None) -> Dict[str, str]:
+    """Retorna o subconjunto de ``source`` relevante para o Restic.
+
+    Parameters
+    ----------
+    source : Optional[Mapping[str, str]], optional
+        Ambiente de origem, por padrao ``os.environ``
+
+    Returns
+    -------
+    Dict[str, str]
+        Novo dicionario contendo apenas as variaveis usadas pelo Restic
+    """
+    if source is None:
+        source = os.environ
+    return {key: value for key, value in source.items() if is_restic_env_key(key)}
+
+
+def default_cache_dir() -> str:
+    """Diretorio de cache que o Restic usaria por padrao nesta maquina.
+
+    Resolvido pelo processo Python, que tem o ambiente completo: repassado
+    explicitamente em ``RESTIC_CACHE_DIR``, garante que varios comandos usem
+    o mesmo cache persistente mesmo quando o ambiente do processo filho nao
+    tem ``HOME``/``LOCALAPPDATA`` (ex: tarefas agendadas).
+
+    Returns
+    -------
+    str
+        ``%LOCALAPPDATA%\\restic`` no Windows, ``~/Library/Caches/restic`` no
+        macOS e ``$XDG_CACHE_HOME/restic`` (ou ``~/.cache/restic``) nos demais
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "restic")
@@ -0,0 +1,52 @@
+"""Opcoes de linha de comando compartilhadas pelos comandos de restauracao.
+
+Usado por ``restore_snapshot.py``, ``restore_file.py`` e pela CLI
+``safestic restore``. Depende apenas do ``argparse`` para que a CLI possa
+montar o parser sem carregar o cliente Restic.
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Optional
+
+
+def add_restore_arguments(
+    parser: argparse.ArgumentParser, default_connections: Optional[int] = None
+) -> argparse.ArgumentParser:
+    """Adiciona ``--id``, ``--connections``, ``--nice`` e ``--ionice-class``.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser que recebera as opcoes
+    default_connections : Optional[int], optional
+        Valor padrao de ``--connections``; None deixa a escolha para o
+        chamador (ex: calcular apenas quando o comando for executado)
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        O proprio ``parser``, para encadeamento
+    """
+    parser.add_argument("--id", default="latest", help="ID do snapshot (default: latest)")
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=default_connections,
+        help="Conexoes paralelas ao backend durante a restauracao (default: 4 por CPU, maximo 64)",
+    )
+    parser.add_argument(
+        "--nice",
+        type=int,
+        default=None,
+        help="Reduz a prioridade de CPU do Restic com nice -n N (apenas Linux)",
+    )
+    parser.add_argument(
+        "--ionice-class",
+        type=int,
+        choices=(1, 2, 3),
+        default=None,
+        help="Classe de E/S do Restic via ionice; 3 = ociosa (apenas Linux)",
+    )
+    return parser
@@ -6,10 +6,41 @@ Funções auxiliares para criação de estrutura de pastas baseada em timestamp
 
 import os
 import re
-from datetime import datetime
-from pathlib import Path
 from typing import Dict, Any
 
+from .restic_common import parse_snapshot_time
+
+# Letra de unidade do Windows (ex: "C:\\") ou separador inicial
+_ROOT_PREFIX_RE = re.compile(r"^(?:([A-Za-z]):)?[\\/]?")
+
+
+def normalize_restore_path(original_path: str) -> str:
+    """
+    Converte um caminho original em caminho relativo ao destino do restore.
+    
+    Exemplo: "C:\\Users\\foo" -> "C/Users/foo" e "/home/foo" -> "home/foo".
+    
+    Parameters
+    ----------
+    original_path : str
+        Caminho como registrado no snapshot
+        
+    Returns
+    -------
+    str
+        Caminho relativo, com a unidade sem ``:`` e separadores ``/``
+    """
+    normalized_path = _ROOT_PREFIX_RE.sub(
+        lambda match: f"{match.group(1)}/" if match.group(1) else "", original_path, count=1
+    )
+    return normalized_path.replace("\\", "/")
+
+
+def _timestamped_restore_dir(base_restore_dir: str, snapshot_data: Dict[str, Any]) -> str:
+    """Retorna ``base_restore_dir/AAAA-MM-DD-HHMMSS`` sem criar a pasta."""
+    snapshot_time = parse_snapshot_time(snapshot_data["time"])
+    return os.path.join(base_restore_dir, snapshot_time.strftime("%Y-%m-%d-%H%M%S"))
+
 
 def create_timestamped_restore_path(
     base_restore_dir: str,
@@ -35,19 +66,11 @@ def create_timestamped_restore_path(
     str
         Caminho completo da estrutura de restore criada
     """
-    # Extrair e formatar timestamp do snapshot
-    snapshot_time = datetime.fromisoformat(
-        snapshot_data["time"].replace("Z", "+00:00")
-    )
-    
-    # Formato: AAAA-MM-DD-HHMMSS
-    timestamp_str = snapshot_time.strftime("%Y-%m-%d-%H%M%S")
+    # Criar pasta com timestamp (formato: AAAA-MM-DD-HHMMSS)
+    timestamped_dir = _timestamped_restore_dir(base_restore_dir, snapshot_data)
+    os.makedirs(timestamped_dir, exist_ok=True)
     
-    # Criar pasta com timestamp
-    timestamped_dir = Path(base_restore_dir) / timestamp_str
-    timestamped_dir.mkdir(parents=True, exist_ok=True)
-    
-    return str(timestamped_dir)
+    return timestamped_dir
 
 
 def create_full_restore_structure(
@@ -76,25 +99,19 @@ def create_full_restore_structure(
     str
         Caminho completo incluindo estrutura de diretórios original
     """
-    # Criar pasta com timestamp
-    timestamped_dir = create_timestamped_restore_path(base_restore_dir, snapshot_data)
-    
     if not original_path:
-        return timestamped_dir
-    
-    # Normalizar caminho original removendo caracteres especiais do Windows
-    # Converter C:\ para C\ para evitar problemas com dois pontos
-    normalized_path = original_path.replace(":", "")
+        return create_timestamped_restore_path(base_restore_dir, snapshot_data)
     
-    # Remover barras iniciais se existirem
-    if normalized_path.startswith(("\\", "/")):
-        normalized_path = normalized_path[1:]
+    # Converter C:\ para C/ para evitar problemas com dois pontos
+    normalized_path = normalize_restore_path(original_path)
     
-    # Criar estrutura completa
-    full_restore_path = Path(timestamped_dir) / normalized_path
-    full_restore_path.mkdir(parents=True, exist_ok=True)
+    # Criar estrutura completa de uma vez, incluindo a pasta com timestamp
+    full_restore_path = os.path.join(
+        _timestamped_restore_dir(base_restore_dir, snapshot_data), normalized_path
+    )
+    os.makedirs(full_restore_path, exist_ok=True)
     
-    return str(full_restore_path)
+    return full_restore_path
 
 
 def get_snapshot_paths_from_data(snapshot_data: Dict[str, Any]) -> list:
@@ -142,9 +159,7 @@ def format_restore_info(
     Dict[str, str]
         Informações formatadas para exibição
     """
-    snapshot_time = datetime.fromisoformat(
-        snapshot_data["time"].replace("Z", "+00:00")
-    )
+    snapshot_time = parse_snapshot_time(snapshot_data["time"])
     
     info = {
         "snapshot_id": snapshot_data.get("short_id", "N/A"),
@@ -160,4 +175,32 @@ def format_restore_info(
     if original_paths:
         info["backup_paths"] = ", ".join(original_paths)
     
-    return info
\ No newline at end of file
+    return info
+
+
+def format_restore_progress(status: Dict[str, Any]) -> str:
+    """
+    Formata uma mensagem ``status`` do ``restic restore --json`` em uma linha.
+    
+    Parameters
+    ----------
+    status : Dict[str, Any]
+        Mensagem de progresso emitida pelo Restic
+        
+    Returns
+    -------
+    str
+        Linha de progresso, ex: "42.0% | 120/300 arquivos | 1.5/3.6 GiB | 83s"
+    """
+    gib = 1024 ** 3
+    return (
+        f"{status.get('percent_done', 0) * 100:.1f}% | "
+        f"{status.get('files_restored', 0)}/{status.get('total_files', 0)} arquivos | "
+        f"{status.get('bytes_restored', 0) / gib:.1f}/{status.get('total_bytes', 0) / gib:.1f} GiB | "
+        f"{status.get('seconds_elapsed', 0)}s"
+    )
+
+
+def print_restore_progress(status: Dict[str, Any]) -> None:
+    """Reescreve a linha de progresso no console a cada mensagem ``status``."""
+    print(f"\r{format_restore_progress(status)}", end="", flush=True)
@@ -9,13 +9,26 @@ e execucao de comandos externos.
 
 from __future__ import annotations
 
+import logging
 import os
-from pathlib import Path
-from typing import Any, Dict, Optional, Sequence, TextIO, Union, cast
+import sys
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, TextIO, Union, cast
 
-from .restic import load_restic_env, load_restic_config, ResticConfig
+from .restic import load_restic_env, load_restic_config, ResticConfig, RetentionPolicy
 from .env import get_credential_source
-from .logger import create_log_file, log as _log, run_cmd as _run_cmd, redact_secrets
+from .logger import create_log_file, format_log_entry, run_cmd as _run_cmd, redact_secrets
+from .snapshot_cache import clear_lookup_memo
+
+# Entradas acumuladas antes de forcar a escrita do buffer de log
+LOG_FLUSH_BATCH = 64
+
+# Intervalo maximo (segundos) entre escritas do buffer de log
+LOG_FLUSH_INTERVAL = 0.25
+
+# Niveis escritos imediatamente, sem aguardar o lote
+_IMMEDIATE_FLUSH_LEVELS = logging.ERROR
 
 
 class ResticScript:
@@ -40,6 +53,7 @@ class ResticScript:
     ):
         self.log_prefix = log_prefix
         self.log_dir = log_dir or os.getenv("LOG_DIR", "logs")
+        self.log_level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
         # Se credential_source não for especificado, obter do .env
         if credential_source is None:
             credential_source = get_credential_source()
@@ -50,7 +64,15 @@ class ResticScript:
         self.log_filename: str = ""
         self.log_file: Optional[TextIO] = None
         self.config: Optional[ResticConfig] = None
+        self.backup_source_dirs: List[str] = []
+        self.excludes: List[str] = []
+        self.tags: List[str] = []
+        self.retention: Optional[RetentionPolicy] = None
         self.start_time = None
+        self._log_buffer: Deque[str] = deque()
+        self._log_lock = threading.Lock()
+        self._flush_stop = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
 
     def __enter__(self) -> "ResticScript":
         try:
@@ -60,6 +82,10 @@ class ResticScript:
             # Carregar configuracao completa validada
             try:
                 self.config = load_restic_config(self.credential_source)
+                self.backup_source_dirs = self.config.backup_source_dirs
+                self.excludes = self.config.restic_excludes
+                self.tags = self.config.restic_tags
+                self.retention = self.config.retention
             except Exception as exc:
                 print(f"[AVISO] Falha ao carregar configuracao completa: {exc}")
                 print("[AVISO] Continuando com configuracao basica")
@@ -68,12 +94,20 @@ class ResticScript:
             raise SystemExit(1)
 
         try:
-            # Criar diretorio de log se nao existir
-            Path(self.log_dir).mkdir(parents=True, exist_ok=True)
-            
-            # Criar arquivo de log
+            # Criar arquivo de log (create_log_file cria o diretorio se preciso)
             self.log_filename = create_log_file(self.log_prefix, self.log_dir)
-            self.log_file = open(self.log_filename, "w", encoding="utf-8")
+            # Line-buffered: cada escrita terminada em quebra de linha chega
+            # ao disco sem depender de flush() explicito
+            self.log_file = open(self.log_filename, "w", encoding="utf-8", buffering=1)
+            
+            # Escrever o buffer de log periodicamente em segundo plano
+            self._flush_stop.clear()
+            self._flush_thread = threading.Thread(
+                target=self._flush_periodically,
+                name=f"{self.log_prefix}-log-flush",
+                daemon=True,
+            )
+            self._flush_thread.start()
             
             # Registrar inicio da execucao
             self.log(
@@ -92,6 +126,9 @@ class ResticScript:
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
+        # Descartar snapshots memorizados durante a execucao
+        clear_lookup_memo()
+
         if exc_type is not None:
             # Registrar excecao nao tratada
             if self.log_file is not None:
@@ -112,16 +149,38 @@ class ResticScript:
                 level="INFO",
                 extra={"action": "script_end"}
             )
+            self._flush_stop.set()
+            if self._flush_thread is not None:
+                self._flush_thread.join()
+                self._flush_thread = None
+            self.flush_log()
             self.log_file.close()
 
     # Convenience wrappers -------------------------------------------------
-    def log(self, message: str, level: str = "INFO", extra: Optional[Dict[str, Any]] = None) -> None:
+    def is_enabled_for(self, level: str) -> bool:
+        """Indica se mensagens de ``level`` passam pelo filtro de ``LOG_LEVEL``."""
+        return getattr(logging, level.upper(), logging.INFO) >= self.log_level
+
+    def log(
+        self,
+        message: str,
+        *args: Any,
+        level: str = "INFO",
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
         """Escreve ``message`` no arquivo de log e stdout com nivel e contexto.
         
+        A interpolacao no estilo ``%`` com ``args`` so e feita se o nivel da
+        mensagem nao for filtrado por ``LOG_LEVEL``. As entradas sao
+        acumuladas e escritas em lote (a cada ``LOG_FLUSH_BATCH`` entradas ou
+        ``LOG_FLUSH_INTERVAL`` segundos); erros sao escritos imediatamente.
+        
         Parameters
         ----------
         message : str
-            Mensagem a ser registrada
+            Mensagem a ser registrada, opcionalmente com marcadores ``%s``
+        *args : Any
+            Valores interpolados em ``message``
         level : str
             Nivel de log (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         extra : Optional[Dict[str, Any]]
@@ -130,13 +189,42 @@ class ResticScript:
         if self.log_file is None:  # pragma: no cover - defensive programming
             raise RuntimeError("ResticScript nao inicializado")
         
+        if not self.is_enabled_for(level):
+            return
+        if args:
+            message = message % args
+        
         # Adicionar informacoes padrao ao contexto
         context = {}
         if extra:
             context.update(extra)
         
         # Registrar usando o novo sistema de logging estruturado
-        _log(message, self.log_file, level=level, extra=context)
+        self._log_buffer.append(format_log_entry(message, level=level, extra=context))
+        if (
+            len(self._log_buffer) >= LOG_FLUSH_BATCH
+            or getattr(logging, level.upper(), logging.INFO) >= _IMMEDIATE_FLUSH_LEVELS
+        ):
+            self.flush_log()
+
+    def flush_log(self) -> None:
+        """Escreve as entradas pendentes no stdout e no arquivo de log."""
+        with self._log_lock:
+            lines = []
+            while self._log_buffer:
+                lines.append(self._log_buffer.popleft() + "\n")
+            if not lines or self.log_file is None:
+                return
+            # Uma unica escrita por lote: o arquivo line-buffered faz um so flush
+            chunk = "".join(lines)
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+            self.log_file.write(chunk)
+
+    def _flush_periodically(self) -> None:
+        """Laco da thread de escrita: esvazia o buffer a cada intervalo."""
+        while not self._flush_stop.wait(LOG_FLUSH_INTERVAL):
+            self.flush_log()
 
     def run_cmd(
         self,
@@ -171,6 +259,8 @@ class ResticScript:
         if self.log_file is None:  # pragma: no cover - defensive programming
             raise RuntimeError("ResticScript nao inicializado")
         
+        # Manter a ordem das entradas: run_cmd escreve direto no arquivo
+        self.flush_log()
         return _run_cmd(
             cmd,
             self.log_file,
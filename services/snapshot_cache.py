@@ -0,0 +1,259 @@
+"""Cache local da listagem de snapshots do Restic.
+
+Cada execucao de restore consultava ``restic snapshots --json`` no repositorio
+remoto, pagando a latencia de rede e o carregamento do indice mesmo quando
+outro script havia feito a mesma consulta minutos antes. Este modulo persiste
+a listagem em ``~/.cache/safestic/<sha256(repositorio)>.json`` e a reutiliza
+enquanto o arquivo estiver dentro do TTL configurado.
+
+Tambem mantem um marcador ``access_ok.<sha256(repositorio)>`` registrando a
+ultima verificacao de acesso bem-sucedida, permitindo que backups agendados
+pulem ``check_repository_access`` enquanto o marcador estiver valido.
+
+Dentro de um mesmo processo, os snapshots ja localizados por ID em
+:func:`lookup_snapshot` ficam memorizados por ``(repositorio, ID)``, de forma
+que chamadas repetidas nao releem o cache em disco nem consultam o Restic.
+``"latest"`` nunca e resolvido pelo cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .restic_common import ResticError, dump_json, parse_json
+
+if TYPE_CHECKING:  # pragma: no cover - apenas para tipagem
+    from .restic_client import ResticClient
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path.home() / ".cache" / "safestic"
+DEFAULT_TTL = 300
+DEFAULT_ACCESS_TTL = 3600
+
+# Snapshots localizados neste processo, por (repositorio, ID solicitado)
+_lookup_memo: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+
+def _repository_digest(repository: str) -> str:
+    """Retorna o hash SHA-256 usado para nomear arquivos de ``repository``."""
+    return hashlib.sha256(repository.encode("utf-8")).hexdigest()
+
+
+def _cache_path(repository: str) -> Path:
+    """Retorna o caminho do arquivo de cache para ``repository``."""
+    return CACHE_DIR / f"{_repository_digest(repository)}.json"
+
+
+def _access_token_path(repository: str) -> Path:
+    """Retorna o caminho do marcador de acesso para ``repository``."""
+    return CACHE_DIR / f"access_ok.{_repository_digest(repository)}"
+
+
+def is_access_recent(repository: str, ttl: int = DEFAULT_ACCESS_TTL) -> bool:
+    """Indica se o acesso a ``repository`` foi verificado ha menos de ``ttl`` segundos.
+
+    Parameters
+    ----------
+    repository : str
+        URL do repositorio Restic
+    ttl : int, optional
+        Validade do marcador em segundos, por padrao 3600
+
+    Returns
+    -------
+    bool
+        True se existe marcador dentro do TTL
+    """
+    try:
+        return time.time() - _access_token_path(repository).stat().st_mtime <= ttl
+    except OSError:
+        return False
+
+
+def mark_access_ok(repository: str) -> None:
+    """Registra uma verificacao de acesso bem-sucedida para ``repository``."""
+    path = _access_token_path(repository)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    except OSError as exc:
+        logger.warning("Falha ao gravar marcador de acesso: %s", exc)
+
+
+def invalidate_access(repository: str) -> None:
+    """Remove o marcador de acesso de ``repository`` se existir."""
+    try:
+        _access_token_path(repository).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("Falha ao remover marcador de acesso: %s", exc)
+
+
+def invalidate_snapshots(repository: str) -> None:
+    """Remove o cache de snapshots de ``repository`` se existir.
+
+    Parameters
+    ----------
+    repository : str
+        URL do repositorio Restic
+    """
+    for key in [key for key in _lookup_memo if key[0] == repository]:
+        del _lookup_memo[key]
+    try:
+        _cache_path(repository).unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("Falha ao remover cache de snapshots: %s", exc)
+
+
+def _read_cache(path: Path, ttl: int) -> Optional[List[Dict[str, Any]]]:
+    """Le o cache em ``path`` se ainda estiver dentro do TTL."""
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        with open(path, "rb") as fh:
+            data = parse_json(fh.read())
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, list) else None
+
+
+def _write_cache(path: Path, snapshots: List[Dict[str, Any]]) -> None:
+    """Grava ``snapshots`` em ``path`` de forma atomica."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as fh:
+            fh.write(dump_json(snapshots))
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Falha ao gravar cache de snapshots: %s", exc)
+
+
+def get_snapshots(client: "ResticClient", ttl: int = DEFAULT_TTL) -> List[Dict[str, Any]]:
+    """Retorna a listagem de snapshots usando o cache local quando valido.
+
+    Parameters
+    ----------
+    client : ResticClient
+        Cliente usado para consultar o repositorio em caso de cache ausente
+        ou expirado
+    ttl : int, optional
+        Tempo de validade do cache em segundos, por padrao 300
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Lista de snapshots no formato de ``restic snapshots --json``
+
+    Raises
+    ------
+    ResticError
+        Se a consulta ao repositorio falhar (o cache e invalidado)
+    """
+    path = _cache_path(client.repository)
+    cached = _read_cache(path, ttl)
+    if cached is not None:
+        logger.debug("Usando cache de snapshots: %s", path)
+        return cached
+
+    try:
+        snapshots = client.list_snapshots()
+    except ResticError:
+        invalidate_snapshots(client.repository)
+        raise
+
+    _write_cache(path, snapshots)
+    return snapshots
+
+
+def find_snapshot(
+    snapshots: List[Dict[str, Any]], snapshot_id: str
+) -> Optional[Dict[str, Any]]:
+    """Localiza um snapshot por ID curto ou prefixo de ID.
+
+    ``"latest"`` nao e resolvido aqui: a listagem em cache pode nao conter
+    backups feitos por outra maquina ou ja ter snapshots removidos.
+
+    Parameters
+    ----------
+    snapshots : List[Dict[str, Any]]
+        Listagem retornada por :func:`get_snapshots`
+    snapshot_id : str
+        ID (completo ou curto) ou prefixo do ID do snapshot
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        Dados do snapshot, ou None se o ID estiver vazio, nao for encontrado
+        ou for ambiguo (mais de um snapshot com o prefixo; o Restic reporta
+        a ambiguidade)
+    """
+    if not snapshot_id or snapshot_id == "latest":
+        return None
+    matches = [
+        s
+        for s in snapshots
+        if s.get("short_id") == snapshot_id or s.get("id", "").startswith(snapshot_id)
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+
+def lookup_snapshot(
+    client: "ResticClient", snapshot_id: str = "latest", ttl: int = DEFAULT_TTL
+) -> Dict[str, Any]:
+    """Obtem os dados de um snapshot consultando primeiro o cache local.
+
+    ``"latest"`` e sempre consultado no repositorio, sem cache. Se o ID nao
+    estiver na listagem em cache (ex: backup recente feito por outra
+    maquina) ou for ambiguo, a consulta e delegada a
+    :meth:`ResticClient.get_snapshot_info` e o cache e invalidado.
+
+    Parameters
+    ----------
+    client : ResticClient
+        Cliente Restic configurado
+    snapshot_id : str, optional
+        ID do snapshot ou ``"latest"``, por padrao ``"latest"``
+    ttl : int, optional
+        Tempo de validade do cache em segundos, por padrao 300
+
+    Returns
+    -------
+    Dict[str, Any]
+        Informacoes do snapshot
+
+    Raises
+    ------
+    ValueError
+        Se ``snapshot_id`` estiver vazio
+    """
+    if not snapshot_id:
+        raise ValueError("ID de snapshot vazio")
+    if snapshot_id == "latest":
+        return client.get_snapshot_info(snapshot_id)
+
+    key = (client.repository, snapshot_id)
+    if key in _lookup_memo:
+        return _lookup_memo[key]
+
+    snapshot = find_snapshot(get_snapshots(client, ttl=ttl), snapshot_id)
+    if snapshot is None:
+        invalidate_snapshots(client.repository)
+        snapshot = client.get_snapshot_info(snapshot_id)
+
+    _lookup_memo[key] = snapshot
+    return snapshot
+
+
+def clear_lookup_memo() -> None:
+    """Descarta os snapshots memorizados por :func:`lookup_snapshot` neste processo."""
+    _lookup_memo.clear()
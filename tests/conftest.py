@@ -8,6 +8,17 @@ from typing import Dict, Any, Generator
 from unittest.mock import patch, MagicMock
 
 
+@pytest.fixture(autouse=True)
+def isolated_restic_caps(tmp_path: Path) -> Generator[None, None, None]:
+    """Isola o cache de ``restic version``/``restic help`` em um diretorio temporario."""
+    from services import restic_caps
+
+    restic_caps.clear_memo()
+    with patch.object(restic_caps, "CAPS_CACHE_PATH", tmp_path / "restic_caps.json"):
+        yield
+    restic_caps.clear_memo()
+
+
 @pytest.fixture
 def mock_env_vars() -> Dict[str, str]:
     """Retorna variaveis de ambiente simuladas para testes."""
@@ -33,9 +44,13 @@ def mock_env_vars() -> Dict[str, str]:
 @pytest.fixture
 def mock_env(mock_env_vars: Dict[str, str]) -> Generator[None, None, None]:
     """Configura variaveis de ambiente simuladas para testes."""
+    from services.restic import _resolve_restic_env
+
     original_environ = os.environ.copy()
     os.environ.update(mock_env_vars)
+    _resolve_restic_env.cache_clear()
     yield
+    _resolve_restic_env.cache_clear()
     os.environ.clear()
     os.environ.update(original_environ)
 
@@ -0,0 +1,49 @@
+"""Testes para o modulo services.credentials."""
+
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+from services.credentials import CredentialManager
+
+
+class TestGetCredentials:
+    """Testes para CredentialManager.get_credentials."""
+
+    def test_sops_decrypted_once(self, tmp_path) -> None:
+        """O arquivo SOPS e descriptografado uma unica vez para todas as chaves."""
+        sops_file = tmp_path / "secrets.env"
+        sops_file.write_text("cifrado")
+        decrypted = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout="RESTIC_PASSWORD=senha\nAWS_ACCESS_KEY_ID=chave\n"
+        )
+        manager = CredentialManager(
+            credential_source="sops", fallback_to_env=False, sops_file=str(sops_file)
+        )
+
+        with patch("services.credentials.subprocess.run", return_value=decrypted) as mock_run:
+            values = manager.get_credentials(["RESTIC_PASSWORD", "AWS_ACCESS_KEY_ID", "AUSENTE"])
+
+        mock_run.assert_called_once()
+        assert values == {"RESTIC_PASSWORD": "senha", "AWS_ACCESS_KEY_ID": "chave", "AUSENTE": None}
+
+    def test_aws_secrets_batched(self) -> None:
+        """Segredos da AWS sao obtidos com uma unica chamada em lote."""
+        client = MagicMock()
+        client.batch_get_secret_value.return_value = {
+            "SecretValues": [
+                {"Name": "safestic/AWS_ACCESS_KEY_ID", "SecretString": "chave"},
+                {"Name": "safestic/AWS_SECRET_ACCESS_KEY", "SecretString": '{"AWS_SECRET_ACCESS_KEY": "segredo"}'},
+            ],
+            "Errors": [],
+        }
+        boto3 = MagicMock()
+        boto3.client.return_value = client
+        manager = CredentialManager(credential_source="aws_secrets", fallback_to_env=False)
+
+        with patch.dict(sys.modules, {"boto3": boto3}):
+            values = manager.get_credentials(["AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"])
+
+        client.batch_get_secret_value.assert_called_once()
+        client.get_secret_value.assert_not_called()
+        assert values == {"AWS_ACCESS_KEY_ID": "chave", "AWS_SECRET_ACCESS_KEY": "segredo"}
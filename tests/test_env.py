@@ -0,0 +1,46 @@
+"""Testes para o modulo services.env."""
+
+from unittest.mock import patch
+
+from services.env import ensure_env_loaded, get_credential_source, parse_env_list
+
+
+class TestEnsureEnvLoaded:
+    """Testes para a funcao ensure_env_loaded."""
+
+    def test_loads_dotenv_once(self) -> None:
+        """O arquivo ``.env`` e lido apenas na primeira chamada."""
+        ensure_env_loaded.cache_clear()
+        try:
+            with patch("services.env.load_dotenv") as mock_load:
+                assert ensure_env_loaded() is True
+                assert ensure_env_loaded() is True
+                mock_load.assert_called_once_with(None)
+        finally:
+            ensure_env_loaded.cache_clear()
+
+
+class TestGetCredentialSource:
+    """Testes para a funcao get_credential_source."""
+
+    def test_resolved_once(self, monkeypatch) -> None:
+        """A fonte e resolvida uma vez por processo ate ``cache_clear``."""
+        get_credential_source.cache_clear()
+        try:
+            monkeypatch.setenv("CREDENTIAL_SOURCE", "keyring")
+            assert get_credential_source() == "keyring"
+            monkeypatch.setenv("CREDENTIAL_SOURCE", "sops")
+            assert get_credential_source() == "keyring"
+            get_credential_source.cache_clear()
+            assert get_credential_source() == "sops"
+        finally:
+            get_credential_source.cache_clear()
+
+
+class TestParseEnvList:
+    """Testes para a funcao parse_env_list."""
+
+    def test_accepts_both_separators(self, monkeypatch) -> None:
+        """Virgula e ponto e virgula sao aceitos e itens vazios descartados."""
+        monkeypatch.setenv("RESTIC_TAGS", " diario, ;producao;;servidorX ")
+        assert parse_env_list("RESTIC_TAGS") == ["diario", "producao", "servidorX"]
@@ -2,6 +2,7 @@
 
 import json
 import logging
+import logging.handlers
 import os
 import tempfile
 from pathlib import Path
@@ -9,7 +10,7 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from services.logger import create_log_file, log, run_cmd
+from services.logger import create_log_file, log, run_cmd, setup_logger
 
 
 class TestCreateLogFile:
@@ -55,6 +56,70 @@ class TestLog:
                 os.unlink(log_path)
 
 
+    def test_timestamp_matches_isoformat(self) -> None:
+        """Timestamp em cache segue o formato de ``datetime.isoformat``."""
+        import datetime as dt
+        from services.logger import _format_timestamp
+
+        now = 1700000000.25
+        expected = dt.datetime.fromtimestamp(now).isoformat()
+        assert _format_timestamp(now) == expected
+        assert _format_timestamp(now + 0.5)[:19] == expected[:19]
+
+class TestSetupLogger:
+    """Testes para a funcao setup_logger."""
+
+    def test_writes_through_queue_listener(self, tmp_path) -> None:
+        """Registros sao enfileirados e escritos pelo listener em segundo plano."""
+        log_path = tmp_path / "app.log"
+        logger = setup_logger("teste_fila", log_file=str(log_path))
+        (handler,) = logger.handlers
+        assert isinstance(handler, logging.handlers.QueueHandler)
+
+        logger.info("Senha: %s", "password=segredo")
+        handler.close()
+
+        entry = json.loads(log_path.read_text(encoding="utf-8"))
+        assert entry["message"] == "Senha: password=REDACTED"
+
+    def test_exception_keeps_exc_info_field(self, tmp_path) -> None:
+        """O traceback continua no campo ``exc_info``, fora de ``message``."""
+        log_path = tmp_path / "app.log"
+        logger = setup_logger("teste_excecao", log_file=str(log_path))
+        try:
+            raise RuntimeError("falhou")
+        except RuntimeError:
+            logger.exception("Erro ao processar")
+        logger.handlers[0].close()
+
+        entry = json.loads(log_path.read_text(encoding="utf-8"))
+        assert entry["message"] == "Erro ao processar"
+        assert "RuntimeError: falhou" in entry["exc_info"]
+
+    def test_replaced_handler_is_closed_once(self, tmp_path) -> None:
+        """Reconfigurar o logger encerra o listener anterior e seu registro no atexit."""
+        logger = setup_logger("teste_reconfigura")
+        (old_handler,) = logger.handlers
+        with patch("services.logger.atexit.unregister") as mock_unregister:
+            setup_logger("teste_reconfigura")
+            old_handler.close()
+        mock_unregister.assert_called_once_with(old_handler.close)
+        logger.handlers[0].close()
+
+    def test_replaced_handler_closes_log_file(self, tmp_path) -> None:
+        """O FileHandler do listener anterior e fechado ao reconfigurar o logger."""
+        logger = setup_logger("teste_arquivo", log_file=str(tmp_path / "a.log"))
+        (old_handler,) = logger.handlers
+        file_handlers = [
+            h for h in old_handler.listener.handlers if isinstance(h, logging.FileHandler)
+        ]
+        assert file_handlers
+
+        setup_logger("teste_arquivo", log_file=str(tmp_path / "b.log"))
+        assert all(h.stream is None for h in file_handlers)
+        logger.handlers[0].close()
+
+
 class TestRunCmd:
     """Testes para a funcao run_cmd."""
 
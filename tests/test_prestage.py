@@ -0,0 +1,66 @@
+"""Testes para o modulo services.prestage."""
+
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+from services.prestage import pack_key, parse_s3_repository, prestage_packs
+
+
+class TestParseS3Repository:
+    """Testes para a funcao parse_s3_repository."""
+
+    def test_aws_and_custom_endpoint(self) -> None:
+        """Reconhece repositorios na AWS e em endpoints compativeis."""
+        assert parse_s3_repository("s3:s3.amazonaws.com/bucket") == (None, "bucket", "")
+        assert parse_s3_repository("s3:http://minio:9000/bucket/restic/") == (
+            "http://minio:9000",
+            "bucket",
+            "restic",
+        )
+
+    def test_non_s3(self) -> None:
+        """Repositorios de outros provedores sao ignorados."""
+        assert parse_s3_repository("azure:container:restic") is None
+        assert prestage_packs("gs:bucket", ["abcd"], {}) == 0
+
+
+class TestPrestagePacks:
+    """Testes para a funcao prestage_packs."""
+
+    def test_heads_every_pack(self) -> None:
+        """Cada pack recebe um HEAD com Range 0-0 na chave do layout do Restic."""
+        boto3 = MagicMock()
+        s3 = boto3.client.return_value
+        with patch.dict(sys.modules, {"boto3": boto3}):
+            warmed = prestage_packs("s3:s3.amazonaws.com/bucket/pfx", ["aa11", "bb22"], {})
+
+        assert warmed == 2
+        s3.head_object.assert_any_call(Bucket="bucket", Key="pfx/data/aa/aa11", Range="bytes=0-0")
+        assert pack_key("", "bb22") == "data/bb/bb22"
+        assert boto3.client.call_args.kwargs["aws_session_token"] is None
+
+    def test_consumes_iterator_and_passes_session_token(self) -> None:
+        """Os IDs chegam de um iterador e o token STS e repassado ao boto3."""
+        boto3 = MagicMock()
+        s3 = boto3.client.return_value
+        env = {"AWS_SESSION_TOKEN": "token"}
+        with patch.dict(sys.modules, {"boto3": boto3}):
+            warmed = prestage_packs("s3:s3.amazonaws.com/bucket", iter(["aa11", "bb22"]), env)
+
+        assert warmed == 2
+        assert s3.head_object.call_count == 2
+        assert boto3.client.call_args.kwargs["aws_session_token"] == "token"
+
+    def test_stop_and_failures(self) -> None:
+        """Falhas nao interrompem o envio e o evento ``stop`` encerra a varredura."""
+        boto3 = MagicMock()
+        s3 = boto3.client.return_value
+        s3.head_object.side_effect = OSError("403 Forbidden")
+        with patch.dict(sys.modules, {"boto3": boto3}):
+            assert prestage_packs("s3:s3.amazonaws.com/bucket", ["aa11", "bb22"], {}) == 0
+
+            stop = threading.Event()
+            stop.set()
+            assert prestage_packs("s3:s3.amazonaws.com/bucket", ["aa11"], {}, stop=stop) == 0
+        assert s3.head_object.call_count == 2
@@ -4,7 +4,7 @@ import os
 import pytest
 from unittest.mock import patch
 
-from services.restic import load_restic_env
+from services.restic import build_repository_url, load_restic_config, load_restic_env
 
 
 class TestLoadResticEnv:
@@ -46,6 +46,36 @@ class TestLoadResticEnv:
         assert env["RESTIC_PASSWORD"] == "test-password"
         assert provider == "gcp"
 
+    def test_load_restic_env_filters_unrelated_vars(self, mock_env) -> None:
+        """Apenas variaveis relevantes para o Restic sao repassadas."""
+        os.environ["STORAGE_PROVIDER"] = "aws"
+        os.environ["STORAGE_BUCKET"] = "test-bucket"
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+        os.environ["UNRELATED_CI_TOKEN"] = "xyz"
+
+        _, env, _ = load_restic_env()
+
+        assert env["AWS_DEFAULT_REGION"] == "us-east-1"
+        assert "UNRELATED_CI_TOKEN" not in env
+        assert "STORAGE_BUCKET" not in env
+
+    def test_load_restic_env_memoized(self, mock_env) -> None:
+        """Credenciais sao consultadas uma vez; cada chamada recebe sua copia do ambiente."""
+        from services.credentials import get_manager as real_get_manager
+
+        with patch("services.restic.get_manager", wraps=real_get_manager) as get_manager:
+            _, first, _ = load_restic_env()
+            _, second, _ = load_restic_env()
+            assert get_manager.call_count == 1
+
+            first["RESTIC_PASSWORD"] = "alterada"
+            assert second["RESTIC_PASSWORD"] == "test-password"
+
+            os.environ["STORAGE_BUCKET"] = "outro-bucket"
+            repository, _, _ = load_restic_env()
+            assert repository == "s3:s3.amazonaws.com/outro-bucket"
+            assert get_manager.call_count == 2
+
     def test_load_restic_env_invalid_provider(self, mock_env) -> None:
         """Testa erro com provedor invalido."""
         os.environ["STORAGE_PROVIDER"] = "invalid"
@@ -66,3 +96,40 @@ class TestLoadResticEnv:
         assert repository == "s3:s3.amazonaws.com/test-bucket"
         assert "RESTIC_PASSWORD" not in env
         assert provider == "aws"
+
+
+class TestLoadResticConfig:
+    """Testes para a funcao load_restic_config."""
+
+    def test_list_variables_parsed_once(self, mock_env) -> None:
+        """Listas separadas por virgula ou ponto e virgula sao normalizadas."""
+        os.environ["RESTIC_EXCLUDES"] = " *.log ; *.tmp,,"
+
+        config = load_restic_config()
+
+        assert config.backup_source_dirs == ["/test/dir1", "/test/dir2"]
+        assert config.restic_excludes == ["*.log", "*.tmp"]
+        assert config.restic_tags == ["test", "unittest"]
+        assert config.retention.enabled is True
+        assert config.retention.as_kwargs() == {
+            "keep_hourly": 24,
+            "keep_daily": 7,
+            "keep_weekly": 4,
+            "keep_monthly": 6,
+            "keep_yearly": 1,
+        }
+
+
+class TestBuildRepositoryUrl:
+    """Testes para a funcao build_repository_url."""
+
+    def test_cloud_providers(self) -> None:
+        """URLs dos provedores em nuvem seguem o formato do Restic."""
+        assert build_repository_url("aws", "b") == "s3:s3.amazonaws.com/b"
+        assert build_repository_url("azure", "b") == "azure:b:restic"
+        assert build_repository_url("gcp", "b") == "gs:b"
+
+    def test_invalid_provider(self) -> None:
+        """Provedor desconhecido gera ValueError."""
+        with pytest.raises(ValueError):
+            build_repository_url("ftp", "b")
@@ -0,0 +1,67 @@
+"""Testes para o modulo services.restic_caps."""
+
+from unittest.mock import MagicMock, patch
+
+from services import restic_caps
+from services.restic_caps import clear_memo, prefetch, restic_output
+
+
+def _completed(stdout: str, returncode: int = 0) -> MagicMock:
+    """Cria o retorno simulado de ``subprocess.run``."""
+    result = MagicMock()
+    result.returncode = returncode
+    result.stdout = stdout
+    return result
+
+
+class TestResticOutput:
+    """Testes para a funcao restic_output."""
+
+    def test_reuses_disk_cache_for_same_binary(self, tmp_path) -> None:
+        """A saida e gravada em disco e reutilizada enquanto o executavel nao muda."""
+        binary = tmp_path / "restic"
+        binary.write_bytes(b"v1")
+
+        with patch.object(restic_caps, "resolve_restic_binary", return_value=str(binary)), \
+                patch("subprocess.run", return_value=_completed("restic 0.17.0\n")) as mock_run:
+            assert restic_output("version") == "restic 0.17.0\n"
+            assert restic_output("version") == "restic 0.17.0\n"
+            clear_memo()
+            assert restic_output("version") == "restic 0.17.0\n"
+            assert mock_run.call_count == 1
+
+            # Executavel substituido: o cache em disco deixa de valer
+            clear_memo()
+            binary.write_bytes(b"v2 maior")
+            restic_output("version")
+            assert mock_run.call_count == 2
+
+    def test_missing_binary_or_failure_is_not_cached(self, tmp_path) -> None:
+        """Sem executavel ou com falha, retorna None e nao memoriza o resultado."""
+        with patch.object(restic_caps, "resolve_restic_binary", return_value=str(tmp_path / "nada")):
+            assert restic_output("help") is None
+
+        binary = tmp_path / "restic"
+        binary.write_bytes(b"v1")
+        with patch.object(restic_caps, "resolve_restic_binary", return_value=str(binary)), \
+                patch("subprocess.run", return_value=_completed("", returncode=1)) as mock_run:
+            assert restic_output("help") is None
+            assert restic_output("help") is None
+            assert mock_run.call_count == 2
+
+    def test_prefetch_fills_cache_once(self, tmp_path) -> None:
+        """prefetch executa os comandos ausentes e grava o cache uma unica vez."""
+        binary = tmp_path / "restic"
+        binary.write_bytes(b"v1")
+
+        with patch.object(restic_caps, "resolve_restic_binary", return_value=str(binary)), \
+                patch("subprocess.run", return_value=_completed("saida\n")) as mock_run, \
+                patch.object(restic_caps, "_write_outputs", wraps=restic_caps._write_outputs) as mock_write:
+            prefetch("version", "help")
+            assert mock_run.call_count == 2
+            assert mock_write.call_count == 1
+
+            assert restic_output("version") == "saida\n"
+            assert restic_output("help") == "saida\n"
+            prefetch()
+            assert mock_run.call_count == 2
@@ -4,6 +4,9 @@ import json
 import pytest
 from unittest.mock import patch, MagicMock
 
+import io
+import sys
+
 from services.restic_client import (
     ResticClient,
     ResticError,
@@ -13,6 +16,17 @@ from services.restic_client import (
     redact_secrets,
     with_retry
 )
+from services.restic_env import default_cache_dir
+
+
+def _popen_process(stdout: bytes, stderr: bytes = b"", returncode: int = 0) -> MagicMock:
+    """Processo simulado para chamadas a ``subprocess.Popen``."""
+    process = MagicMock()
+    process.stdout = io.BytesIO(stdout)
+    process.stderr = io.BytesIO(stderr)
+    process.poll.return_value = None if returncode == 0 else returncode
+    process.wait.return_value = returncode
+    return process
 
 
 class TestRedactSecrets:
@@ -42,6 +56,90 @@ class TestRedactSecrets:
         assert "REDACTED" in redacted
 
 
+class TestResolveResticBinary:
+    """Testes para a resolucao do executavel do Restic."""
+
+    def test_resolved_once_and_used_as_argv0(self) -> None:
+        """Caminho absoluto e resolvido uma vez e usado em todos os comandos."""
+        from services.restic_common import build_restic_command, resolve_restic_binary
+
+        resolve_restic_binary.cache_clear()
+        try:
+            with patch("services.restic_common.shutil.which", return_value="/usr/bin/restic") as which:
+                assert build_restic_command("snapshots")[0] == "/usr/bin/restic"
+                assert build_restic_command("stats", repository="repo")[:3] == ["/usr/bin/restic", "-r", "repo"]
+                which.assert_called_once_with("restic")
+        finally:
+            resolve_restic_binary.cache_clear()
+
+
+class TestParseSnapshotTime:
+    """Testes para a funcao parse_snapshot_time."""
+
+    def test_parse_utc_suffix(self) -> None:
+        """Timestamp com sufixo ``Z`` e convertido para UTC."""
+        from datetime import timezone
+        from services.restic_common import parse_snapshot_time
+
+        with patch("services.restic_common.CISO8601_AVAILABLE", False):
+            parsed = parse_snapshot_time("2023-01-01T12:00:00Z")
+        assert parsed.strftime("%Y-%m-%d-%H%M%S") == "2023-01-01-120000"
+        assert parsed.utcoffset() == timezone.utc.utcoffset(None)
+
+    @pytest.mark.parametrize("native", [True, False])
+    def test_parse_nanoseconds_and_offset(self, native: bool) -> None:
+        """Fracao em nanossegundos (formato do Restic) e truncada em microssegundos."""
+        from datetime import timedelta
+        from services.restic_common import parse_snapshot_time
+
+        with patch("services.restic_common.CISO8601_AVAILABLE", False), \
+                patch("services.restic_common.NATIVE_FROMISOFORMAT", native):
+            parsed = parse_snapshot_time("2025-08-19T10:03:20.123456789-03:00")
+        assert parsed.microsecond == 123456
+        assert parsed.utcoffset() == timedelta(hours=-3)
+
+
+class TestBuildOptionArgs:
+    """Testes para a funcao build_option_args."""
+
+    def test_strips_and_skips_empty(self) -> None:
+        """Itens sao normalizados e entradas vazias ignoradas."""
+        from services.restic_common import build_option_args
+
+        assert build_option_args("--tag", [" a ", "", "  ", "b"]) == ["--tag", "a", "--tag", "b"]
+        assert build_option_args("--exclude", None) == []
+
+
+class TestBuildPriorityPrefix:
+    """Testes para a funcao build_priority_prefix."""
+
+    def test_linux_prefix(self) -> None:
+        """No Linux, ``ionice`` e ``nice`` sao inseridos antes do Restic."""
+        from services.restic_common import build_priority_prefix
+
+        with patch("services.restic_common.sys.platform", "linux"), \
+                patch("services.restic_common.shutil.which", side_effect=lambda name: f"/usr/bin/{name}"):
+            prefix = build_priority_prefix(nice=10, ionice_class=3)
+        assert prefix == ["/usr/bin/ionice", "-c", "3", "/usr/bin/nice", "-n", "10"]
+
+    def test_ignored_outside_linux(self) -> None:
+        """Em outros sistemas nenhum prefixo e gerado."""
+        from services.restic_common import build_priority_prefix
+
+        with patch("services.restic_common.sys.platform", "win32"):
+            assert build_priority_prefix(nice=10, ionice_class=3) == []
+
+
+class TestBuildRetentionArgs:
+    """Testes para a funcao build_retention_args."""
+
+    def test_skips_zero_and_none(self) -> None:
+        """Limites nulos ou zerados nao geram flags."""
+        from services.restic_common import build_retention_args
+
+        args = build_retention_args(keep_hourly=0, keep_daily=7, keep_weekly=None, keep_yearly=-1)
+        assert args == ["--keep-daily", "7", "--keep-yearly", "-1"]
+
 class TestWithRetry:
     """Testes para o decorador with_retry."""
 
@@ -143,25 +241,225 @@ class TestResticClient:
         with pytest.raises(ResticError):
             client.backup(source_dirs=["/test/dir"], tags=["test"])
 
+    def test_backup_parallel_one_snapshot_per_path(self, mock_successful_subprocess) -> None:
+        """Testa backup paralelo gerando um processo por diretorio."""
+        client = ResticClient()
+        with patch("services.restic_client.os.cpu_count", return_value=4):
+            result = client.backup_parallel(paths=["/dir1", "/dir2"], max_workers=2)
+        assert result == ["abc123", "abc123"]
+        assert mock_successful_subprocess.call_count == 2
+        backed_up = {call[0][0][-1] for call in mock_successful_subprocess.call_args_list}
+        assert backed_up == {"/dir1", "/dir2"}
+
+    def test_backup_parallel_reports_partial_failure(self) -> None:
+        """Uma falha em um caminho preserva os IDs dos snapshots ja criados."""
+        client = ResticClient()
+
+        def backup(paths, excludes=None, tags=None):
+            if paths == ["/dir2"]:
+                raise ResticNetworkError(message="Erro de rede", command=["restic"])
+            return "abc123"
+
+        with patch.object(client, "backup", side_effect=backup), patch(
+            "services.restic_client.os.cpu_count", return_value=4
+        ):
+            with pytest.raises(ResticNetworkError) as exc_info:
+                client.backup_parallel(paths=["/dir1", "/dir2"], max_workers=2)
+        assert "falha em: /dir2" in exc_info.value.message
+        assert "snapshots criados: abc123" in exc_info.value.message
+
+    def test_backup_with_retention_success(self, mock_successful_subprocess) -> None:
+        """Testa backup seguido de forget em sequencia."""
+        client = ResticClient()
+        result = client.backup_with_retention(paths=["/test/dir"], keep_daily=7)
+        assert "abc123" in result
+        assert mock_successful_subprocess.call_count == 2
+        forget_cmd = mock_successful_subprocess.call_args_list[1][0][0]
+        assert "forget" in forget_cmd
+        assert "--prune" in forget_cmd
+        # backup e forget compartilham o mesmo cache persistente
+        cache_dirs = {call[1]["env"]["RESTIC_CACHE_DIR"] for call in mock_successful_subprocess.call_args_list}
+        assert cache_dirs == {default_cache_dir()}
+        # O cache fixado vale apenas para os dois comandos
+        assert "RESTIC_CACHE_DIR" not in client.env
+
+    def test_backup_with_retention_keeps_configured_cache(self, mock_successful_subprocess) -> None:
+        """Um RESTIC_CACHE_DIR ja configurado e respeitado."""
+        client = ResticClient(repository="s3:s3.amazonaws.com/b", env={"RESTIC_CACHE_DIR": "/cache"}, provider="aws")
+        client.backup_with_retention(paths=["/test/dir"], keep_daily=7)
+        assert all(call[1]["env"]["RESTIC_CACHE_DIR"] == "/cache" for call in mock_successful_subprocess.call_args_list)
+
     def test_apply_retention_policy_success(self, mock_successful_subprocess) -> None:
         """Testa aplicacao de politica de retencao com sucesso."""
         client = ResticClient()
         client.apply_retention_policy(last=5, hourly=24, daily=7, weekly=4, monthly=12, yearly=3)
         mock_successful_subprocess.assert_called_once()
 
-    def test_list_snapshots_success(self, mock_successful_subprocess) -> None:
+    def test_list_snapshots_success(self) -> None:
         """Testa listagem de snapshots com sucesso."""
-        mock_successful_subprocess.return_value.stdout = json.dumps([{"id": "abc123", "time": "2023-01-01T12:00:00Z"}])
-        client = ResticClient()
-        snapshots = client.list_snapshots()
+        data = [{"id": "abc123", "time": "2023-01-01T12:00:00Z"}]
+        process = _popen_process(json.dumps(data).encode())
+
+        with patch("subprocess.Popen", return_value=process):
+            client = ResticClient()
+            snapshots = client.list_snapshots()
         assert len(snapshots) == 1
         assert snapshots[0]["id"] == "abc123"
 
-    def test_restore_snapshot_success(self, mock_successful_subprocess) -> None:
-        """Testa restauracao de snapshot com sucesso."""
+    def test_iter_snapshots_streams_and_stops_early(self) -> None:
+        """Snapshots sao lidos do pipe e o processo e encerrado ao parar a iteracao."""
+        data = [{"id": "abc123", "short_id": "abc1"}, {"id": "def456", "short_id": "def4"}]
+        process = _popen_process(json.dumps(data).encode())
+
+        with patch("subprocess.Popen", return_value=process):
+            client = ResticClient()
+            snapshots = client.iter_snapshots()
+            assert next(snapshots)["short_id"] == "abc1"
+            snapshots.close()
+        process.terminate.assert_called_once()
+
+    def test_get_snapshot_info_reads_only_first(self) -> None:
+        """Apenas o primeiro snapshot e decodificado; o Restic e encerrado em seguida."""
+        data = [{"id": "abc123"}, {"id": "def456"}]
+        process = _popen_process(json.dumps(data).encode())
+
+        with patch("subprocess.Popen", return_value=process) as mock_popen:
+            client = ResticClient()
+            snapshot = client.get_snapshot_info("latest")
+
+        assert snapshot["id"] == "abc123"
+        assert client.resolve_snapshot_id("latest") == "abc123"
+        assert mock_popen.call_args[0][0][-2:] == ["latest", "--json"]
+        process.terminate.assert_called_once()
+
+    def test_iter_snapshots_error(self) -> None:
+        """Codigo de retorno diferente de zero gera excecao apos a leitura."""
+        process = _popen_process(b"", b"Fatal: repository not found", returncode=1)
+
+        with patch("subprocess.Popen", return_value=process):
+            client = ResticClient()
+            with pytest.raises(ResticRepositoryError):
+                list(client.iter_snapshots())
+
+    def test_iter_snapshots_drains_stderr(self) -> None:
+        """Um stderr maior que o buffer do pipe nao trava a leitura do stdout."""
+        script = "import sys; sys.stderr.write('x' * 1000000); sys.stderr.flush(); print('[]')"
+        with patch(
+            "services.restic_client.build_restic_command",
+            return_value=[sys.executable, "-c", script],
+        ):
+            client = ResticClient()
+            assert list(client.iter_snapshots()) == []
+
+    def test_iter_snapshot_packs_only_snapshot_blobs(self) -> None:
+        """Apenas os packs com blobs das arvores do snapshot sao entregues."""
+        objects = {
+            ("snapshot", "snap1"): {"tree": "t1"},
+            ("blob", "t1"): {"nodes": [
+                {"type": "file", "content": ["d1"]},
+                {"type": "dir", "subtree": "t2"},
+            ]},
+            ("blob", "t2"): {"nodes": [{"type": "file", "content": ["d2", "d1"]}]},
+            ("index", "i1"): {"packs": [
+                {"id": "p1", "blobs": [{"id": "t1"}, {"id": "d1"}]},
+                {"id": "p2", "blobs": [{"id": "other"}]},
+            ]},
+            ("index", "i2"): {"packs": [
+                {"id": "p3", "blobs": [{"id": "t2"}, {"id": "d2"}]},
+                {"id": "p1", "blobs": [{"id": "d1"}]},
+            ]},
+        }
+
+        def run_command(cmd, capture_json=False, check=True):
+            return True, None, objects[(cmd[-2], cmd[-1])]
+
         client = ResticClient()
-        client.restore_snapshot(snapshot_id="abc123", target_dir="/restore/path")
-        mock_successful_subprocess.assert_called_once()
+        with patch.object(client, "_run_command", side_effect=run_command), patch.object(
+            client, "_stream_command", side_effect=lambda cmd, on_line: [
+                on_line(line) for line in (b"i1\n", b"i2\n")
+            ],
+        ):
+            assert list(client.iter_snapshot_packs("snap1")) == ["p1", "p3"]
+
+    def test_forget_snapshots_streams_output(self) -> None:
+        """O forget com prune le a saida do pipe e falhas geram excecao."""
+        process = _popen_process(b"removed snapshot abc123\nremoving 3 packs\n")
+        with patch("subprocess.Popen", return_value=process) as mock_popen:
+            client = ResticClient()
+            assert client.forget_snapshots(keep_daily=7, tags=["auto"])
+        cmd = mock_popen.call_args[0][0]
+        assert "forget" in cmd and "--prune" in cmd
+
+        # Um processo novo a cada tentativa do with_retry
+        failed = lambda *args, **kwargs: _popen_process(b"", b"Fatal: repository not found", returncode=1)
+        with patch("subprocess.Popen", side_effect=failed):
+            with pytest.raises(ResticRepositoryError):
+                ResticClient().forget_snapshots()
+
+    def test_restore_snapshot_success(self, tmp_path) -> None:
+        """Testa restauracao de snapshot com sucesso, com a saida lida do pipe."""
+        process = _popen_process(b"restoring <Snapshot abc123>\nSummary: Restored 3 files\n")
+        with patch("subprocess.Popen", return_value=process) as mock_popen:
+            client = ResticClient()
+            assert client.restore_snapshot(snapshot_id="abc123", target_dir=str(tmp_path))
+        mock_popen.assert_called_once()
+
+    def test_restore_snapshot_connections(self, tmp_path) -> None:
+        """Conexoes paralelas usam a opcao do backend do provedor."""
+        with patch("subprocess.Popen", return_value=_popen_process(b"")) as mock_popen:
+            client = ResticClient(repository="s3:s3.amazonaws.com/b", env={"RESTIC_PASSWORD": "x"}, provider="aws")
+            client.restore_snapshot(snapshot_id="abc123", target_dir=str(tmp_path), connections=8)
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[cmd.index("-o") + 1] == "s3.connections=8"
+
+    def test_restore_version_gated_flags(self, mock_successful_subprocess, tmp_path) -> None:
+        """``--overwrite`` e ``--sparse`` dependem da versao do Restic, consultada uma vez."""
+        mock_successful_subprocess.return_value.stdout = "restic 0.16.4 compiled with go1.21 on linux/amd64"
+        with patch("subprocess.Popen", side_effect=lambda *a, **k: _popen_process(b"")) as mock_popen:
+            client = ResticClient()
+            client.restore_snapshot(str(tmp_path), "abc123", overwrite_mode="if-newer", sparse=True)
+            cmd = mock_popen.call_args[0][0]
+            assert "--sparse" in cmd
+            assert "--overwrite" not in cmd
+
+            client.restore_snapshot(str(tmp_path), "abc123", overwrite_mode="if-newer", sparse=True)
+        assert mock_successful_subprocess.call_count == 1
+        assert mock_popen.call_count == 2
+        assert client.get_version_info() == (0, 16, 4)
+
+    def test_restore_latest_resolved_once(self, tmp_path) -> None:
+        """``latest`` e resolvido uma vez e o ID completo e usado na restauracao."""
+        processes = [
+            _popen_process(json.dumps([{"id": "abc123full"}]).encode()),
+            _popen_process(b""),
+            _popen_process(b""),
+        ]
+        with patch("subprocess.Popen", side_effect=processes) as mock_popen:
+            client = ResticClient()
+            client.restore_snapshot(snapshot_id="latest", target_dir=str(tmp_path))
+            client.restore_snapshot(snapshot_id="latest", target_dir=str(tmp_path))
+        assert mock_popen.call_count == 3
+        assert "latest" in mock_popen.call_args_list[0][0][0]
+        restore_cmd = mock_popen.call_args[0][0]
+        assert "abc123full" in restore_cmd
+        assert "latest" not in restore_cmd
+
+    def test_restore_json_progress(self, tmp_path) -> None:
+        """Com ``progress``, mensagens ``status`` do ``--json`` sao repassadas em tempo real."""
+        lines = [
+            {"message_type": "status", "percent_done": 0.5, "files_restored": 1},
+            {"message_type": "summary", "files_restored": 2, "bytes_restored": 10},
+        ]
+        process = _popen_process(b"".join(json.dumps(line).encode() + b"\n" for line in lines))
+        received = []
+
+        with patch("subprocess.Popen", return_value=process) as mock_popen:
+            client = ResticClient()
+            client._version_info = (0, 17, 3)
+            assert client.restore_snapshot(str(tmp_path), "abc123", progress=received.append)
+
+        assert "--json" in mock_popen.call_args[0][0]
+        assert received == lines[:1]
 
     def test_get_repository_stats_success(self, mock_successful_subprocess) -> None:
         """Testa obtencao de estatisticas do repositorio com sucesso."""
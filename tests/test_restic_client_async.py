@@ -0,0 +1,31 @@
+"""Testes para o modulo services.restic_client_async."""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import patch
+
+from services.restic_client_async import ResticClientAsync
+
+
+class TestRunCommand:
+    """Testes para a execucao assincrona de comandos."""
+
+    def test_drains_large_single_line_output(self) -> None:
+        """Saida JSON longa em uma unica linha e lida por completo."""
+        client = ResticClientAsync(repository="repo", env=dict(os.environ))
+        payload = [{"id": "x" * 64}] * 2000
+        script = (
+            "import json, sys; print(json.dumps([{'id': 'x' * 64}] * 2000)); "
+            "print('progresso', file=sys.stderr)"
+        )
+
+        with patch("services.restic_common.resolve_restic_binary", return_value=sys.executable):
+            returncode, stdout, stderr = asyncio.run(
+                client._run_command(["-c", script], capture_json=True)
+            )
+
+        assert returncode == 0
+        assert json.loads(stdout) == payload
+        assert stderr.strip() == "progresso"
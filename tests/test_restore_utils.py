@@ -0,0 +1,39 @@
+"""Testes para o modulo services.restore_utils."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from services.restore_utils import create_full_restore_structure, normalize_restore_path
+
+
+class TestNormalizeRestorePath:
+    """Testes para a funcao normalize_restore_path."""
+
+    @pytest.mark.parametrize(
+        ("original", "expected"),
+        [
+            ("C:\\Users\\Administrator\\Documents", "C/Users/Administrator/Documents"),
+            ("d:/dados", "d/dados"),
+            ("/home/usuario", "home/usuario"),
+            ("\\Projetos\\app", "Projetos/app"),
+            ("relativo/pasta", "relativo/pasta"),
+        ],
+    )
+    def test_normalize(self, original: str, expected: str) -> None:
+        """Unidade perde o ``:``, separador inicial e removido e barras sao unificadas."""
+        assert normalize_restore_path(original) == expected
+
+
+class TestCreateFullRestoreStructure:
+    """Testes para a funcao create_full_restore_structure."""
+
+    def test_creates_leaf_with_single_makedirs(self, tmp_path) -> None:
+        """A estrutura inteira e criada com uma unica chamada a ``os.makedirs``."""
+        snapshot = {"time": "2025-08-19T10:03:20Z"}
+        with patch("services.restore_utils.os.makedirs") as makedirs:
+            target = create_full_restore_structure(str(tmp_path), snapshot, "C:\\Users\\docs")
+
+        assert target == os.path.join(str(tmp_path), "2025-08-19-100320", "C/Users/docs")
+        makedirs.assert_called_once_with(target, exist_ok=True)
@@ -0,0 +1,48 @@
+"""Testes para o modulo services.script."""
+
+import io
+import json
+from unittest.mock import patch
+
+from services.script import ResticScript
+
+
+def _make_script(log_level: str) -> ResticScript:
+    """Cria um ResticScript com arquivo de log em memoria."""
+    with patch.dict("os.environ", {"LOG_LEVEL": log_level}):
+        script = ResticScript("teste", credential_source="env")
+    script.log_file = io.StringIO()
+    return script
+
+
+class TestResticScriptLog:
+    """Testes para o metodo ResticScript.log."""
+
+    def test_interpolates_args(self, capsys) -> None:
+        """Argumentos no estilo ``%`` sao interpolados na mensagem."""
+        script = _make_script("INFO")
+        script.log("Snapshot ID: %s (%d arquivos)", "abc123", 3)
+        script.flush_log()
+        entry = json.loads(script.log_file.getvalue())
+        assert entry["message"] == "Snapshot ID: abc123 (3 arquivos)"
+
+    def test_filtered_level_skips_formatting(self, capsys) -> None:
+        """Mensagens abaixo de ``LOG_LEVEL`` nao sao formatadas nem escritas."""
+        script = _make_script("WARNING")
+        script.log("Valor: %s %s", "apenas um argumento", level="DEBUG")
+        script.log("Aviso: %s", "x", level="WARNING")
+        script.flush_log()
+        lines = script.log_file.getvalue().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["message"] == "Aviso: x"
+
+    def test_buffers_until_flush(self, capsys) -> None:
+        """Entradas ficam no buffer ate o flush; erros sao escritos na hora."""
+        script = _make_script("INFO")
+        script.log("primeira")
+        assert script.log_file.getvalue() == ""
+
+        script.log("falha", level="ERROR")
+        lines = script.log_file.getvalue().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == ["primeira", "falha"]
+        assert capsys.readouterr().out.splitlines() == lines
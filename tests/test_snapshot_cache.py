@@ -0,0 +1,132 @@
+"""Testes para o modulo services.snapshot_cache."""
+
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import snapshot_cache
+from services.restic_common import ResticNetworkError
+
+SNAPSHOTS = [
+    {"id": "abc123def456", "short_id": "abc123de", "time": "2023-01-01T12:00:00Z"},
+    {"id": "fff999eee888", "short_id": "fff999ee", "time": "2023-02-01T12:00:00Z"},
+]
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Redireciona o diretorio de cache para um diretorio temporario."""
+    snapshot_cache.clear_lookup_memo()
+    with patch.object(snapshot_cache, "CACHE_DIR", tmp_path):
+        yield tmp_path
+    snapshot_cache.clear_lookup_memo()
+
+
+@pytest.fixture
+def client() -> MagicMock:
+    """Cliente Restic simulado."""
+    mock = MagicMock()
+    mock.repository = "s3:s3.amazonaws.com/test-bucket"
+    mock.list_snapshots.return_value = list(SNAPSHOTS)
+    return mock
+
+
+class TestGetSnapshots:
+    """Testes para a funcao get_snapshots."""
+
+    def test_cache_hit_skips_restic(self, cache_dir, client) -> None:
+        """Segunda chamada dentro do TTL nao consulta o repositorio."""
+        assert snapshot_cache.get_snapshots(client) == SNAPSHOTS
+        assert snapshot_cache.get_snapshots(client) == SNAPSHOTS
+        client.list_snapshots.assert_called_once()
+
+    def test_cache_expired(self, cache_dir, client) -> None:
+        """Cache mais antigo que o TTL e ignorado."""
+        snapshot_cache.get_snapshots(client)
+        path = snapshot_cache._cache_path(client.repository)
+        old = time.time() - 1000
+        os.utime(path, (old, old))
+        snapshot_cache.get_snapshots(client, ttl=300)
+        assert client.list_snapshots.call_count == 2
+
+    def test_error_invalidates_cache(self, cache_dir, client) -> None:
+        """Erro do Restic remove o arquivo de cache."""
+        snapshot_cache.get_snapshots(client)
+        path = snapshot_cache._cache_path(client.repository)
+        os.utime(path, (0, 0))
+        client.list_snapshots.side_effect = ResticNetworkError("Erro de rede", ["restic"])
+        with pytest.raises(ResticNetworkError):
+            snapshot_cache.get_snapshots(client)
+        assert not path.exists()
+
+
+class TestLookupSnapshot:
+    """Testes para localizacao de snapshots no cache."""
+
+    def test_find_by_short_id_and_prefix(self) -> None:
+        """Encontra snapshot por ID curto ou prefixo do ID completo."""
+        assert snapshot_cache.find_snapshot(SNAPSHOTS, "fff999ee")["id"] == "fff999eee888"
+        assert snapshot_cache.find_snapshot(SNAPSHOTS, "abc1")["id"] == "abc123def456"
+        assert snapshot_cache.find_snapshot(SNAPSHOTS, "000") is None
+
+    def test_find_rejects_latest_empty_and_ambiguous(self) -> None:
+        """``latest``, ID vazio e prefixo ambiguo nao sao resolvidos pelo cache."""
+        assert snapshot_cache.find_snapshot(SNAPSHOTS, "latest") is None
+        assert snapshot_cache.find_snapshot(SNAPSHOTS, "") is None
+        ambiguous = SNAPSHOTS + [{"id": "abc999000111", "short_id": "abc99900"}]
+        assert snapshot_cache.find_snapshot(ambiguous, "abc") is None
+
+    def test_lookup_latest_always_queries_restic(self, cache_dir, client) -> None:
+        """``latest`` e consultado no repositorio a cada chamada, sem cache."""
+        client.get_snapshot_info.return_value = {"id": "fff999eee888"}
+        snapshot_cache.lookup_snapshot(client, "latest")
+        snapshot_cache.lookup_snapshot(client, "latest")
+        assert client.get_snapshot_info.call_count == 2
+        client.list_snapshots.assert_not_called()
+
+    def test_lookup_empty_id(self, cache_dir, client) -> None:
+        """ID vazio e rejeitado."""
+        with pytest.raises(ValueError):
+            snapshot_cache.lookup_snapshot(client, "")
+
+    def test_lookup_miss_falls_back_to_client(self, cache_dir, client) -> None:
+        """ID ausente no cache e consultado diretamente no repositorio."""
+        client.get_snapshot_info.return_value = {"id": "new"}
+        assert snapshot_cache.lookup_snapshot(client, "new") == {"id": "new"}
+        client.get_snapshot_info.assert_called_once_with("new")
+
+    def test_lookup_memoized_per_process(self, cache_dir, client) -> None:
+        """Snapshot ja localizado nao e buscado de novo ate a invalidacao."""
+        snapshot_cache.lookup_snapshot(client, "abc1")
+        snapshot_cache._cache_path(client.repository).unlink()
+        assert snapshot_cache.lookup_snapshot(client, "abc1")["id"] == "abc123def456"
+        client.list_snapshots.assert_called_once()
+
+        snapshot_cache.invalidate_snapshots(client.repository)
+        snapshot_cache.lookup_snapshot(client, "abc1")
+        assert client.list_snapshots.call_count == 2
+
+
+class TestAccessToken:
+    """Testes para o marcador de verificacao de acesso."""
+
+    def test_mark_and_expire(self, cache_dir) -> None:
+        """Marcador e valido dentro do TTL e removido ao invalidar."""
+        repo = "azure:container:restic"
+        assert not snapshot_cache.is_access_recent(repo)
+        snapshot_cache.mark_access_ok(repo)
+        assert snapshot_cache.is_access_recent(repo, ttl=3600)
+        assert not snapshot_cache.is_access_recent(repo, ttl=-1)
+        snapshot_cache.invalidate_access(repo)
+        assert not snapshot_cache.is_access_recent(repo)
+
+    def test_client_skips_recent_check(self, cache_dir, mock_successful_subprocess) -> None:
+        """Cliente nao executa o Restic quando o acesso foi verificado recentemente."""
+        from services.restic_client import ResticClient
+
+        client = ResticClient()
+        assert client.check_repository_access_cached(ttl=3600) is True
+        assert client.check_repository_access_cached(ttl=3600) is True
+        mock_successful_subprocess.assert_called_once()